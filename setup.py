@@ -49,17 +49,17 @@ setup(
     version=version,
     install_requires=[
         # Include dependencies here
-        'click>=7.0,<8'
+        'click>=7.0,<8',
         'numpy>=1.18.5',
-        'smt>=0.6.0',
-        'scipy>=1.5.2',
+        'smt>=2.7',
+        'scipy>=1.7',
         'matplotlib>=3.3.1'
     ],
     entry_points="""
     [console_scripts]
     treeopt=treeopt.cli:cli
     """,
-    python_requires=">=0.0.1",
+    python_requires=">=3.9",
     license='MIT',  # noqa
     author='Alexander Busch',
     author_email='alexander.busch@smail.emt.h-brs.de',
@@ -90,7 +90,7 @@ setup(
         # noqa
       # Specify the Python versions you support here. In particular, ensure
       # that you indicate whether you support Python 2, Python 3 or both.
-      'Programming Language :: Python :: 3.7',
+      'Programming Language :: Python :: 3.9',
     ],
     include_package_data=True
 )
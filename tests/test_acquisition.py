@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: test_acquisition
+.. moduleauthor:: Jan Kleinert <jan.kleinert@dlr.de>
+
+This is the test module for the acquisition functions of the acquisition
+module.
+"""
+
+import numpy as np
+import pytest
+
+import treeopt.acquisition as acquisition
+import treeopt.metamodel as metamodel
+import treeopt.sampling as sampling
+
+
+def himmelblau(x):
+    """Himmelblau function, returns one row per row of x."""
+    x = np.atleast_2d(x)
+    return (
+        (x[:, 0] ** 2 + x[:, 1] - 11) ** 2 + (x[:, 0] + x[:, 1] ** 2 - 7) ** 2
+    ).reshape(-1, 1)
+
+
+@pytest.fixture
+def surrogate():
+    """Incremental kriging metamodel of the Himmelblau function."""
+    np.random.seed(4)
+    limits = np.array([[-5.0, 5.0], [-5.0, 5.0]])
+    x = sampling.latin_hypercube(limits, 12, seed=2)
+    y = himmelblau(x)
+    return metamodel.krg_incremental(x, y), limits, float(np.min(y))
+
+
+@pytest.mark.parametrize("name", ["lcb", "ei", "pi", "max_variance"])
+def test_acquisitions_are_batched_and_gradients_match(surrogate, name):
+    """
+    Arrange: Train a metamodel and choose some points.
+    Act: Evaluate a registered acquisition function in all points at once
+        and point by point.
+    Assert: The values agree and the gradient agrees with central finite
+        differences.
+    """
+    sm, _, y_min = surrogate
+    fun, gradient, _ = acquisition.get(name)
+    points = np.random.uniform(-4.0, 4.0, (6, 2))
+    h = 1e-6
+
+    values = fun(sm, points, y_min)
+    single = [fun(sm, point, y_min)[0] for point in points]
+    differences = np.column_stack(
+        [
+            (fun(sm, points + h * e, y_min) - fun(sm, points - h * e, y_min))
+            / (2 * h)
+            for e in np.eye(2)
+        ]
+    )
+
+    assert values.shape == (6,)
+    np.testing.assert_allclose(values, single, rtol=1e-10)
+    np.testing.assert_allclose(
+        gradient(sm, points, y_min), differences, rtol=1e-4, atol=1e-6
+    )
+
+
+@pytest.mark.parametrize("name", ["lcb", "ei", "pi", "max_variance"])
+def test_search_finds_best_candidate(surrogate, name):
+    """
+    Arrange: Train a metamodel and evaluate an acquisition function on a
+        grid.
+    Act: Search the most promising point.
+    Assert: The point lies inside the limits and is at least as good as the
+        best grid point.
+    """
+    sm, limits, y_min = surrogate
+    fun, _, maximize = acquisition.get(name)
+    grid = sampling.full_factorial(limits, 400)
+    sign = -1.0 if maximize else 1.0
+
+    point = acquisition.search(sm, limits, y_min, name)
+
+    assert np.all(point >= limits[:, 0]) and np.all(point <= limits[:, 1])
+    assert sign * fun(sm, point, y_min)[0] <= np.min(
+        sign * fun(sm, grid, y_min)
+    ) + 1e-6 * np.max(np.abs(fun(sm, grid, y_min)))
+
+
+def test_register_and_unknown_names(surrogate, monkeypatch):
+    """
+    Arrange: Register an own acquisition function without gradient in a
+        copy of the registry, which is restored after the test.
+    Act: Search its optimum and ask for an unknown function.
+    Assert: The own function is optimized by finite differences and the
+        unknown name raises a ValueError.
+    """
+    sm, limits, y_min = surrogate
+    monkeypatch.setattr(
+        acquisition, "ACQUISITIONS", dict(acquisition.ACQUISITIONS)
+    )
+
+    def distance(sm, x, y_min):
+        return np.sum((x - 1.0) ** 2, axis=1)
+
+    acquisition.register("distance", distance, maximize=False)
+
+    point = acquisition.search(sm, limits, y_min, "distance")
+
+    np.testing.assert_allclose(point, [1.0, 1.0], atol=1e-4)
+    with pytest.raises(ValueError):
+        acquisition.get("unknown")
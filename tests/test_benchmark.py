@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: test_benchmark
+.. moduleauthor:: Jan Kleinert <jan.kleinert@dlr.de>
+
+This is the test module for the benchmark problems and the benchmark
+harness.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+import treeopt.benchmark as benchmark
+import treeopt.harness as harness
+
+
+@pytest.mark.parametrize("name", benchmark.PROBLEMS)
+def test_problems_are_vectorized_with_known_minima(name):
+    """
+    Arrange: Get a benchmark problem and random points in its design space.
+    Act: Evaluate the problem in all points at once and point by point.
+    Assert: Both agree, the known minima have the known value and no random
+        point is below it.
+    """
+    np.random.seed(0)
+    problem = benchmark.get_problem(name)
+    x = np.random.uniform(
+        problem.limits[:, 0], problem.limits[:, 1], (500, problem.dim)
+    )
+
+    y = problem(x)
+
+    assert y.shape == (500,)
+    np.testing.assert_allclose(y, [problem(xi)[0] for xi in x])
+    np.testing.assert_allclose(
+        problem(problem.x_opt), problem.f_opt, atol=1e-6
+    )
+    assert np.min(y) >= problem.f_opt - 1e-9
+
+
+def test_corrected_formulas():
+    """
+    Arrange: Choose points with values known from the literature.
+    Act: Evaluate Rastrigin, Michalewicz and the rotated hyper-ellipsoid.
+    Assert: The values agree with the literature.
+    """
+    np.testing.assert_allclose(
+        benchmark.rastrigin_function(np.ones((1, 3))), [3.0]
+    )
+    np.testing.assert_allclose(
+        benchmark.rotated_hyper_ellipsoid_function(np.array([[1.0, 2.0]])),
+        [1.0 + 5.0],
+    )
+    assert benchmark.get_problem("michalewicz", dim=5).f_opt == -4.687658
+    assert benchmark.get_problem("rastrigin", dim=10).limits.shape == (10, 2)
+    with pytest.raises(ValueError):
+        benchmark.get_problem("unknown")
+
+
+@pytest.mark.parametrize("optimizer", list(harness.OPTIMIZERS))
+def test_harness_reports_runs(tmp_path, optimizer):
+    """
+    Arrange: Choose a small budget on the Matyas function.
+    Act: Run the optimizer with the harness and write the results.
+    Assert: The budget is kept and the report contains the run.
+    """
+    path = str(tmp_path / "results.json")
+
+    results = harness.run_suite(
+        ["matyas"], [optimizer], path=path, budget=12, num_doe=6, tol=1.0
+    )
+
+    result = results[0]
+    assert result["evaluations"] <= 12
+    assert result["gap"] == result["best"] >= 0.0
+    assert result["evaluations_to_target"] is not None
+    assert result["overhead"] >= 0.0
+    assert json.load(open(path)) == results
+    assert optimizer in harness.report(results)
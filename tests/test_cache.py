@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: test_cache
+.. moduleauthor:: Jan Kleinert <jan.kleinert@dlr.de>
+
+This is the test module for the EvaluationCache of the cache module.
+"""
+
+import functools
+import threading
+
+import numpy as np
+import pytest
+
+from treeopt.cache import EvaluationCache, function_identity
+from treeopt.treeOpt import adaptive_metamodell
+
+
+def sphere(x, *args):
+    """Vectorized test function returning one value per row of x."""
+    return np.sum(np.atleast_2d(x) ** 2, axis=1) + sum(args)
+
+
+def test_cache_survives_new_instances(tmp_path):
+    """
+    Arrange: Store a response in a cache.
+    Act: Look the point up in a new cache on the same directory.
+    Assert: The response is found, but not for other arguments.
+    """
+    EvaluationCache(str(tmp_path)).store(sphere, (1.0,), [1.0, 2.0], [6.0])
+
+    cache = EvaluationCache(str(tmp_path))
+
+    np.testing.assert_array_equal(
+        cache.lookup(sphere, (1.0,), np.array([1.0, 2.0])), [6.0]
+    )
+    assert cache.lookup(sphere, (2.0,), np.array([1.0, 2.0])) is None
+
+
+def test_tolerance_lookup_finds_near_duplicates(tmp_path):
+    """
+    Arrange: Store a response in a cache with and without tolerance.
+    Act: Look up a point that differs by floating point noise.
+    Assert: Only the cache with tolerance finds the point.
+    """
+    exact = EvaluationCache(str(tmp_path))
+    exact.store(sphere, (), [1.0, 2.0], [5.0])
+    near = EvaluationCache(str(tmp_path), tol=1e-8)
+
+    assert exact.lookup(sphere, (), [1.0 + 1e-9, 2.0]) is None
+    np.testing.assert_array_equal(
+        near.lookup(sphere, (), [1.0 + 1e-9, 2.0]), [5.0]
+    )
+
+
+def test_adaptive_metamodell_skips_cached_points(tmp_path):
+    """
+    Arrange: Create an optimizer with a cache and a counting cost function,
+        which is identified by a key, as its closure changes.
+    Act: Evaluate the same points twice.
+    Assert: The cost function is only called for the first evaluation.
+    """
+    calls = []
+
+    def counting_sphere(x, *args):
+        calls.append(x)
+        return sphere(x)
+
+    opt = adaptive_metamodell()
+    opt.set_cost_function(counting_sphere)
+    opt.set_cache(EvaluationCache(str(tmp_path), key="sphere"))
+    opt.eval_times = np.zeros(0)
+    x = np.random.uniform(size=(5, 2))
+
+    y_first = opt.evaluate_points(x)
+    y_second = opt.evaluate_points(x)
+
+    assert len(calls) == 5
+    np.testing.assert_array_equal(y_first, y_second)
+
+
+def shifted_sphere(x, shift=0.0):
+    """Vectorized test function with a keyword argument."""
+    return np.sum((np.atleast_2d(x) - shift) ** 2, axis=1)
+
+
+def test_partials_and_lambdas_get_different_identities(tmp_path):
+    """
+    Arrange: Two partials with different keywords, two lambdas with
+        different bodies and two lambdas with different closure values.
+    Act: Store a response of the first of each pair and look the point up
+        with the second one.
+    Assert: The identities differ and the second function misses the cache,
+        while an equal partial hits it.
+    """
+    first = functools.partial(shifted_sphere, shift=1.0)
+    second = functools.partial(shifted_sphere, shift=2.0)
+
+    def make_scaled(factor):
+        return lambda x: factor * sphere(x)
+
+    pairs = [
+        (first, second),
+        (lambda x: sphere(x), lambda x: sphere(x) + 1.0),
+        (make_scaled(1.0), make_scaled(2.0)),
+    ]
+    cache = EvaluationCache(str(tmp_path))
+
+    for fun_a, fun_b in pairs:
+        cache.store(fun_a, (), [1.0, 2.0], fun_a(np.array([1.0, 2.0])))
+
+        assert function_identity(fun_a) != function_identity(fun_b)
+        assert cache.lookup(fun_b, (), [1.0, 2.0]) is None
+    np.testing.assert_array_equal(
+        cache.lookup(functools.partial(shifted_sphere, shift=1.0), (), [1, 2]),
+        [1.0],
+    )
+
+
+def test_unidentifiable_functions_need_a_key(tmp_path):
+    """
+    Arrange: A cost function with a lock in its closure, which can not be
+        pickled.
+    Act: Look a point up with and without a key.
+    Assert: Without a key the cache refuses the function, with a key the
+        point is cached.
+    """
+    lock = threading.Lock()
+
+    def locked_sphere(x, *args):
+        with lock:
+            return sphere(x)
+
+    with pytest.raises(ValueError):
+        EvaluationCache(str(tmp_path)).lookup(locked_sphere, (), [1.0, 2.0])
+
+    cache = EvaluationCache(str(tmp_path), key="locked_sphere")
+    cache.store(locked_sphere, (), [1.0, 2.0], [5.0])
+    np.testing.assert_array_equal(
+        cache.lookup(locked_sphere, (), [1.0, 2.0]), [5.0]
+    )
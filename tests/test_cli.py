@@ -9,6 +9,8 @@ This is the test module for the project's command-line interface (CLI)
 module.
 """
 # fmt: off
+import logging
+
 import treeopt.cli as cli
 from treeopt import __version__
 # fmt: on
@@ -54,3 +56,31 @@ def test_hello_displays_expected_message():
     assert 'treeopt' in result.output.strip(), \
         "'Hello' messages should contain the CLI name."
     # fmt: on
+
+
+def test_verbosity_sets_library_log_level():
+    """
+    Arrange/Act: Run the `version` subcommand with the '-vvvv' flag.
+    Assert: The treeopt loggers are set to DEBUG.
+    """
+    runner: CliRunner = CliRunner()
+    result: Result = runner.invoke(cli.cli, ["-vvvv", "version"])
+    assert result.exit_code == 0
+    assert logging.getLogger("treeopt").level == logging.DEBUG
+    logging.getLogger("treeopt").setLevel(logging.NOTSET)
+
+
+def test_scaling_measures_metamodels(tmp_path):
+    """
+    Arrange/Act: Run the `scaling` subcommand for one small configuration.
+    Assert: One line per measurement is printed and the results are written.
+    """
+    output = tmp_path / "scaling.json"
+    runner: CliRunner = CliRunner()
+    result: Result = runner.invoke(
+        cli.cli,
+        ["scaling", "-m", "rbf", "-n", "20", "-d", "2", "-o", str(output)],
+    )
+    assert result.exit_code == 0
+    assert "rbf" in result.output
+    assert output.exists()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: test_datastore
+.. moduleauthor:: Jan Kleinert <jan.kleinert@dlr.de>
+
+This is the test module for the SampleStore of the datastore module.
+"""
+
+import numpy as np
+
+from treeopt.datastore import SampleStore
+
+
+def test_append_grows_capacity_and_keeps_data():
+    """
+    Arrange: Create a store with a small capacity.
+    Act: Append more points than fit into the first buffer.
+    Assert: All points and responses are kept in the order of appending.
+    """
+    store = SampleStore(capacity=2)
+    x = np.random.uniform(size=(9, 3))
+
+    store.x = x[:3]
+    store.y = np.arange(3.0)
+    for xi, yi in zip(x[3:], np.arange(3.0, 9.0)):
+        store.append(xi, yi)
+
+    assert len(store) == 9
+    assert store.x.dtype == np.float64 and store.x.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(store.x, x)
+    np.testing.assert_array_equal(store.y, np.arange(9.0).reshape(-1, 1))
+
+
+def test_views_stay_valid_after_growing():
+    """
+    Arrange: Fill a store and keep a view of its points.
+    Act: Append enough points to reallocate the buffer.
+    Assert: The old view still holds the old points.
+    """
+    store = SampleStore(capacity=1)
+    store.append_x([0.0, 1.0])
+    view = store.x
+
+    for i in range(10):
+        store.append_x([i, i])
+
+    np.testing.assert_array_equal(view, [[0.0, 1.0]])
+    assert store.x.shape == (11, 2)
+
+
+def test_index_matches_brute_force_search():
+    """
+    Arrange: Append enough points one by one to build several k-d trees.
+    Act: Search the nearest point, the points within a radius and a stored
+        point.
+    Assert: The results equal those of a brute force search.
+    """
+    store = SampleStore()
+    x = np.random.uniform(size=(300, 3))
+    for xi in x:
+        store.append_x(xi)
+    point = np.random.uniform(size=3)
+    distances = np.linalg.norm(x - point, axis=1)
+
+    distance, row = store.nearest(point)
+    rows = store.query_radius(point, 0.3)
+
+    assert row == np.argmin(distances)
+    assert np.isclose(distance, distances.min())
+    np.testing.assert_array_equal(
+        rows, np.argsort(distances)[: np.sum(distances <= 0.3)]
+    )
+    assert store.find(x[123]) == 123
+    assert store.find(x[123] + 1e-12) is None
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: test_ego
+.. moduleauthor:: Jan Kleinert <jan.kleinert@dlr.de>
+
+This is the test module for the OptimizeEGO class of the ego module.
+"""
+
+import numpy as np
+
+import treeopt.termination as termination
+from treeopt.ego import OptimizeEGO
+
+
+def problem(x):
+    """One dimensional test function with several local minima."""
+    return np.sin(10 * np.pi * x[0]) / (2 * x[0]) + (x[0] - 1) ** 4
+
+
+def test_checkpoint_restores_simulated_data(tmp_path):
+    """
+    Arrange: Simulate points with a checkpoint set.
+    Act: Restore the checkpoint in a new object and request the same points.
+    Assert: The points are not simulated again.
+    """
+    ego = OptimizeEGO()
+    ego.opti_object = problem
+    ego.checkpoint = str(tmp_path / "ego.npz")
+    x = np.array([[0.5], [1.5], [2.5]])
+    y = ego.solve_problem(x)
+
+    resumed = OptimizeEGO()
+    resumed.opti_object = None
+    resumed.checkpoint = ego.checkpoint
+
+    assert resumed.load_checkpoint()
+    np.testing.assert_array_equal(resumed.solve_problem(x), y)
+    assert resumed.num_evals == 3
+
+
+def test_near_duplicates_are_not_simulated():
+    """
+    Arrange: Simulate a point with a duplicate radius set.
+    Act: Request a point that differs only by floating point noise.
+    Assert: The known result is returned without a new simulation.
+    """
+    ego = OptimizeEGO()
+    ego.opti_object = problem
+    ego.duplicate_radius = 1e-9
+    y = ego.solve_problem(np.array([[1.5]]))
+
+    np.testing.assert_array_equal(
+        ego.solve_problem(np.array([[1.5 + 1e-12]])), y
+    )
+    assert ego.num_evals == 1
+
+
+def test_min_distance_is_updated_incrementally():
+    """
+    Arrange: Simulate random points.
+    Act: Read the minimum distance.
+    Assert: It equals the smallest pairwise distance of all points.
+    """
+    ego = OptimizeEGO()
+    ego.opti_object = problem
+    x = np.random.uniform(0.5, 2.5, (40, 1))
+    ego.solve_problem(x)
+
+    distances = np.abs(x - x.T)[np.triu_indices(40, 1)]
+
+    assert np.isclose(ego.min_distance, distances.min())
+    assert ego.calc_min_distance() == ego.min_distance
+
+
+def test_do_ego_improves_on_initial_points():
+    """
+    Arrange: Create an EGO optimization with three initial points.
+    Act: Run the optimization.
+    Assert: A minimum far below the initial points is found within the
+        evaluation budget and the surrogate is kept after the run.
+    """
+    np.random.seed(1)
+    ego = OptimizeEGO()
+    ego.opti_object = problem
+    ego.x_limits = np.array([[0.5, 2.5]])
+    ego.doe_data = np.array([[0.5], [1.5], [2.5]])
+    ego.max_evals = 25
+
+    ego.do_ego(0.0078125)
+
+    assert ego.num_evals <= 25
+    assert ego.min_distance < 0.0078125 or ego.num_evals == 25
+    assert ego.y_opt[0] < -0.6
+    assert ego.surrogate is not None
+
+
+def test_do_ego_stops_with_termination_policy():
+    """
+    Arrange: Create an EGO optimization with an iteration limit as
+        additional termination policy.
+    Act: Run the optimization.
+    Assert: It stops after the iterations of the policy.
+    """
+    np.random.seed(1)
+    ego = OptimizeEGO()
+    ego.opti_object = problem
+    ego.x_limits = np.array([[0.5, 2.5]])
+    ego.doe_data = np.array([[0.5], [1.5], [2.5]])
+    ego.max_evals = 25
+    ego.termination = termination.MaxIterations(2)
+
+    ego.do_ego(1e-12)
+
+    assert ego.num_evals == 5
+    assert ego.termination_reason == "MaxIterations(2)"
+
+
+def test_resume_within_doe_simulates_the_missing_points(tmp_path):
+    """
+    Arrange: Simulate the first half of the initial points with a
+        checkpoint set, as if the run crashed within the DoE.
+    Act: Resume the EGO optimization from the checkpoint.
+    Assert: Every initial point is simulated exactly once.
+    """
+    calls = []
+
+    def counting_problem(x):
+        calls.append(x[0])
+        return problem(x)
+
+    doe = np.linspace(0.5, 2.5, 8)[:, np.newaxis]
+    ego = OptimizeEGO()
+    ego.opti_object = counting_problem
+    ego.checkpoint = str(tmp_path / "ego.npz")
+    ego.solve_problem(doe[:4])
+
+    np.random.seed(1)
+    resumed = OptimizeEGO()
+    resumed.opti_object = counting_problem
+    resumed.checkpoint = ego.checkpoint
+    resumed.x_limits = np.array([[0.5, 2.5]])
+    resumed.doe_data = doe
+    resumed.termination = termination.MaxIterations(1)
+    resumed.do_ego(1e-12, resume=True)
+
+    np.testing.assert_array_equal(np.sort(calls[:8]), doe[:, 0])
+    assert len(calls) == 9
+    assert resumed.num_evals == 9
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: test_evaluate
+.. moduleauthor:: Jan Kleinert <jan.kleinert@dlr.de>
+
+This is the test module for the evaluation methods of the evaluate module.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import treeopt.evaluate as evaluate
+
+
+def sphere(x, offset=0.0):
+    """Vectorized test function returning one value per row of x."""
+    return np.sum(np.atleast_2d(x) ** 2, axis=1) + offset
+
+
+@pytest.mark.parametrize(
+    "method",
+    [
+        evaluate.serial,
+        evaluate.thread_pool,
+        evaluate.process_pool,
+        evaluate.vectorized,
+    ],
+)
+def test_evaluators_keep_doe_order(method):
+    """
+    Arrange: Sample points in the design space.
+    Act: Evaluate them with each evaluation method.
+    Assert: Results are in the order of the points and each point is timed.
+    """
+    x = np.random.uniform(-1, 1, (7, 3))
+
+    y, times = method(sphere, x, (1.0,), 2)
+
+    assert y.shape == (7, 1)
+    np.testing.assert_allclose(y[:, 0], sphere(x, 1.0))
+    assert times.shape == (7,)
+    assert np.all(times >= 0)
+
+
+def test_callback_reports_every_point():
+    """
+    Arrange: Sample points and a callback that records its calls.
+    Act: Evaluate the points in a thread pool.
+    Assert: The callback was called once for every point.
+    """
+    x = np.random.uniform(-1, 1, (5, 2))
+    calls = []
+
+    evaluate.thread_pool(sphere, x, callback=lambda i, yi, t: calls.append(i))
+
+    assert sorted(calls) == list(range(5))
+
+
+def test_batch_evaluator_combines_concurrent_requests():
+    """
+    Arrange: A batch evaluator for three threads, each requesting a
+        different number of points in each of three rounds, one thread
+        finishing early.
+    Act: Run the threads.
+    Assert: The concurrent requests are evaluated in one call per round and
+        every thread gets the responses of its own points.
+    """
+    calls = []
+    evaluator = evaluate.BatchEvaluator(
+        sphere, 3, (1.0,), callback=lambda x, y: calls.append(len(x))
+    )
+
+    def client(num_points, num_rounds):
+        responses = []
+        for _ in range(num_rounds):
+            x = np.random.uniform(-1, 1, (num_points, 2))
+            responses.append((evaluator(x), sphere(x, 1.0)))
+        evaluator.finish()
+        return responses
+
+    with ThreadPoolExecutor(3) as executor:
+        jobs = [executor.submit(client, k, 3 - (k == 1)) for k in (1, 2, 3)]
+        responses = [r for job in jobs for r in job.result()]
+
+    assert calls == [6, 6, 5]
+    assert evaluator.num_calls == 3
+    for y, expected in responses:
+        np.testing.assert_allclose(y[:, 0], expected)
+
+
+def test_batch_evaluator_passes_errors_to_all_threads():
+    """
+    Arrange: A batch evaluator for two threads and a failing cost function.
+    Act: Request points from both threads.
+    Assert: Both threads get the error.
+    """
+
+    def failing(x):
+        raise RuntimeError("simulation failed")
+
+    evaluator = evaluate.BatchEvaluator(failing, 2)
+
+    with ThreadPoolExecutor(2) as executor:
+        jobs = [executor.submit(evaluator, np.zeros(2)) for _ in range(2)]
+
+        for job in jobs:
+            with pytest.raises(RuntimeError):
+                job.result()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: test_instrument
+.. moduleauthor:: Jan Kleinert <jan.kleinert@dlr.de>
+
+This is the test module for the instrumentation of the optimization loops.
+"""
+
+import copy
+import time
+
+import numpy as np
+
+import treeopt.instrument as instrument
+import treeopt.metamodel as metamodel
+from treeopt.ego import OptimizeEGO
+from treeopt.treeOpt import adaptive_metamodell, least_squares
+
+
+def himmelblau(x, *args):
+    """Himmelblau function, returns one value per row of x."""
+    return (x[:, 0] ** 2 + x[:, 1] - 11) ** 2 + (
+        x[:, 0] + x[:, 1] ** 2 - 7
+    ) ** 2
+
+
+def test_nested_phases_and_counted_predictions(tmp_path):
+    """
+    Arrange: Create an instrumentation with a trace file and a callback and
+        wrap a metamodel.
+    Act: Time nested phases, predict with the metamodel and a deep copy of
+        it and emit an event.
+    Assert: Inner phases are not counted in the outer phase, all predictions
+        are counted and the event reaches the callback and the trace file.
+    """
+    events = []
+    trace = str(tmp_path / "trace" / "run.jsonl")
+    ins = instrument.Instrumentation(
+        trace, callback=events.append, keep_records=True
+    )
+    x = np.random.rand(8, 2)
+    sm = ins.wrap(metamodel.krg_incremental(x, himmelblau(x).reshape(-1, 1)))
+
+    with ins.phase("outer"):
+        with ins.phase("inner"):
+            time.sleep(0.05)
+    sm.predict_values(x)
+    copy.deepcopy(sm).predict_variances(x[:3])
+    ins.emit("iteration", ite=np.int64(1))
+
+    record = instrument.read_trace(trace)[0]
+    assert events[0] is ins.records[0]
+    assert record["ite"] == 1
+    assert record["time"]["inner"] >= 0.05
+    assert record["time"]["outer"] < 0.05
+    assert record["predict_calls"] == {
+        "predict_values": 1,
+        "predict_variances": 1,
+    }
+    assert record["predicted_points"] == 11
+    assert ins.wrap(sm) is sm
+    assert sm.num_training_points == 8
+
+
+def test_records_are_only_kept_on_request():
+    """
+    Arrange: Create an instrumentation with the default options.
+    Act: Time a phase and emit many events.
+    Assert: No event is kept, but the summary holds the totals.
+    """
+    ins = instrument.Instrumentation()
+
+    for _ in range(1000):
+        with ins.phase("simulation"):
+            pass
+        ins.emit("evaluation")
+
+    assert ins.records == []
+    assert ins.summary()["time"]["simulation"] > 0
+
+
+def test_adaptive_metamodell_reports_phases(tmp_path):
+    """
+    Arrange: Set an instrumentation with a trace file on an adaptive
+        optimization with checkpoint.
+    Act: Run the optimization.
+    Assert: The trace holds the initial sampling, one event per iteration
+        with all phases and predictions, and the end of the run.
+    """
+    opt = adaptive_metamodell()
+    opt.set_limits(np.array([[-5.0, 5.0], [-5.0, 5.0]]))
+    opt.set_num_doe(10)
+    opt.set_cost_function(himmelblau)
+    opt.set_checkpoint(str(tmp_path / "run.npz"))
+    trace = str(tmp_path / "trace.jsonl")
+    opt.set_instrumentation(instrument.Instrumentation(trace))
+
+    opt.optimize()
+
+    events = instrument.read_trace(trace)
+    assert [event["event"] for event in events] == (
+        ["doe"] + ["iteration"] * 5 + ["end"]
+    )
+    assert set(events[1]["time"]) == {
+        "simulation",
+        "fit",
+        "acquisition",
+        "minimum",
+        "io",
+    }
+    assert events[1]["predict_calls"]["predict_values"] > 0
+    assert events[-1]["num_evals"] == 15
+    assert events[-1]["termination"] == "MaxIterations(5)"
+
+
+def test_least_squares_and_ego_report_events():
+    """
+    Arrange: Set instrumentations with callbacks on a least squares and an
+        EGO optimization.
+    Act: Run both optimizations.
+    Assert: Least squares reports each evaluation of the cost function
+        (including those of the finite difference Jacobian), EGO each
+        iteration, and both report the end of the run.
+    """
+    events = []
+    ls = least_squares()
+    ls.set_cost_function(lambda x: np.array([x[0] - 1.0, 2 * (x[1] + 0.5)]))
+    ls.set_start_point(np.array([0.0, 0.0]))
+    ls.set_limits(([-2.0, -2.0], [2.0, 2.0]))
+    ls.set_instrumentation(instrument.Instrumentation(callback=events.append))
+
+    res = ls.optimize()
+
+    assert len(events) == ls.num_evals + 1
+    assert ls.num_evals > res.nfev
+    assert events[-1]["event"] == "end"
+    assert events[-2]["cost"] >= events[-1]["cost"] - 1e-12
+
+    np.random.seed(1)
+    ego = OptimizeEGO()
+    ego.opti_object = lambda x: np.sin(3 * x[0]) + 0.1 * x[0]
+    ego.x_limits = np.array([[0.0, 3.0]])
+    ego.doe_data = np.array([[0.0], [1.5], [3.0]])
+    ego.max_evals = 6
+    ego.instrumentation = instrument.Instrumentation(keep_records=True)
+
+    ego.do_ego(1e-6)
+
+    names = [event["event"] for event in ego.instrumentation.records]
+    assert names == ["doe"] + ["iteration"] * ego.state.ite + ["end"]
+    assert "acquisition" in ego.instrumentation.records[1]["time"]
+    assert ego.instrumentation.summary()["predicted_points"] > 0
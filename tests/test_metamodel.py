@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: test_metamodel
+.. moduleauthor:: Jan Kleinert <jan.kleinert@dlr.de>
+
+This is the test module for the metamodels of the metamodel module.
+"""
+
+import logging
+import warnings
+
+import numpy as np
+import pytest
+
+import treeopt.metamodel as metamodel
+
+
+def himmelblau(x):
+    """Himmelblau function, returns one row per row of x."""
+    x = np.atleast_2d(x)
+    return (
+        (x[:, 0] ** 2 + x[:, 1] - 11) ** 2 + (x[:, 0] + x[:, 1] ** 2 - 7) ** 2
+    ).reshape(-1, 1)
+
+
+def test_update_equals_factorization_of_extended_matrix():
+    """
+    Arrange: Train an incremental kriging metamodel.
+    Act: Update it with new points below the refit interval.
+    Assert: The extended Cholesky factor reproduces the correlation matrix of
+        all points and the metamodel interpolates the new points.
+    """
+    np.random.seed(0)
+    x = np.random.uniform(-5, 5, (20, 2))
+    x_new = np.random.uniform(-5, 5, (4, 2))
+    sm = metamodel.IncrementalKriging(
+        refit_interval=100, likelihood_tol=np.inf
+    )
+    sm.set_training_values(x, himmelblau(x))
+    sm.train()
+
+    sm.update(x_new, himmelblau(x_new))
+
+    n = sm.num_training_points
+    X = sm._X[:n]
+    R = sm._correlation(X, X) + sm.nugget * np.eye(n)
+    L = sm._L[:n, :n]
+    assert n == 24 and sm.num_refits == 1
+    np.testing.assert_allclose(L @ L.T, R, atol=1e-10)
+    np.testing.assert_allclose(
+        sm.predict_values(x_new), himmelblau(x_new), rtol=1e-4
+    )
+    assert np.all(
+        sm.predict_variances(x_new)
+        < 1e-3 * sm.predict_variances(np.array([[4.9, -4.9]]))
+    )
+
+
+def test_hyperparameters_are_refitted_after_interval():
+    """
+    Arrange: Train an incremental kriging metamodel with a refit interval.
+    Act: Update it point by point.
+    Assert: The hyperparameters are optimized again after the interval.
+    """
+    np.random.seed(1)
+    x = np.random.uniform(-5, 5, (15, 2))
+    sm = metamodel.krg_incremental(x, himmelblau(x))
+    sm.refit_interval = 3
+
+    for xi in np.random.uniform(-5, 5, (3, 2)):
+        sm.update(xi, himmelblau(xi))
+
+    assert sm.num_refits >= 2
+    assert sm.num_training_points == 18
+
+
+def test_derivatives_match_finite_differences():
+    """
+    Arrange: Train an incremental kriging metamodel.
+    Act: Compute the derivatives of prediction and variance.
+    Assert: They match central finite differences.
+    """
+    np.random.seed(2)
+    x = np.random.uniform(-5, 5, (20, 2))
+    sm = metamodel.krg_incremental(x, himmelblau(x))
+    points = np.random.uniform(-4, 4, (3, 2))
+    h = 1e-5
+
+    for kx in range(2):
+        step = np.zeros(2)
+        step[kx] = h
+        fd_value = (
+            sm.predict_values(points + step) - sm.predict_values(points - step)
+        ) / (2 * h)
+        fd_variance = (
+            sm.predict_variances(points + step)
+            - sm.predict_variances(points - step)
+        ) / (2 * h)
+
+        np.testing.assert_allclose(
+            sm.predict_derivatives(points, kx), fd_value, rtol=1e-4, atol=1e-6
+        )
+        np.testing.assert_allclose(
+            sm.predict_variance_derivatives(points, kx),
+            fd_variance,
+            rtol=1e-3,
+            atol=1e-6,
+        )
+
+
+def test_local_kriging_bounds_parts_and_splits_on_update():
+    """
+    Arrange: Train a mixture of local kriging metamodels with small parts.
+    Act: Update it with many points in one corner of the design space.
+    Assert: No part is larger than max_points after the training, the
+        crowded part is split, all points are kept and the metamodel
+        interpolates the new points with small variances.
+    """
+    np.random.seed(3)
+    x = np.random.uniform(-5, 5, (40, 2))
+    x_new = np.random.uniform(3, 5, (20, 2))
+    sm = metamodel.LocalKriging(max_points=10)
+    sm.set_training_values(x, himmelblau(x))
+    sm.train()
+    num_parts = len(sm.experts)
+
+    sm.update(x_new, himmelblau(x_new))
+
+    assert num_parts >= 4
+    assert len(sm.experts) > num_parts
+    assert sm.num_training_points == 60
+    assert sum(e.num_training_points for e in sm.experts) == 60
+    np.testing.assert_allclose(
+        sm.predict_values(x_new), himmelblau(x_new), rtol=1e-2, atol=1e-2
+    )
+    assert np.all(sm.predict_variances(x_new) < 1e-2)
+
+
+def test_local_kriging_is_continuous_between_parts():
+    """
+    Arrange: Train a mixture of local kriging metamodels with several parts.
+    Act: Predict along a fine line through the design space.
+    Assert: Predictions and variances have no jumps and the variances are
+        not negative.
+    """
+    np.random.seed(4)
+    x = np.random.uniform(-5, 5, (60, 2))
+    sm = metamodel.krg_local(x, himmelblau(x), max_points=15)
+    line = np.column_stack(
+        [np.linspace(-5, 5, 2001), np.linspace(-4, 4, 2001)]
+    )
+
+    values = sm.predict_values(line)[:, 0]
+    variances = sm.predict_variances(line)[:, 0]
+
+    assert np.max(np.abs(np.diff(values))) < 2.0
+    assert np.all(variances >= 0)
+    assert np.max(np.abs(np.diff(variances))) < 0.1 * np.max(variances) + 1e-6
+
+
+def test_several_outputs_share_hyperparameters_quietly(capsys, caplog):
+    """
+    Arrange: Training points with two outputs, as the residual vectors of
+        the surrogate mode of least_squares.
+    Act: Train an incremental kriging metamodel with the loggers at DEBUG.
+    Assert: smt fits one set of hyperparameters for both outputs, the
+        metamodel interpolates both outputs, nothing is printed or warned
+        and the multi-output warning of smt is logged instead.
+    """
+    np.random.seed(6)
+    x = np.random.uniform(-5, 5, (20, 2))
+    y = np.hstack([himmelblau(x), np.sin(x[:, :1])])
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        with caplog.at_level(logging.DEBUG, logger="treeopt"):
+            sm = metamodel.krg_incremental(x, y)
+
+    assert sm.optimal_theta.shape == (2,)
+    np.testing.assert_allclose(sm.predict_values(x), y, atol=1e-2)
+    assert "fmin_cobyla" not in capsys.readouterr().out
+    messages = [record.getMessage() for record in caplog.records]
+    assert any("multiple" in m for m in messages)
+
+
+@pytest.mark.parametrize(
+    "factory", [metamodel.krg_incremental, metamodel.krg_local]
+)
+def test_kriging_trains_on_a_single_point(factory):
+    """
+    Arrange: A single training point.
+    Act: Train an incremental or local kriging metamodel and update it
+        with two more points.
+    Assert: The predictions are finite before and after the update and
+        the updated metamodel interpolates the new points.
+    """
+    x = np.array([[0.0, 0.0]])
+    x_new = np.array([[1.0, 2.0], [-3.0, 1.0]])
+    x_test = np.array([[0.5, 0.5], [2.0, -1.0]])
+
+    sm = factory(x, himmelblau(x))
+    before = sm.predict_values(x_test)
+    sm.update(x_new, himmelblau(x_new))
+
+    assert np.all(np.isfinite(before))
+    assert np.all(np.isfinite(sm.predict_variances(x_test)))
+    np.testing.assert_allclose(
+        sm.predict_values(x_new), himmelblau(x_new), rtol=1e-4, atol=1e-4
+    )
+
+
+def test_sparse_gaussian_process_predicts_variances():
+    """
+    Arrange: Training points of the Himmelblau function.
+    Act: Train a sparse gaussian process with fewer inducing points.
+    Assert: It approximates the function and provides variances.
+    """
+    np.random.seed(5)
+    x = np.random.uniform(-5, 5, (60, 2))
+    x_test = np.random.uniform(-4, 4, (10, 2))
+
+    sm = metamodel.sgp(x, himmelblau(x), num_inducing=30)
+
+    assert sm.supports["variances"]
+    assert np.all(sm.predict_variances(x_test) >= 0)
+    error = sm.predict_values(x_test) - himmelblau(x_test)
+    assert np.sqrt(np.mean(error ** 2)) < 0.5 * np.std(himmelblau(x))
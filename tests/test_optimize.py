@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: test_optimize
+.. moduleauthor:: Jan Kleinert <jan.kleinert@dlr.de>
+
+This is the test module for the search functions of the optimize module.
+"""
+
+import numpy as np
+import pytest
+
+import treeopt.evaluate as evaluate
+import treeopt.metamodel as metamodel
+import treeopt.optimize as optimize
+import treeopt.sampling as sampling
+
+
+def himmelblau(x):
+    """Himmelblau function, returns one row per row of x."""
+    x = np.atleast_2d(x)
+    return (
+        (x[:, 0] ** 2 + x[:, 1] - 11) ** 2 + (x[:, 0] + x[:, 1] ** 2 - 7) ** 2
+    ).reshape(-1, 1)
+
+
+def double_well(x):
+    """Vectorized function with a local and a global minimum."""
+    return (x[:, 0] ** 2 - 1) ** 2 + x[:, 1] ** 2 + 0.3 * x[:, 0]
+
+
+def test_predict_value_returns_the_prediction_of_one_point():
+    """
+    Arrange: Train a kriging metamodel of the Himmelblau function.
+    Act: Predict the value of a single point with predict_value.
+    Assert: It equals the first row of the metamodel prediction.
+    """
+    x = sampling.latin_hypercube(np.array([[-5, 5], [-5, 5]]), 20, seed=0)
+    sm = metamodel.krg(x, himmelblau(x))
+    point = np.array([1.0, 2.0])
+
+    np.testing.assert_array_equal(
+        optimize.predict_value(point, sm), sm.predict_values(point[None])[0]
+    )
+
+
+def test_kriging_believer_proposes_distinct_points():
+    """
+    Arrange: Train a kriging metamodel on an initial sampling.
+    Act: Propose a batch of four infill points.
+    Assert: The points lie in the design space and are pairwise distinct.
+    """
+    limits = np.array([[-5.0, 5.0], [-5.0, 5.0]])
+    x = sampling.latin_hypercube(limits, 10)
+    y = himmelblau(x)
+    sm = metamodel.krg(x, y)
+
+    points = optimize.kriging_believer(sm, metamodel.krg, x, y, limits, 4)
+
+    assert points.shape == (4, 2)
+    assert np.all(points >= limits[:, 0]) and np.all(points <= limits[:, 1])
+    distances = np.linalg.norm(
+        points[:, np.newaxis, :] - points[np.newaxis, :, :], axis=2
+    )
+    assert np.all(distances[np.triu_indices(4, 1)] > 1e-6)
+
+
+def test_multistart_minimize_finds_global_minimum():
+    """
+    Arrange: Define a vectorized function with several local minima.
+    Act: Minimize it with a multistart search.
+    Assert: The global minimum inside the limits is found.
+    """
+    np.random.seed(0)
+    limits = np.array([[-5.0, 5.0], [-5.0, 5.0]])
+
+    res = optimize.multistart_minimize(double_well, limits, n_starts=4)
+
+    assert res.x[0] < -1.0
+    np.testing.assert_allclose(res.x[1], 0.0, atol=1e-4)
+
+
+@pytest.mark.parametrize(
+    "method", [evaluate.thread_pool, evaluate.process_pool]
+)
+def test_multistart_minimize_runs_refinements_in_pools(method):
+    """
+    Arrange: Define a vectorized function with several local minima on
+        module level, so it can be pickled.
+    Act: Minimize it with the refinements run serially and in a pool.
+    Assert: Both searches find the same minimum.
+    """
+    limits = np.array([[-5.0, 5.0], [-5.0, 5.0]])
+    np.random.seed(0)
+    serial = optimize.multistart_minimize(double_well, limits, n_starts=4)
+    np.random.seed(0)
+
+    res = optimize.multistart_minimize(
+        double_well, limits, n_starts=4, n_workers=2, method=method
+    )
+
+    np.testing.assert_allclose(res.x, serial.x)
+
+
+def test_searches_stay_inside_limits():
+    """
+    Arrange: Train a kriging metamodel on asymmetric limits.
+    Act: Search the minimum and the highest uncertainty.
+    Assert: The points lie inside the limits.
+    """
+    limits = np.array([[1.0, 3.0], [-4.0, -1.0]])
+    x = sampling.latin_hypercube(limits, 10)
+    sm = metamodel.krg(x, himmelblau(x))
+
+    for point in [
+        optimize.find_minimum(sm, limits),
+        optimize.search_higest_uncertainty(sm, limits),
+    ]:
+        assert np.all(point >= limits[:, 0]) and np.all(point <= limits[:, 1])
+
+
+def test_acquisition_gradients_match_finite_differences():
+    """
+    Arrange: Train an incremental kriging metamodel on an initial sampling.
+    Act: Calculate the analytic gradients of the prediction, the standard
+        deviation and the expected improvement.
+    Assert: They agree with central finite differences.
+    """
+    np.random.seed(2)
+    limits = np.array([[-5.0, 5.0], [-5.0, 5.0]])
+    x = sampling.latin_hypercube(limits, 12, seed=2)
+    y = himmelblau(x)
+    sm = metamodel.krg_incremental(x, y)
+    points = np.random.uniform(-4.0, 4.0, (5, 2))
+    y_min = np.min(y)
+    h = 1e-6
+
+    def finite_differences(fun):
+        return np.column_stack(
+            [
+                (fun(points + h * e) - fun(points - h * e)) / (2 * h)
+                for e in np.eye(2)
+            ]
+        )
+
+    assert optimize.supports_gradients(sm, variances=True)
+    np.testing.assert_allclose(
+        optimize.predict_gradients(sm, points),
+        finite_differences(lambda p: sm.predict_values(p)[:, 0]),
+        rtol=1e-4,
+        atol=1e-6,
+    )
+    np.testing.assert_allclose(
+        optimize.predict_std_gradients(sm, points)[1],
+        finite_differences(lambda p: np.sqrt(sm.predict_variances(p)[:, 0])),
+        rtol=1e-4,
+        atol=1e-6,
+    )
+    np.testing.assert_allclose(
+        optimize.expected_improvement_gradient(sm, points, y_min),
+        finite_differences(
+            lambda p: optimize.expected_improvement(sm, p, y_min)
+        ),
+        rtol=1e-4,
+        atol=1e-6,
+    )
+
+
+def test_analytic_gradients_save_predictions():
+    """
+    Arrange: Train a metamodel with derivatives and count its predictions.
+    Act: Search the minimum of the metamodel with and without the gradient.
+    Assert: The analytic gradient needs fewer predictions and finds the same
+        point.
+    """
+    limits = np.array([[-5.0, 5.0], [-5.0, 5.0]])
+    x = sampling.latin_hypercube(limits, 20, seed=7)
+    sm = metamodel.krg_incremental(x, himmelblau(x))
+    calls = []
+    predict_values = sm.predict_values
+
+    def counting_predict_values(points):
+        calls.append(len(points))
+        return predict_values(points)
+
+    sm.predict_values = counting_predict_values
+    results = []
+    for jac in [None, lambda p: optimize.predict_gradients(sm, p)]:
+        del calls[:]
+        np.random.seed(3)
+        results.append(
+            optimize.multistart_minimize(
+                lambda p: sm.predict_values(p)[:, 0],
+                limits,
+                n_starts=1,
+                jac=jac,
+            )
+        )
+        results[-1].calls = len(calls)
+
+    assert results[1].calls < results[0].calls
+    np.testing.assert_allclose(results[1].x, results[0].x, atol=1e-3)
+
+
+def test_supports_gradients():
+    """
+    Arrange: Train a metamodel without variances.
+    Act: Check which gradients it supports.
+    Assert: Only the gradient of the prediction is available.
+    """
+    limits = np.array([[-5.0, 5.0], [-5.0, 5.0]])
+    x = sampling.latin_hypercube(limits, 10)
+    sm = metamodel.rbf(x, himmelblau(x))
+
+    assert optimize.supports_gradients(sm)
+    assert not optimize.supports_gradients(sm, variances=True)
+    assert not optimize.supports_gradients(object())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: test_runlog
+.. moduleauthor:: Jan Kleinert <jan.kleinert@dlr.de>
+
+This is the test module for the append-only RunLog of the runlog module.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from treeopt.runlog import RunLog
+
+
+@pytest.mark.parametrize("file_format", ["csv", "npy"])
+def test_append_writes_only_new_rows(tmp_path, file_format):
+    """
+    Arrange: Create a log in a temporary directory.
+    Act: Append a block of rows and a single row.
+    Assert: Reading the log returns all rows in the order of appending.
+    """
+    log = RunLog(str(tmp_path), "run", file_format)
+    x = np.random.uniform(size=(4, 3))
+    y = np.random.uniform(size=(4, 1))
+
+    log.append(x[:3], y[:3])
+    log.append(x[3], y[3])
+
+    x_read, y_read = log.read()
+    np.testing.assert_allclose(x_read, x)
+    np.testing.assert_allclose(y_read, y)
+
+
+def test_npy_log_is_a_valid_npy_file(tmp_path):
+    """
+    Arrange: Create a binary log and append rows twice.
+    Act: Load the file with numpy.
+    Assert: The file contains all rows and can be memory mapped.
+    """
+    log = RunLog(str(tmp_path), "run", "npy")
+    log.append(np.ones((2, 2)), np.ones((2, 1)))
+    log.append(np.zeros((3, 2)), np.zeros((3, 1)))
+
+    data = np.load(
+        os.path.join(str(tmp_path), "runDoeData.npy"), mmap_mode="r"
+    )
+
+    assert data.shape == (5, 2)
+    np.testing.assert_array_equal(data[:2], 1.0)
+
+
+def test_new_log_overwrites_old_run(tmp_path):
+    """
+    Arrange: Write a log and create a new log with the same name.
+    Act: Append one row to the new log.
+    Assert: Only the row of the new run is read, unless resume is set.
+    """
+    RunLog(str(tmp_path), "run").append(np.ones((2, 2)), np.ones((2, 1)))
+
+    log = RunLog(str(tmp_path), "run")
+    log.append(np.zeros((1, 2)), np.zeros((1, 1)))
+    RunLog(str(tmp_path), "run", resume=True).append(
+        np.zeros((1, 2)), np.zeros((1, 1))
+    )
+
+    assert log.read()[0].shape == (2, 2)
+
+
+def test_npy_append_overwrites_bytes_of_an_interrupted_append(tmp_path):
+    """
+    Arrange: Write a binary log and simulate a crash after the rows of an
+        append were written but before the header was updated.
+    Act: Append another row.
+    Assert: The log contains the logged rows and the new row only.
+    """
+    log = RunLog(str(tmp_path), "run", "npy")
+    log.append(np.ones((2, 2)), np.ones((2, 1)))
+    with open(log.paths["DoeData"], "ab") as file:
+        file.write(np.full((1, 2), 7.0).tobytes()[:11])
+
+    log.append(np.zeros((1, 2)), np.zeros((1, 1)))
+
+    x_read, _ = log.read()
+    np.testing.assert_array_equal(x_read, [[1, 1], [1, 1], [0, 0]])
+
+
+@pytest.mark.parametrize("file_format", ["csv", "npy"])
+def test_trim_truncates_both_logs_to_the_complete_rows(tmp_path, file_format):
+    """
+    Arrange: Write a log and simulate a crash after the points of an append
+        were logged but not their responses, with a partial csv line.
+    Act: Reopen the log with resume, trim it and append a row.
+    Assert: Both files are trimmed to the common rows and continue with the
+        new row.
+    """
+    log = RunLog(str(tmp_path), "run", file_format)
+    log.append(np.ones((2, 2)), np.ones((2, 1)))
+    log._append(log.paths["DoeData"], np.full((1, 2), 5.0))
+    if file_format == "csv":
+        with open(log.paths["DoeResponce"], "a") as file:
+            file.write("5.0")
+
+    resumed = RunLog(str(tmp_path), "run", file_format, resume=True)
+    num_rows = resumed.trim()
+    resumed.append(np.zeros((1, 2)), np.zeros((1, 1)))
+
+    x_read, y_read = resumed.read()
+    assert num_rows == 2
+    np.testing.assert_array_equal(x_read, [[1, 1], [1, 1], [0, 0]])
+    np.testing.assert_array_equal(y_read, [[1], [1], [0]])
+    assert resumed.trim(1) == 1
+    assert resumed.read()[0].shape == (1, 2)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: test_sampling
+.. moduleauthor:: Jan Kleinert <jan.kleinert@dlr.de>
+
+This is the test module for the sampling methods of the design space.
+"""
+
+import time
+
+import numpy as np
+import pytest
+import scipy.stats.qmc as qmc
+
+import treeopt.sampling as sampling
+
+LIMITS = np.array([[-5.0, 5.0], [0.0, 1.0], [10.0, 20.0]])
+
+
+@pytest.mark.parametrize("method", list(sampling.METHODS))
+def test_samplings_are_reproducible(method):
+    """
+    Arrange: Limits of a three dimensional design space.
+    Act: Sample it twice with the same seed and once with another seed.
+    Assert: The points lie within the limits, the same seed returns the same
+        points, another seed returns other points.
+    """
+
+    fun = sampling.METHODS[method]
+
+    x = fun(LIMITS, 40, seed=1)
+
+    assert x.shape == (40, 3)
+    assert np.all(x >= LIMITS[:, 0]) and np.all(x <= LIMITS[:, 1])
+    np.testing.assert_array_equal(x, fun(LIMITS, 40, seed=1))
+    assert not np.array_equal(x, fun(LIMITS, 40, seed=2))
+
+
+def test_samplings_follow_global_seed():
+    """
+    Arrange: Seed numpy's global random number generator.
+    Act: Sample without a seed, seed again and sample again.
+    Assert: Both samplings are equal.
+    """
+
+    np.random.seed(3)
+    x = sampling.latin_hypercube(LIMITS, 20)
+    np.random.seed(3)
+
+    np.testing.assert_array_equal(x, sampling.latin_hypercube(LIMITS, 20))
+
+
+def test_maximin_latin_hypercube_spreads_points():
+    """
+    Arrange: A latin hypercube without optimization (no outer iteration).
+    Act: Optimize it with the enhanced stochastic evolutionary algorithm.
+    Assert: Every column has one point in each of the ndoe intervals and
+        the smallest distance between two points has grown.
+    """
+
+    initial = sampling.maximin_latin_hypercube(
+        LIMITS, 100, seed=0, outer_iterations=0
+    )
+
+    x = sampling.maximin_latin_hypercube(LIMITS, 100, seed=0)
+
+    u = (x - LIMITS[:, 0]) / (LIMITS[:, 1] - LIMITS[:, 0])
+    for column in np.floor(u * 100).T:
+        np.testing.assert_array_equal(np.sort(column), np.arange(100))
+    assert sampling.min_distance(x, LIMITS) > 1.5 * sampling.min_distance(
+        initial, LIMITS
+    )
+
+
+def test_maximin_latin_hypercube_respects_time_limit():
+    """
+    Arrange: A large sampling with many outer iterations.
+    Act: Sample it with a short time limit.
+    Assert: The sampling returns after about one outer iteration.
+    """
+
+    limits = np.array([[0.0, 1.0]] * 5)
+
+    start = time.perf_counter()
+    x = sampling.maximin_latin_hypercube(
+        limits, 1000, seed=0, outer_iterations=1000, time_limit=0.01
+    )
+
+    assert x.shape == (1000, 5)
+    assert time.perf_counter() - start < 10.0
+
+
+def test_low_discrepancy_sequences():
+    """
+    Arrange: Limits of a three dimensional design space.
+    Act: Sample it with the Sobol and Halton sequences and randomly.
+    Assert: The sequences have a lower discrepancy than the random points.
+    """
+
+    def discrepancy(x):
+        u = (x - LIMITS[:, 0]) / (LIMITS[:, 1] - LIMITS[:, 0])
+        return qmc.discrepancy(u)
+
+    random = discrepancy(sampling.random(LIMITS, 128, seed=0))
+
+    assert discrepancy(sampling.sobol(LIMITS, 128, seed=0)) < random
+    assert discrepancy(sampling.halton(LIMITS, 128, seed=0)) < random
+
+
+def test_report_lists_all_methods():
+    """
+    Arrange: Measure all sampling methods for small samplings.
+    Act: Format the report.
+    Assert: The report has a line per method with positive distances.
+    """
+
+    results = sampling.measure(sample_counts=[20], dimensions=[2])
+
+    table = sampling.report(results)
+
+    assert len(results) == len(sampling.METHODS)
+    assert all(result["min_distance"] > 0 for result in results)
+    for method in sampling.METHODS:
+        assert method in table
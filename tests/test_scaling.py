@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: test_scaling
+.. moduleauthor:: Jan Kleinert <jan.kleinert@dlr.de>
+
+This is the test module for the scaling benchmark suite of the metamodels.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+import treeopt.metamodel as metamodel
+import treeopt.scaling as scaling
+from treeopt.treeOpt import adaptive_metamodell
+
+
+@pytest.mark.parametrize(
+    "method, variances",
+    [("krg_incremental", True), ("rbf", False), ("idw", False)],
+)
+def test_measure_returns_costs(method, variances):
+    """
+    Arrange: A small number of training points in two dimensions.
+    Act: Measure a metamodel.
+    Assert: The training time, memory and prediction rates are positive,
+        the variance rate is only measured for metamodels with variances.
+    """
+
+    result = scaling.measure(method, 20, 2, n_predict=50)
+
+    assert (result["method"], result["n"], result["d"]) == (method, 20, 2)
+    assert result["train_time"] > 0
+    assert result["train_memory"] > 0
+    assert result["predict_values_rate"] > 0
+    assert (result["predict_variances_rate"] is not None) == variances
+
+
+def test_sweep_writes_results_and_compares(tmp_path):
+    """
+    Arrange: A small sweep, written to a JSON file.
+    Act: Load the file and compare it with the sweep.
+    Assert: All combinations are measured, the file contains the same
+        measurements and the ratios of identical results are one.
+    """
+    path = tmp_path / "scaling" / "results.json"
+
+    results = scaling.sweep(
+        methods=["rbf", "idw"],
+        sample_counts=(40, 20),
+        dimensions=(2, 3),
+        n_predict=50,
+        path=path,
+    )
+    loaded = scaling.load(path)
+    ratios = scaling.compare(loaded, results)
+
+    configs = [(m["method"], m["n"], m["d"]) for m in results["measurements"]]
+    assert configs == [
+        ("rbf", 20, 2),
+        ("rbf", 40, 2),
+        ("rbf", 20, 3),
+        ("rbf", 40, 3),
+        ("idw", 20, 2),
+        ("idw", 40, 2),
+        ("idw", 20, 3),
+        ("idw", 40, 3),
+    ]
+    assert loaded["measurements"] == results["measurements"]
+    assert "numpy" in loaded["environment"]
+    assert len(ratios) == 8
+    assert all(ratio == pytest.approx(1.0) for ratio in ratios.values())
+
+
+def test_sweep_skips_larger_sample_counts_above_time_limit():
+    """
+    Arrange: A sweep with a time limit, that every training exceeds.
+    Act: Run the sweep.
+    Assert: Only the smallest sample count is measured.
+    """
+
+    results = scaling.sweep(
+        methods=["idw"],
+        sample_counts=(20, 40, 80),
+        dimensions=(2,),
+        n_predict=10,
+        time_limit=1e-12,
+    )
+
+    assert [m["n"] for m in results["measurements"]] == [20]
+
+
+def _measurement(method, n, train_time, variances=True):
+    return {
+        "method": method,
+        "n": n,
+        "d": 2,
+        "train_time": train_time,
+        "train_memory": 0,
+        "predict_values_rate": 1.0,
+        "predict_variances_rate": 1.0 if variances else None,
+        "predict_memory": 0,
+    }
+
+
+def test_choose_surrogate_respects_time_and_variances():
+    """
+    Arrange: Measurements of a slow kriging and a fast rbf metamodel.
+    Act: Choose metamodels for small and large studies.
+    Assert: Kriging is preferred while it is fast enough, rbf is only chosen
+        if no variances are required, large studies are extrapolated.
+    """
+    results = {
+        "measurements": [
+            _measurement("krg", 100, 0.5),
+            _measurement("krg", 1000, 20.0),
+            _measurement("rbf", 1000, 0.1, variances=False),
+        ]
+    }
+
+    assert scaling.choose_surrogate(results, 80, 2) == "krg"
+    assert scaling.choose_surrogate(results, 500, 2) is None
+    assert scaling.choose_surrogate(results, 500, 2, variances=False) == "rbf"
+    assert (
+        scaling.choose_surrogate(results, 100000, 2, variances=False) is None
+    )
+
+
+def test_choose_surrogate_extrapolates_scalable_metamodels_linearly():
+    """
+    Arrange: Measurements of kriging and of the local kriging mixture with
+        equal training times.
+    Act: Choose a metamodel for a study ten times larger than measured.
+    Assert: The cubic cost of kriging is too high, the local mixture is
+        chosen.
+    """
+    results = {
+        "measurements": [
+            _measurement("krg", 500, 0.5),
+            _measurement("krg_local", 500, 0.5),
+        ]
+    }
+
+    assert scaling.choose_surrogate(results, 5000, 2) == "krg_local"
+
+
+def test_adaptive_metamodell_chooses_metamodel_from_sweep(tmp_path):
+    """
+    Arrange: A JSON file with measurements of a slow kriging and a fast
+        incremental kriging metamodel and an optimizer with 10 initial
+        points and 5 iterations.
+    Act: Choose the metamodel of the optimizer from the file.
+    Assert: The incremental kriging is chosen for the 15 points of the
+        study, a study without a metamodel fast enough raises an error.
+    """
+    path = tmp_path / "results.json"
+    with open(path, "w") as file:
+        json.dump(
+            {
+                "measurements": [
+                    _measurement("krg_incremental", 20, 0.1),
+                    _measurement("krg", 20, 20.0),
+                ]
+            },
+            file,
+        )
+    opt = adaptive_metamodell()
+    opt.set_limits(np.array([[-5.0, 5.0], [-5.0, 5.0]]))
+    opt.set_num_doe(10)
+
+    name = opt.set_sm_method_from_scaling(str(path), max_train_time=1.0)
+
+    assert name == "krg_incremental"
+    assert opt.smMethod is metamodel.krg_incremental
+    with pytest.raises(ValueError):
+        opt.set_sm_method_from_scaling(
+            str(path), num_points=100000, max_train_time=1.0
+        )
+
+
+def test_measure_can_skip_memory():
+    """
+    Arrange: A small number of training points in two dimensions.
+    Act: Measure a metamodel without the traced runs.
+    Assert: The times are measured, the memory is not.
+    """
+
+    result = scaling.measure("idw", 20, 2, n_predict=50, memory=False)
+
+    assert result["train_time"] > 0
+    assert result["train_memory"] is None
+    assert result["predict_memory"] is None
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: test_termination
+.. moduleauthor:: Jan Kleinert <jan.kleinert@dlr.de>
+
+This is the test module for the termination policies of the termination
+module.
+"""
+
+import numpy as np
+
+import treeopt.termination as termination
+
+
+def test_single_policies():
+    """
+    Arrange: Create a state and record some iterations.
+    Act: Check the policies after each iteration.
+    Assert: Each policy is met exactly when its condition holds.
+    """
+    state = termination.State(ite=0, num_evals=10, best=5.0)
+    stall = termination.Stall(2, tol=0.1)
+    threshold = termination.AcquisitionThreshold(1e-3)
+    spacing = termination.MinSpacing(0.01)
+
+    assert not termination.MaxIterations(2)(state)
+    assert not termination.MaxEvaluations(12)(state)
+    assert not threshold(state)
+
+    state.update(1, 11, 4.0, acquisition_value=0.5, min_distance=0.5)
+    state.update(2, 12, 3.95, acquisition_value=1e-4, min_distance=0.005)
+
+    assert termination.MaxIterations(2)(state)
+    assert termination.MaxEvaluations(12)(state)
+    assert not stall(state)
+    assert threshold(state)
+    assert spacing(state)
+
+    state.update(3, 13, 3.95)
+    assert stall(state)
+    assert not termination.WallClock(3600)(state)
+    assert termination.WallClock(0)(state)
+
+
+def test_composition_and_budget():
+    """
+    Arrange: Combine policies with | and &.
+    Act: Ask for the reason and the remaining budget.
+    Assert: Any stops with the first met policy and takes the smallest
+        budget, All stops only if all policies are met.
+    """
+    state = termination.State(ite=3, num_evals=13, best=1.0)
+    any_policy = termination.MaxIterations(5) | termination.MaxEvaluations(14)
+    all_policy = termination.MaxIterations(5) & termination.MaxEvaluations(14)
+
+    assert any_policy.budget(state) == 1
+    assert all_policy.budget(state) == 2
+    assert termination.Stall(3).budget(state) == np.inf
+    assert any_policy.reason(state) is None
+
+    state.update(4, 14, 1.0)
+
+    assert any_policy.reason(state) == "MaxEvaluations(14)"
+    assert not all_policy(state)
+
+    state.update(5, 15, 1.0)
+
+    assert all_policy(state)
+    assert repr(all_policy) == "MaxIterations(5) & MaxEvaluations(14)"
@@ -0,0 +1,678 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: test_treeOpt
+.. moduleauthor:: Jan Kleinert <jan.kleinert@dlr.de>
+
+This is the test module for the optimization classes of the treeOpt module.
+"""
+
+import functools
+import logging
+import time
+
+import numpy as np
+import pytest
+
+import treeopt.evaluate as evaluate
+import treeopt.instrument as instrument
+import treeopt.metamodel as metamodel
+import treeopt.termination as termination
+from treeopt.treeOpt import adaptive_metamodell, least_squares
+
+
+def himmelblau(x, *args):
+    """Himmelblau function, returns one value per row of x."""
+    return (x[:, 0] ** 2 + x[:, 1] - 11) ** 2 + (
+        x[:, 0] + x[:, 1] ** 2 - 7
+    ) ** 2
+
+
+def parabola_error(params, x, goal):
+    """Residuals of a parabola with the parameters params."""
+    return params[0] * (x - params[1]) ** 2 + params[2] - goal
+
+
+def make_least_squares(cost_function=parabola_error):
+    """Returns a least_squares fit of a parabola."""
+    x = np.linspace(-5, 10, 50)
+    ls = least_squares()
+    ls.set_cost_function(cost_function)
+    ls.set_cost_function_args((x, parabola_error((-3, 5, 2), x, 0.0)))
+    ls.set_start_point(np.array([0.5, 0.0, 0.0]))
+    ls.set_limits(([-10, -10, -10], [10, 10, 10]))
+    return ls
+
+
+def make_optimizer():
+    """Returns an adaptive_metamodell on the Himmelblau function."""
+    opt = adaptive_metamodell()
+    opt.set_limits(np.array([[-5.0, 5.0], [-5.0, 5.0]]))
+    opt.set_num_doe(10)
+    opt.set_cost_function(himmelblau)
+    return opt
+
+
+def test_optimize_async_keeps_workers_busy():
+    """
+    Arrange: Create an optimizer with a thread pool of three workers.
+    Act: Run the asynchronous optimization loop.
+    Assert: Every sampled point has a response and a measured wall time.
+    """
+    opt = make_optimizer()
+    opt.set_evaluation_method(evaluate.thread_pool)
+    opt.set_num_workers(3)
+
+    opt.optimize_async()
+
+    assert opt.ite == opt.termination.max_ite
+    assert opt.x.shape == (10 + opt.termination.max_ite, 2)
+    assert opt.y.shape == (10 + opt.termination.max_ite, 1)
+    assert opt.eval_times.shape == (10 + opt.termination.max_ite,)
+    np.testing.assert_allclose(opt.y[:, 0], himmelblau(opt.x))
+
+
+def test_optimize_appends_data_to_log(tmp_path):
+    """
+    Arrange: Create an optimizer with a binary log in a temporary directory.
+    Act: Run the adaptive optimization loop.
+    Assert: The log holds exactly the data of the optimizer.
+    """
+    opt = make_optimizer()
+    opt.set_filepath(str(tmp_path))
+    opt.set_filename("himmelblau")
+    opt.set_log_format("npy")
+
+    opt.optimize()
+
+    x, y = opt.run_log.read()
+    np.testing.assert_array_equal(x, opt.x)
+    np.testing.assert_array_equal(y, opt.y)
+
+
+class Crash(Exception):
+    """Raised by the cost function to simulate an aborted job."""
+
+
+def test_resume_does_not_repeat_evaluations(tmp_path):
+    """
+    Arrange: Create an optimizer with a checkpoint and a cost function that
+        crashes after twelve evaluations.
+    Act: Run the optimization until the crash and resume it.
+    Assert: The resumed run evaluates only points that were not evaluated
+        before and ends with the same amount of data as a full run.
+    """
+    calls = []
+
+    def counting_himmelblau(x, *args):
+        if len(calls) == 12:
+            raise Crash()
+        calls.append(x)
+        return himmelblau(x)
+
+    opt = make_optimizer()
+    opt.set_cost_function(counting_himmelblau)
+    opt.set_checkpoint(str(tmp_path / "run.npz"))
+
+    with pytest.raises(Crash):
+        opt.optimize()
+
+    calls.append(None)
+    resumed = make_optimizer()
+    resumed.set_cost_function(counting_himmelblau)
+    resumed.set_checkpoint(str(tmp_path / "run.npz"))
+    resumed.optimize(resume=True)
+
+    assert len(calls) == 1 + 10 + resumed.termination.max_ite
+    assert resumed.x.shape == (10 + resumed.termination.max_ite, 2)
+    np.testing.assert_allclose(resumed.y[:, 0], himmelblau(resumed.x))
+
+
+def test_resume_continues_batch_and_log(tmp_path):
+    """
+    Arrange: Create an optimizer with a checkpoint, a log, a batch size of
+        two and a cost function that crashes within the second batch.
+    Act: Run the optimization until the crash and resume it.
+    Assert: Only the missing point of the batch is evaluated again, the log
+        holds every point exactly once.
+    """
+    calls = []
+
+    def counting_himmelblau(x, *args):
+        if len(calls) == 13:
+            raise Crash()
+        calls.append(x)
+        return himmelblau(x)
+
+    def make_batch_optimizer():
+        opt = make_optimizer()
+        opt.set_cost_function(counting_himmelblau)
+        opt.set_checkpoint(str(tmp_path / "run.npz"))
+        opt.set_filepath(str(tmp_path))
+        opt.set_filename("himmelblau")
+        opt.set_batch_size(2)
+        return opt
+
+    with pytest.raises(Crash):
+        make_batch_optimizer().optimize()
+
+    calls.append(None)
+    resumed = make_batch_optimizer()
+    resumed.optimize(resume=True)
+
+    num_points = 10 + 2 * resumed.termination.max_ite
+    assert len(calls) == 1 + num_points
+    assert resumed.ite == resumed.termination.max_ite
+    x, y = resumed.run_log.read()
+    np.testing.assert_array_equal(x, resumed.x)
+    np.testing.assert_allclose(y, resumed.y)
+
+
+def test_resume_trims_a_torn_log(tmp_path):
+    """
+    Arrange: Run an optimization with a checkpoint and a log and simulate a
+        crash between logging the points and the responses of the last
+        iteration, with a partial line in the file of the points.
+    Act: Resume the optimization with more iterations.
+    Assert: The log holds every point and its response exactly once.
+    """
+
+    def make_logged_optimizer(max_ite):
+        opt = make_optimizer()
+        opt.set_checkpoint(str(tmp_path / "run.npz"))
+        opt.set_filepath(str(tmp_path))
+        opt.set_filename("himmelblau")
+        opt.set_termination(termination.MaxIterations(max_ite))
+        return opt
+
+    opt = make_logged_optimizer(2)
+    opt.optimize()
+    responses = opt.run_log.paths["DoeResponce"]
+    with open(responses) as file:
+        lines = file.readlines()
+    with open(responses, "w") as file:
+        file.writelines(lines[:-1])
+    with open(opt.run_log.paths["DoeData"], "a") as file:
+        file.write("1.0,")
+
+    resumed = make_logged_optimizer(4)
+    resumed.optimize(resume=True)
+
+    x, y = resumed.run_log.read()
+    assert len(resumed.x) == 10 + 4
+    np.testing.assert_array_equal(x, resumed.x)
+    np.testing.assert_allclose(y, resumed.y)
+
+
+@pytest.mark.parametrize("loop", ["optimize", "optimize_async"])
+def test_wall_clock_includes_initial_sampling(loop):
+    """
+    Arrange: Create an optimizer with a slow cost function, whose initial
+        sampling takes longer than the wall clock budget.
+    Act: Run the optimization loop.
+    Assert: The loop stops after the initial sampling without an iteration.
+    """
+
+    def slow_himmelblau(x, *args):
+        time.sleep(0.03)
+        return himmelblau(x)
+
+    opt = make_optimizer()
+    opt.set_cost_function(slow_himmelblau)
+    opt.set_termination(termination.WallClock(0.2))
+
+    getattr(opt, loop)()
+
+    assert opt.ite == 0
+    assert opt.termination_reason == "WallClock(0.2)"
+    assert opt.state.elapsed >= 0.3
+
+
+def test_resume_continues_wall_clock_and_iterations(tmp_path):
+    """
+    Arrange: Run an optimization with a checkpoint and a slow cost function.
+    Act: Resume it with a wall clock budget equal to the stored wall time.
+    Assert: The resumed run starts from the stored iteration and wall time,
+        so it stops at once.
+    """
+
+    def slow_himmelblau(x, *args):
+        time.sleep(0.02)
+        return himmelblau(x)
+
+    opt = make_optimizer()
+    opt.set_cost_function(slow_himmelblau)
+    opt.set_checkpoint(str(tmp_path / "run.npz"))
+    opt.optimize()
+    with np.load(str(tmp_path / "run.npz")) as file:
+        elapsed = float(file["elapsed"])
+
+    resumed = make_optimizer()
+    resumed.set_checkpoint(str(tmp_path / "run.npz"))
+    resumed.set_termination(
+        termination.MaxIterations(opt.ite + 5) | termination.WallClock(elapsed)
+    )
+    resumed.optimize(resume=True)
+
+    assert elapsed >= 10 * 0.02
+    assert resumed.ite == opt.ite
+    assert resumed.termination_reason == "WallClock(%g)" % elapsed
+
+
+def test_incremental_metamodel_is_updated_not_retrained():
+    """
+    Arrange: Create an optimizer with the incremental kriging metamodel and a
+        batch size of two.
+    Act: Run the adaptive optimization loop.
+    Assert: The metamodel object is kept and holds all evaluated points.
+    """
+    opt = make_optimizer()
+    opt.set_sm_method(metamodel.krg_incremental)
+    opt.set_batch_size(2)
+
+    opt.optimize()
+
+    assert isinstance(opt.sm, metamodel.IncrementalKriging)
+    assert opt.sm.num_refits < opt.termination.max_ite
+    assert opt.sm.num_training_points == len(opt.x) - 2
+
+
+def test_local_kriging_metamodel_is_updated():
+    """
+    Arrange: Create an optimizer with the mixture of local kriging
+        metamodels and small parts.
+    Act: Run the adaptive optimization loop.
+    Assert: The metamodel object is kept and holds all evaluated points.
+    """
+    opt = make_optimizer()
+    opt.set_sm_method(functools.partial(metamodel.krg_local, max_points=4))
+
+    opt.optimize()
+
+    assert isinstance(opt.sm, metamodel.LocalKriging)
+    assert len(opt.sm.experts) >= 2
+    assert opt.sm.num_training_points == len(opt.x) - 1
+    assert np.all(np.abs(opt.x) <= 5.0)
+
+
+@pytest.mark.parametrize("name", ["ei", "pi", "max_variance"])
+def test_set_acquisition(name):
+    """
+    Arrange: Select an acquisition function of the registry.
+    Act: Run the adaptive optimization.
+    Assert: All iterations add points inside the limits.
+    """
+    np.random.seed(5)
+    opt = make_optimizer()
+    opt.set_sm_method(metamodel.krg_incremental)
+    params = {} if name == "max_variance" else {"xi": 0.1}
+    opt.set_acquisition(name, **params)
+
+    opt.optimize()
+
+    assert opt.x.shape == (15, 2)
+    assert np.all(np.abs(opt.x) <= 5.0)
+    with pytest.raises(ValueError):
+        opt.set_acquisition("unknown")
+
+
+def test_termination_policies_stop_the_loops():
+    """
+    Arrange: Limit the evaluations of the sequential and the asynchronous
+        loop and add a stall window.
+    Act: Run both optimizations.
+    Assert: They stop at the limit and record the reason.
+    """
+    for method in ["optimize", "optimize_async"]:
+        np.random.seed(6)
+        opt = make_optimizer()
+        opt.set_num_workers(2)
+        opt.set_termination(
+            termination.MaxEvaluations(13) | termination.Stall(50)
+        )
+
+        getattr(opt, method)()
+
+        assert opt.x.shape == (13, 2)
+        assert opt.termination_reason == "MaxEvaluations(13)"
+        assert opt.state.ite == opt.ite
+
+
+def test_optimize_is_silent_and_logs(capsys, caplog):
+    """
+    Arrange: Create an optimizer with the kriging metamodel and capture the
+        output and the log of treeopt.
+    Act: Run the adaptive optimization at INFO and at DEBUG level.
+    Assert: Nothing is printed at INFO level, the iterations are logged at
+        INFO level and the searches at DEBUG level.
+    """
+    opt = make_optimizer()
+    opt.set_sm_method(metamodel.krg)
+
+    with caplog.at_level(logging.INFO, logger="treeopt"):
+        opt.optimize()
+
+    assert capsys.readouterr().out == ""
+    messages = [record.getMessage() for record in caplog.records]
+    assert any(m.startswith("Iteration 5:") for m in messages)
+    assert not any(m.startswith("Search of") for m in messages)
+
+    caplog.clear()
+    with caplog.at_level(logging.DEBUG, logger="treeopt"):
+        opt.optimize()
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert any(m.startswith("Search of the acquisition") for m in messages)
+
+
+@pytest.mark.parametrize("method", [evaluate.serial, evaluate.thread_pool])
+def test_least_squares_jacobian_method_matches_scipy(method):
+    """
+    Arrange: Fit a parabola with the Jacobian of scipy and with a jacobian
+        method.
+    Act: Run both optimizations.
+    Assert: Both take the same steps to the same result, the residuals in
+        the base points are reused, so each Jacobian costs one evaluation
+        per parameter.
+    """
+    reference = make_least_squares()
+    res_reference = reference.optimize()
+    ls = make_least_squares()
+    ls.set_jacobian_method(method)
+    ls.set_num_workers(3)
+
+    res = ls.optimize()
+
+    np.testing.assert_allclose(res.x, res_reference.x)
+    np.testing.assert_allclose(res.x, [-3, 5, 2], atol=1e-4)
+    assert res.nfev == res_reference.nfev
+    assert ls.num_evals == res.nfev + 3 * res.njev
+
+
+def test_difference_steps_shrink_in_narrow_limits():
+    """
+    Arrange: Limits, whose interval of the first two parameters is
+        narrower than the difference step, and a step, that fits backwards
+        only for the third parameter.
+    Act: Compute the difference steps and the Jacobian.
+    Assert: Every perturbed point lies within the limits, the steps that
+        fit neither way are shrunk to the distance to the farther limit and
+        the Jacobian is still correct.
+    """
+    ls = make_least_squares()
+    ls.set_limits(([-3.001, 4.9995, -10], [-2.9995, 5.001, 10]))
+    ls.set_diff_step(1e-2)
+    ls.num_evals = 0
+    params = np.array([-3.0, 5.0, 9.99])
+
+    h = ls.difference_steps(params)
+    jac = ls.jacobian(params, *ls.optimization_function_args)
+
+    lower, upper = (np.asarray(b) for b in ls.limits)
+    assert np.all((params + h >= lower) & (params + h <= upper))
+    np.testing.assert_allclose(h, [-0.001, 0.001, -0.0999])
+    x = ls.optimization_function_args[0]
+    expected = np.column_stack([(x - 5) ** 2, 6 * (x - 5), np.ones_like(x)])
+    np.testing.assert_allclose(jac, expected, rtol=1e-2, atol=1e-2)
+
+
+def test_least_squares_jacobian_is_evaluated_concurrently():
+    """
+    Arrange: A cost function, that waits 0.2 seconds like an external
+        simulation, and a jacobian method with a thread pool.
+    Act: Compute the Jacobian in a point, whose residuals are unknown.
+    Assert: The three perturbed points and the point itself are evaluated
+        concurrently and the Jacobian is correct.
+    """
+
+    def slow_error(params, x, goal):
+        time.sleep(0.2)
+        return parabola_error(params, x, goal)
+
+    ls = make_least_squares(slow_error)
+    ls.set_jacobian_method(evaluate.thread_pool)
+    ls.set_num_workers(4)
+    ls.set_diff_step(1e-6)
+    ls.num_evals = 0
+    params = np.array([-1.0, 2.0, 9.9999995])
+
+    start = time.perf_counter()
+    jac = ls.jacobian(params, *ls.optimization_function_args)
+    wall_time = time.perf_counter() - start
+
+    x = ls.optimization_function_args[0]
+    expected = np.column_stack(
+        [
+            (x - params[1]) ** 2,
+            -2 * params[0] * (x - params[1]),
+            np.ones_like(x),
+        ]
+    )
+    assert ls.num_evals == 4
+    assert wall_time < 0.6
+    np.testing.assert_allclose(jac, expected, rtol=1e-4, atol=1e-4)
+
+
+def rosenbrock_residuals(params):
+    """Residuals of the Rosenbrock function."""
+    return np.array([10 * (params[1] - params[0] ** 2), 1 - params[0]])
+
+
+def test_least_squares_surrogate_needs_fewer_evaluations():
+    """
+    Arrange: Fit the Rosenbrock residuals directly and with trust-region
+        steps on a kriging metamodel of the residuals.
+    Act: Run both optimizations.
+    Assert: Both find the minimum, the surrogate mode with less than half
+        of the evaluations, and it reports each trust-region step.
+    """
+    results = []
+    for method in [None, metamodel.krg_incremental]:
+        ls = least_squares()
+        ls.set_cost_function(rosenbrock_residuals)
+        ls.set_start_point(np.array([-1.2, 1.0]))
+        ls.set_limits(([-2.0, -2.0], [2.0, 2.0]))
+        ls.set_surrogate_method(method)
+        ls.set_instrumentation(instrument.Instrumentation(keep_records=True))
+        results.append((ls, ls.optimize()))
+    (reference, res_reference), (ls, res) = results
+
+    np.testing.assert_allclose(res_reference.x, [1, 1], atol=1e-6)
+    np.testing.assert_allclose(res.x, [1, 1], atol=1e-4)
+    assert res.success
+    assert res.nfev == ls.num_evals < reference.num_evals / 2
+    steps = [
+        event
+        for event in ls.instrumentation.records
+        if event["event"] == "iteration"
+    ]
+    assert len(steps) == res.nit > 0
+    assert "fit" in ls.instrumentation.summary()["time"]
+
+
+class FlatSurrogate:
+    """Metamodel, that predicts no reduction of the cost anywhere."""
+
+    def __init__(self, xt, yt):
+        self.num_outputs = yt.shape[1]
+
+    def predict_values(self, x):
+        return np.zeros((len(x), self.num_outputs))
+
+
+def test_least_squares_surrogate_does_not_repeat_evaluations():
+    """
+    Arrange: Residuals with a kink at the start point, where the Gauss-Newton
+        step of the verification never reduces the cost, and a metamodel,
+        that always asks for a verification.
+    Act: Run the optimization with trust-region steps.
+    Assert: The verifications from the same best point take the perturbed
+        points from the evaluated ones, so no point is evaluated twice.
+    """
+    points = []
+
+    def kinked_residuals(params):
+        points.append(tuple(params))
+        return np.array([np.abs(params[0] - 0.3) + 1.0, params[1] - 0.2])
+
+    ls = least_squares()
+    ls.set_cost_function(kinked_residuals)
+    ls.set_start_point(np.array([0.3, 0.2]))
+    ls.set_limits(([-2.0, -2.0], [2.0, 2.0]))
+    ls.set_surrogate_method(FlatSurrogate)
+
+    res = ls.optimize()
+
+    np.testing.assert_array_equal(res.x, [0.3, 0.2])
+    assert res.nit > 10
+    assert len(points) == len(set(points)) == res.nfev == ls.num_evals
+
+
+def test_least_squares_rejects_surrogate_with_multistart():
+    """
+    Arrange: Set a surrogate method and several start points.
+    Act: Run the optimization.
+    Assert: It raises a ValueError before evaluating the cost function.
+    """
+    ls = least_squares()
+    ls.set_cost_function(rosenbrock_residuals)
+    ls.set_start_point(np.array([-1.2, 1.0]))
+    ls.set_limits(([-2.0, -2.0], [2.0, 2.0]))
+    ls.set_surrogate_method(metamodel.krg_incremental)
+    ls.set_num_starts(4)
+
+    with pytest.raises(ValueError, match="start points"):
+        ls.optimize()
+    assert getattr(ls, "num_evals", 0) == 0
+
+
+def himmelblau_residuals(params):
+    """Residuals of the Himmelblau function, which has four minima."""
+    return np.array(
+        [params[0] ** 2 + params[1] - 11, params[0] + params[1] ** 2 - 7]
+    )
+
+
+@pytest.mark.parametrize(
+    "method", [evaluate.thread_pool, evaluate.process_pool]
+)
+def test_least_squares_multistart_finds_distinct_minima(method):
+    """
+    Arrange: Fit the Himmelblau residuals, which vanish in four points,
+        with twelve starts.
+    Act: Run the multistart optimization.
+    Assert: Several distinct minima are found and ranked by their cost, the
+        solves converging to the same minimum are merged and all
+        evaluations are counted.
+    """
+    ls = least_squares()
+    ls.set_cost_function(himmelblau_residuals)
+    ls.set_start_point(np.array([0.0, 0.0]))
+    ls.set_limits(([-5.0, -5.0], [5.0, 5.0]))
+    ls.set_num_starts(12)
+    ls.set_multistart_method(method)
+    ls.set_num_workers(2)
+    ls.set_instrumentation(instrument.Instrumentation(keep_records=True))
+
+    res = ls.optimize()
+
+    costs = [solution.cost for solution in res.solutions]
+    minima = [s for s in res.solutions if s.cost < 1e-10]
+    assert res.cost == costs[0] == min(costs)
+    assert costs == sorted(costs)
+    assert len(minima) >= 2
+    assert sum(solution.num_starts for solution in res.solutions) == 12
+    np.testing.assert_allclose(
+        [himmelblau_residuals(s.x) for s in minima], 0.0, atol=1e-4
+    )
+    starts = [e for e in ls.instrumentation.records if e["event"] == "start"]
+    assert len(starts) == 12
+    assert starts[-1]["num_evals"] == ls.num_evals > 12
+
+
+def test_least_squares_batched_cost_function():
+    """
+    Arrange: A batched cost function of the Himmelblau residuals, that
+        records the number of points of each call.
+    Act: Run a single and a multistart optimization.
+    Assert: The single optimization takes the steps of the unbatched one
+        and evaluates each Jacobian in one call, the multistart
+        optimization combines the points of its solves.
+    """
+    calls = []
+
+    def batched_residuals(x):
+        calls.append(len(x))
+        return np.array([himmelblau_residuals(xi) for xi in x])
+
+    reference = least_squares()
+    reference.set_cost_function(himmelblau_residuals)
+    reference.set_start_point(np.array([0.0, 0.0]))
+    reference.set_limits(([-5.0, -5.0], [5.0, 5.0]))
+    res_reference = reference.optimize()
+    ls = least_squares()
+    ls.set_cost_function(batched_residuals, batched=True)
+    ls.set_start_point(np.array([0.0, 0.0]))
+    ls.set_limits(([-5.0, -5.0], [5.0, 5.0]))
+
+    res = ls.optimize()
+    single_calls, calls[:] = list(calls), []
+    ls.set_num_starts(8)
+    res_multistart = ls.optimize()
+
+    np.testing.assert_allclose(res.x, res_reference.x)
+    assert sum(single_calls) == reference.num_evals
+    assert len(single_calls) == res.nfev + res.njev
+    assert max(single_calls) == 2
+    assert res_multistart.cost < 1e-10
+    assert sum(calls) == ls.num_evals
+    assert len(calls) < ls.num_evals / 4
+
+
+def test_batched_cost_function_gets_the_initial_sampling_at_once():
+    """
+    Arrange: Set a batched cost function of the adaptive optimization.
+    Act: Run the optimization.
+    Assert: The initial sampling is evaluated in one call.
+    """
+    calls = []
+
+    def batched(x, *args):
+        calls.append(len(x))
+        return himmelblau(x)
+
+    opt = make_optimizer()
+    opt.set_cost_function(batched, batched=True)
+
+    opt.optimize()
+
+    assert calls[0] == 10
+    assert len(calls) == 1 + opt.termination.max_ite
+
+
+@pytest.mark.parametrize("batched", [True, False])
+def test_batched_flag_does_not_depend_on_the_order_of_the_setters(batched):
+    """
+    Arrange: Set a batched cost function, then a thread pool as evaluation
+        method and finally the cost function again with the batched flag.
+    Act: Run the optimization.
+    Assert: The initial sampling is evaluated in one call only if the last
+        flag is True, otherwise point by point with the thread pool.
+    """
+    calls = []
+
+    def cost(x, *args):
+        calls.append(len(x))
+        return himmelblau(x)
+
+    opt = make_optimizer()
+    opt.set_cost_function(cost, batched=True)
+    opt.set_evaluation_method(evaluate.thread_pool)
+    opt.set_cost_function(cost, batched=batched)
+
+    opt.optimize()
+
+    assert opt.evaluationMethod is evaluate.thread_pool
+    assert calls.count(10) == (1 if batched else 0)
+    assert len(calls) == (1 if batched else 10) + opt.termination.max_ite
@@ -8,4 +8,9 @@ A python module for simulation-based optimization.
 .. moduleauthor:: Jan Kleinert <jan.kleinert@dlr.de>
 """
 
+import logging
+
 from .version import __version__, __release__  # noqa
+
+# The library only logs, applications (like the cli) configure the output
+logging.getLogger(__name__).addHandler(logging.NullHandler())
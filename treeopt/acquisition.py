@@ -0,0 +1,309 @@
+import logging
+
+import numpy as np
+import scipy.stats as stats
+
+import treeopt.optimize as optimize
+
+logger = logging.getLogger(__name__)
+
+
+def lower_confidence_bound(sm, x, y_min=None, kappa=3.0):
+    """
+    Calculates the lower confidence bound mu - kappa * sigma of a metamodel
+    for several points at once. Small values are promising.
+
+    :param sm: A metamodel object from the smt-toolkit. Must be able to
+        calculate variances
+    :type sm: Smt-object
+    :param x: Points in the design space, one point per row
+    :type x: Numpy-array
+    :param y_min: Unused, exists for a common signature of all acquisitions
+    :type y_min: Float
+    :param kappa: Weight of the standard deviation (default 3)
+    :type kappa: Float
+    :return: Lower confidence bound in each point
+    :rtype: Numpy-array
+    """
+
+    x = np.atleast_2d(x)
+
+    sm_val = sm.predict_values(x)[:, 0]
+    sm_std = np.sqrt(np.maximum(sm.predict_variances(x)[:, 0], 0.0))
+
+    return sm_val - kappa * sm_std
+
+
+def lower_confidence_bound_gradient(sm, x, y_min=None, kappa=3.0):
+    """
+    Calculates the gradient of lower_confidence_bound for several points at
+    once
+
+    :return: Gradient in each point, one row per point
+    :rtype: Numpy-array
+    """
+
+    x = np.atleast_2d(x)
+
+    return (
+        optimize.predict_gradients(sm, x)
+        - kappa * optimize.predict_std_gradients(sm, x)[1]
+    )
+
+
+def expected_improvement(sm, x, y_min, xi=0.0):
+    """
+    Calculates the expected improvement over y_min - xi for several points at
+    once. Large values are promising.
+
+    :param sm: A metamodel object from the smt-toolkit. Must be able to
+        calculate variances
+    :type sm: Smt-object
+    :param x: Points in the design space, one point per row
+    :type x: Numpy-array
+    :param y_min: Lowest known system response
+    :type y_min: Float
+    :param xi: Minimal improvement, larger values favour exploration
+        (default 0)
+    :type xi: Float
+    :return: Expected improvement in each point
+    :rtype: Numpy-array
+    """
+
+    return optimize.expected_improvement(sm, x, y_min - xi)
+
+
+def expected_improvement_gradient(sm, x, y_min, xi=0.0):
+    """
+    Calculates the gradient of expected_improvement for several points at
+    once
+
+    :return: Gradient in each point, one row per point
+    :rtype: Numpy-array
+    """
+
+    return optimize.expected_improvement_gradient(sm, x, y_min - xi)
+
+
+def probability_of_improvement(sm, x, y_min, xi=0.0):
+    """
+    Calculates the probability, that the system response falls below
+    y_min - xi, for several points at once. Large values are promising.
+
+    :param sm: A metamodel object from the smt-toolkit. Must be able to
+        calculate variances
+    :type sm: Smt-object
+    :param x: Points in the design space, one point per row
+    :type x: Numpy-array
+    :param y_min: Lowest known system response
+    :type y_min: Float
+    :param xi: Minimal improvement, larger values favour exploration
+        (default 0)
+    :type xi: Float
+    :return: Probability of improvement in each point
+    :rtype: Numpy-array
+    """
+
+    x = np.atleast_2d(x)
+
+    sm_val = sm.predict_values(x)[:, 0]
+    sm_std = np.sqrt(np.maximum(sm.predict_variances(x)[:, 0], 0.0))
+
+    pi = (sm_val < y_min - xi).astype(float)
+    positive = sm_std > 0
+    pi[positive] = stats.norm.cdf(
+        (y_min - xi - sm_val[positive]) / sm_std[positive]
+    )
+
+    return pi
+
+
+def probability_of_improvement_gradient(sm, x, y_min, xi=0.0):
+    """
+    Calculates the gradient of probability_of_improvement for several points
+    at once
+
+    :return: Gradient in each point, one row per point
+    :rtype: Numpy-array
+    """
+
+    x = np.atleast_2d(x)
+
+    sm_val = sm.predict_values(x)[:, 0]
+    sm_std, sm_std_grad = optimize.predict_std_gradients(sm, x)
+    sm_val_grad = optimize.predict_gradients(sm, x)
+
+    grad = np.zeros_like(sm_val_grad)
+    positive = sm_std > 0
+    z = (y_min - xi - sm_val[positive]) / sm_std[positive]
+    grad[positive] = (stats.norm.pdf(z) / sm_std[positive])[:, np.newaxis] * (
+        -sm_val_grad[positive] - z[:, np.newaxis] * sm_std_grad[positive]
+    )
+
+    return grad
+
+
+def variance(sm, x, y_min=None):
+    """
+    Returns the variance of a metamodel for several points at once. Large
+    values are promising for the exploration of the design space.
+
+    :param sm: A metamodel object from the smt-toolkit. Must be able to
+        calculate variances
+    :type sm: Smt-object
+    :param x: Points in the design space, one point per row
+    :type x: Numpy-array
+    :param y_min: Unused, exists for a common signature of all acquisitions
+    :type y_min: Float
+    :return: Variance in each point
+    :rtype: Numpy-array
+    """
+
+    return sm.predict_variances(np.atleast_2d(x))[:, 0]
+
+
+def variance_gradient(sm, x, y_min=None):
+    """
+    Calculates the gradient of variance for several points at once
+
+    :return: Gradient in each point, one row per point
+    :rtype: Numpy-array
+    """
+
+    x = np.atleast_2d(x)
+
+    return np.column_stack(
+        [
+            sm.predict_variance_derivatives(x, kx)[:, 0]
+            for kx in range(x.shape[1])
+        ]
+    )
+
+
+# Registered acquisition functions by name: the function, its gradient (None
+# if it is not known) and whether the function is maximized or minimized
+ACQUISITIONS = {
+    "lcb": (lower_confidence_bound, lower_confidence_bound_gradient, False),
+    "ei": (expected_improvement, expected_improvement_gradient, True),
+    "pi": (
+        probability_of_improvement,
+        probability_of_improvement_gradient,
+        True,
+    ),
+    "max_variance": (variance, variance_gradient, True),
+}
+
+
+def register(name, fun, gradient=None, maximize=True):
+    """
+    Registers an acquisition function, so it can be selected by its name.
+    The function is called as fun(sm, x, y_min, **params) with one point per
+    row of x and has to return one value per point.
+
+    :param name: Name of the acquisition function
+    :type name: String
+    :param fun: Acquisition function
+    :type fun: Python function
+    :param gradient: Function with the same signature returning the gradient
+        of fun, one row per point (default None, finite differences are used)
+    :type gradient: Python function
+    :param maximize: True if large values of fun are promising, False if
+        small values are
+    :type maximize: Bool
+    :return: Nothing
+    :rtype: None
+    """
+
+    ACQUISITIONS[name] = (fun, gradient, maximize)
+
+
+def get(name):
+    """
+    Returns a registered acquisition function
+
+    :param name: Name of the acquisition function, e.g. "ei", "pi", "lcb" or
+        "max_variance"
+    :type name: String
+    :return: The function, its gradient and whether it is maximized
+    :rtype: Tuple
+    """
+
+    if name not in ACQUISITIONS:
+        raise ValueError(
+            "Unknown acquisition function %s, available are %s"
+            % (name, ", ".join(sorted(ACQUISITIONS)))
+        )
+
+    return ACQUISITIONS[name]
+
+
+def search(sm, limits, y_min, name="lcb", params=None, **kwargs):
+    """
+    Searches the most promising point of an acquisition function with
+    optimize.multistart_minimize. The analytic gradient is used, if it is
+    known and the metamodel supports the derivatives of its predictions.
+
+    :param sm: A metamodel object from the smt-toolkit. Must be able to
+        calculate variances
+    :type sm: Smt-object
+    :param limits: Limits of the design-space
+    :type limits: Numpy-array
+    :param y_min: Lowest known system response
+    :type y_min: Float
+    :param name: Name of the acquisition function (default "lcb")
+    :type name: String
+    :param params: Parameters of the acquisition function, e.g.
+        {"kappa": 2.0} for "lcb"
+    :type params: Dictionary
+    :param kwargs: Options of multistart_minimize
+    :return: Most promising point in the design space
+    :rtype: Numpy-array
+    """
+
+    fun, gradient, maximize = get(name)
+    params = params or {}
+    sign = -1.0 if maximize else 1.0
+
+    def get_acquisition(x):
+        return sign * fun(sm, x, y_min, **params)
+
+    def get_acquisition_gradient(x):
+        return sign * gradient(sm, x, y_min, **params)
+
+    if gradient is not None and optimize.supports_gradients(sm, True):
+        kwargs.setdefault("jac", get_acquisition_gradient)
+
+    res = optimize.multistart_minimize(get_acquisition, limits, **kwargs)
+
+    logger.debug("Search of the acquisition function %s: %s", name, res)
+
+    return res.x
+
+
+def promise(sm, x, y_min, name="lcb", params=None):
+    """
+    Evaluates an acquisition function in such a way, that large values are
+    promising for all functions: maximized functions are returned as they
+    are, for minimized functions like "lcb" the possible improvement
+    y_min - value is returned. Used by termination.AcquisitionThreshold.
+
+    :param sm: A metamodel object from the smt-toolkit
+    :type sm: Smt-object
+    :param x: Points in the design space, one point per row
+    :type x: Numpy-array
+    :param y_min: Lowest known system response
+    :type y_min: Float
+    :param name: Name of the acquisition function (default "lcb")
+    :type name: String
+    :param params: Parameters of the acquisition function
+    :type params: Dictionary
+    :return: Promise of each point
+    :rtype: Numpy-array
+    """
+
+    fun, _, maximize = get(name)
+    values = fun(sm, np.atleast_2d(x), y_min, **(params or {}))
+
+    if maximize:
+        return values
+    return y_min - values
@@ -0,0 +1,313 @@
+import numpy as np
+
+
+def tree_valley_function(x):
+    """
+    Represents a one dimensional Function, with two local and one global
+    minima
+    :param x: 1D Rowvector (multiple Values can be passed)
+    :type x: Numpy array
+    :return: Function values of x
+    :rtype: Numpy array
+    """
+
+    y = -(
+        np.exp(-((x - 2) ** 2))
+        + np.exp(-((x - 6) ** 2) / 10)
+        + 1 / (x ** 2 + 1)
+    )
+
+    return y
+
+
+def four_humps_function(x):
+    """
+    Function with one global maxima, one local maximum, one glomal minimun an
+    a locam minimum
+    :param x: 2D rowvector (a column of rows can be passed)
+    :type x: Numpy array
+    :return: Function values of x
+    :rtype: Numpy array
+    """
+
+    x = np.atleast_2d(x)
+    y = (1 - x[:, 0] / 2 + x[:, 0] ** 5 + x[:, 1] ** 3) * np.exp(
+        -x[:, 0] ** 2 - x[:, 1] ** 2
+    )
+
+    return y
+
+
+def himmelblaus_function(x):
+    """
+    The Himmelblau Function is a multi-modal function, with one local maximum
+    four local minima.
+    :param x: 2D rowvector (a column of rows can be passed)
+    :type x: Numpy array
+    :return: Function values of x
+    :rtype: Numpy array
+    """
+
+    x = np.atleast_2d(x)
+    y = (x[:, 0] ** 2 + x[:, 1] - 11) ** 2 + (x[:, 0] + x[:, 1] ** 2 - 7) ** 2
+
+    return y
+
+
+def rotated_hyper_ellipsoid_function(x):
+    """
+    The Rotated Hyper-Ellipsoid function is continuous, convex and unimodal.
+    It is an extension of the Axis Parallel Hyper-Ellipsoid function,
+    also referred to as the Sum Squares function:
+    f(x) = sum_i sum_(j <= i) x_j^2
+    :param x: N-Dimensional Vector rowvector (a column of rows can be passed)
+    :type x: Numpy array
+    :return: Function values of x
+    :rtype: Numpy Array
+    Quelle:
+        http://www.sfu.ca/~ssurjano/rothyp.html
+    """
+
+    x = np.atleast_2d(x)
+    y = np.sum(np.cumsum(x ** 2, axis=1), axis=1)
+
+    return y
+
+
+def matyas_function(x):
+    """
+    The Matyas function has no local minima except the global one.
+    :param x: 2D rowvector (a column of rows can be passed)
+    :type x: Numpy array
+    :return: Function values of x
+    :rtype: Numpy array
+    """
+
+    x = np.atleast_2d(x)
+    y = 0.26 * (x[:, 0] ** 2 + x[:, 1] ** 2) - 0.48 * x[:, 0] * x[:, 1]
+
+    return y
+
+
+def cross_in_tray_function(x):
+    """
+    The Cross-in-Tray function has multiple global minima. It is shown here
+    with a smaller domain in the second plot, so that its characteristic
+    "cross" will be visible.
+    :param x: 2D rowvector (a column of rows can be passed)
+    :type x: Numpy array
+    :return: Function values of x
+    :rtype: Numpy array
+    """
+
+    x = np.atleast_2d(x)
+    fact1 = np.sin(x[:, 0]) * np.sin(x[:, 1])
+    fact2 = np.exp(np.abs(100 - np.sqrt(x[:, 0] ** 2 + x[:, 1] ** 2) / np.pi))
+    y = -0.0001 * (abs(fact1 * fact2) + 1) ** 0.1
+    return y
+
+
+def SixHumpCamelFunction(x):
+    """
+    he plot on the left shows the six-hump Camel function on its recommended
+    input domain, and the plot on the right shows only a portion of this
+    domain, to allow for easier viewing of the function's key characteristics.
+    The function has six local minima, two of which are global.
+    :param x: 2D rowvector (a column of rows can be passed)
+    :type x: Numpy array
+    :return: function values of x
+    :rtype: Numpy array
+    """
+
+    x = np.atleast_2d(x)
+    x1 = x[:, 0]
+    x2 = x[:, 1]
+    y = (
+        (4 - 2.1 * x1 ** 2 + (x1 ** 4) / 3) * x1 ** 2
+        + x1 * x2
+        + (-4 + 4 * x2 ** 2) * x2 ** 2
+    )
+    return y
+
+
+def michalewicz_function(x, m=10):
+    """
+    The Michalewicz function has d! local minima, and it is multimodal.
+    The parameter m defines the steepness of they valleys and ridges;
+    a larger m leads to a more difficult search.
+    The recommended value of m is m = 10.
+    f(x) = -sum_i sin(x_i) * sin(i * x_i^2 / pi)^(2m), i = 1, ..., d
+    :param x: N-Dimensional rowvector (a column of rows can be passed)
+    :type x: Numpy array
+    :param m: Steepness of the valleys
+    :type m: Integer
+    :return: Function Values of x
+    :rtype: Numpy array
+    Quelle:
+        http://www.sfu.ca/~ssurjano/michal.html
+    """
+
+    x = np.atleast_2d(x)
+    i = np.arange(1, x.shape[1] + 1)
+    y = np.sum(np.sin(x) * np.sin(i * x ** 2 / np.pi) ** (2 * m), axis=1)
+
+    return -y
+
+
+def rastrigin_function(x):
+    """
+    The Rastrigin function has several local minima. It is highly multimodal,
+    but locations of the minima are regularly distributed.
+    f(x) = 10 d + sum_i (x_i^2 - 10 cos(2 pi x_i))
+    :param x: N-Dimensional rowvector (a column of rows can be passed)
+    :type x: Numpy array
+    :return: Function Values of x
+    :rtype: Numpy array
+    Quelle:
+        http://www.sfu.ca/~ssurjano/rastr.html
+    """
+
+    x = np.atleast_2d(x)
+    y = np.sum(x ** 2 - 10 * np.cos(2 * np.pi * x), axis=1)
+
+    return 10 * x.shape[1] + y
+
+
+class Problem:
+    """
+    A benchmark function together with its design space and its known
+    global minimum. All functions take one point per row and return one
+    value per point.
+    """
+
+    def __init__(self, name, function, limits, f_opt, x_opt):
+        """
+        :param name: Name of the problem
+        :type name: String
+        :param function: Vectorized benchmark function
+        :type function: Python function
+        :param limits: Limits of the design space, one row [lower, upper]
+            per dimension
+        :type limits: Numpy array
+        :param f_opt: Value of the global minimum
+        :type f_opt: Float
+        :param x_opt: Points of the global minimum, one point per row
+        :type x_opt: Numpy array
+        """
+
+        self.name = name
+        self.function = function
+        self.limits = np.asarray(limits, dtype=float)
+        self.f_opt = f_opt
+        self.x_opt = np.atleast_2d(x_opt)
+
+    @property
+    def dim(self):
+        """
+        Number of dimensions of the design space
+        """
+        return self.limits.shape[0]
+
+    def __call__(self, x, *args):
+        return self.function(np.atleast_2d(x))
+
+    def __repr__(self):
+        return "Problem(%s, d=%d)" % (self.name, self.dim)
+
+
+def _michalewicz_optimum(dim):
+    """
+    Returns the known minima of the Michalewicz function (m = 10) for up to
+    five dimensions
+    """
+
+    f_opt = {1: -0.801303, 2: -1.8013034, 5: -4.687658}
+    x_opt = {1: [2.202906], 2: [2.202906, 1.570796]}
+
+    return f_opt.get(dim), x_opt.get(dim, [np.nan] * dim)
+
+
+def get_problem(name, dim=2):
+    """
+    Returns a benchmark problem by its name. The problems "rastrigin",
+    "rotated_hyper_ellipsoid" and "michalewicz" can be scaled to any number
+    of dimensions, the others are two dimensional.
+
+    :param name: One of the names in PROBLEMS
+    :type name: String
+    :param dim: Number of dimensions of the scalable problems
+    :type dim: Integer
+    :return: The benchmark problem
+    :rtype: benchmark.Problem
+    """
+
+    if name == "himmelblau":
+        return Problem(
+            name,
+            himmelblaus_function,
+            [[-5.0, 5.0]] * 2,
+            0.0,
+            [
+                [3.0, 2.0],
+                [-2.805118, 3.131312],
+                [-3.779310, -3.283186],
+                [3.584428, -1.848126],
+            ],
+        )
+    if name == "six_hump_camel":
+        return Problem(
+            name,
+            SixHumpCamelFunction,
+            [[-3.0, 3.0], [-2.0, 2.0]],
+            -1.0316284535,
+            [[0.0898420131, -0.7126564030], [-0.0898420131, 0.7126564030]],
+        )
+    if name == "matyas":
+        return Problem(name, matyas_function, [[-10.0, 10.0]] * 2, 0.0, [0, 0])
+    if name == "cross_in_tray":
+        return Problem(
+            name,
+            cross_in_tray_function,
+            [[-10.0, 10.0]] * 2,
+            -2.0626118708,
+            [
+                [1.349406609, 1.349406609],
+                [1.349406609, -1.349406609],
+                [-1.349406609, 1.349406609],
+                [-1.349406609, -1.349406609],
+            ],
+        )
+    if name == "rastrigin":
+        return Problem(
+            name, rastrigin_function, [[-5.12, 5.12]] * dim, 0.0, [0.0] * dim
+        )
+    if name == "rotated_hyper_ellipsoid":
+        return Problem(
+            name,
+            rotated_hyper_ellipsoid_function,
+            [[-65.536, 65.536]] * dim,
+            0.0,
+            [0.0] * dim,
+        )
+    if name == "michalewicz":
+        f_opt, x_opt = _michalewicz_optimum(dim)
+        return Problem(
+            name, michalewicz_function, [[0.0, np.pi]] * dim, f_opt, x_opt
+        )
+
+    raise ValueError(
+        "Unknown benchmark problem %s, available are %s"
+        % (name, ", ".join(PROBLEMS))
+    )
+
+
+#: Names of the benchmark problems provided by get_problem
+PROBLEMS = (
+    "himmelblau",
+    "six_hump_camel",
+    "matyas",
+    "cross_in_tray",
+    "rastrigin",
+    "rotated_hyper_ellipsoid",
+    "michalewicz",
+)
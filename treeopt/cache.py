@@ -0,0 +1,304 @@
+import functools
+import hashlib
+import os
+import pickle
+import types
+
+import numpy as np
+from pathlib import Path
+
+
+def _pickled(value):
+    """
+    Returns the pickled content of a value, None if it can not be pickled
+    """
+
+    try:
+        return pickle.dumps(value, protocol=4)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return None
+
+
+def _code_identity(code):
+    """
+    Returns the bytecode, the constants and the names used by a code object,
+    including the code of nested functions. Unlike marshal, the file name and
+    the line numbers are left out, so moving a function does not change its
+    identity.
+    """
+
+    parts = [code.co_code, repr(code.co_names).encode()]
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            parts.append(_code_identity(const))
+        else:
+            parts.append(repr(const).encode())
+
+    return b"\0".join(parts)
+
+
+def _callable_identity(fun, seen=None):
+    """
+    Returns bytes that identify a callable by its code and by the values it
+    depends on, None if the identity can not be worked out:
+    * functools.partial: the wrapped function and the bound arguments
+    * bound methods: the function and the pickled instance
+    * functions (including lambdas): the name, the code, the defaults and
+      the values of the closure (functions in the closure are identified
+      recursively)
+    * builtin functions: the module and the name
+    * other callable objects: the code of their class's __call__ and the
+      pickled instance
+    """
+
+    seen = set() if seen is None else seen
+    if id(fun) in seen:
+        # Recursive closures refer to themselves
+        return b"<recursion>"
+    seen = seen | {id(fun)}
+
+    if isinstance(fun, functools.partial):
+        parts = [
+            _callable_identity(fun.func, seen),
+            _pickled(fun.args),
+            _pickled(fun.keywords),
+        ]
+    elif isinstance(fun, types.MethodType):
+        parts = [
+            _callable_identity(fun.__func__, seen),
+            _pickled(fun.__self__),
+        ]
+    elif isinstance(fun, types.FunctionType):
+        parts = [
+            ("%s.%s" % (fun.__module__, fun.__qualname__)).encode(),
+            _code_identity(fun.__code__),
+            _pickled(fun.__defaults__),
+            _pickled(fun.__kwdefaults__),
+        ]
+        for cell in fun.__closure__ or ():
+            try:
+                value = cell.cell_contents
+            except ValueError:
+                # The cell is not filled yet
+                parts.append(b"<empty>")
+                continue
+            if isinstance(value, types.ModuleType):
+                parts.append(value.__name__.encode())
+            elif callable(value) and not isinstance(value, type):
+                parts.append(_callable_identity(value, seen))
+            else:
+                parts.append(_pickled(value))
+    elif isinstance(fun, types.BuiltinFunctionType):
+        parts = [
+            ("%s.%s" % (fun.__module__, fun.__qualname__)).encode(),
+        ]
+    elif callable(fun) and not isinstance(fun, type):
+        parts = [
+            _callable_identity(type(fun).__call__, seen),
+            _pickled(fun),
+        ]
+    else:
+        return None
+
+    if any(part is None for part in parts):
+        return None
+
+    return b"\0".join(parts)
+
+
+def function_identity(fun, args=(), key=None):
+    """
+    Returns a hash that identifies a cost function together with its
+    additional arguments. The function is identified by its code and the
+    values it depends on (see _callable_identity), so two partials or
+    lambdas with different bound values, and a function whose body was
+    edited, get different hashes. The arguments are identified by their
+    pickled content (or their representation, if they can not be pickled).
+
+    :param fun: Cost function
+    :type fun: Python function
+    :param args: Additional arguments of the cost function
+    :type args: Tuple
+    :param key: Name, that identifies the cost function instead of its code
+        (default None, the code is used)
+    :type key: String
+    :return: Hexadecimal hash
+    :rtype: String
+    """
+
+    if key is not None:
+        fun_bytes = ("key:%s" % key).encode()
+    else:
+        fun_bytes = _callable_identity(fun)
+        if fun_bytes is None:
+            raise ValueError(
+                "The cost function %r can not be identified for the cache, "
+                "because its code or the values it depends on can not be "
+                "read or pickled. Pass a key to the EvaluationCache." % (fun,)
+            )
+
+    args_bytes = _pickled(tuple(args))
+    if args_bytes is None:
+        args_bytes = repr(args).encode()
+
+    digest = hashlib.sha256(fun_bytes)
+    digest.update(b"\0")
+    digest.update(args_bytes)
+
+    return digest.hexdigest()
+
+
+class EvaluationCache:
+    """
+    Disk-backed cache of the responses of cost functions. Each response is
+    stored in its own .npz file, named by the hash of the rounded design
+    vector, in a directory named by the identity of the cost function and its
+    arguments. The cache therefore survives the process and can be shared by
+    several runs and optimizers using the same directory.
+
+    Optionally, a point is also found if a cached point lies within the
+    distance tol (near-duplicates caused by floating point noise).
+
+    Cost functions, whose identity can not be worked out from their code
+    (see function_identity), are only cached with an explicit key. A key
+    is also needed for cost functions with state that changes during the
+    run (e.g. a closure over a counter), whose identity changes with it.
+    """
+
+    def __init__(self, directory, decimals=10, tol=None, key=None):
+        """
+        Opens a cache in directory, creating the directory if necessary
+
+        :param directory: Directory of the cache files
+        :type directory: String
+        :param decimals: Number of decimals the design vectors are rounded to
+            before hashing
+        :type decimals: Integer
+        :param tol: Distance within which a cached point is accepted as the
+            same point (default None, only equal rounded points match)
+        :type tol: Float
+        :param key: Name, that identifies the cost function instead of its
+            code, e.g. the name and version of a simulation (default None,
+            the code of the cost function is used)
+        :type key: String
+        """
+
+        self.directory = directory
+        self.key_name = key
+        self.decimals = decimals
+        self.tol = tol
+        self.hits = 0
+        self.misses = 0
+        self._points = {}
+        Path(directory).mkdir(parents=True, exist_ok=True)
+
+    def key(self, x):
+        """
+        Returns the hash of a rounded design vector
+
+        :param x: Point in the design space
+        :type x: Numpy array
+        :return: Hexadecimal hash
+        :rtype: String
+        """
+
+        rounded = np.round(
+            np.asarray(x, dtype=np.float64).ravel(), self.decimals
+        )
+        # Adding zero turns -0.0 into 0.0, so both get the same hash
+        return hashlib.sha256((rounded + 0.0).tobytes()).hexdigest()
+
+    def lookup(self, fun, args, x):
+        """
+        Returns the cached response of fun in the point x
+
+        :param fun: Cost function
+        :type fun: Python function
+        :param args: Additional arguments of the cost function
+        :type args: Tuple
+        :param x: Point in the design space
+        :type x: Numpy array
+        :return: Cached response, None if the point is not cached
+        :rtype: Numpy array
+        """
+
+        namespace = function_identity(fun, args, self.key_name)
+        path = self._path(namespace, self.key(x))
+
+        if not os.path.exists(path) and self.tol is not None:
+            path = self._nearest(namespace, x)
+
+        if path is None or not os.path.exists(path):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        with np.load(path) as file:
+            return file["y"]
+
+    def store(self, fun, args, x, y):
+        """
+        Stores the response of fun in the point x
+
+        :param fun: Cost function
+        :type fun: Python function
+        :param args: Additional arguments of the cost function
+        :type args: Tuple
+        :param x: Point in the design space
+        :type x: Numpy array
+        :param y: Response of the cost function
+        :type y: Numpy array
+        """
+
+        namespace = function_identity(fun, args, self.key_name)
+        key = self.key(x)
+        path = self._path(namespace, key)
+        Path(os.path.dirname(path)).mkdir(parents=True, exist_ok=True)
+
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as file:
+            np.savez(file, x=np.asarray(x, dtype=np.float64).ravel(), y=y)
+        os.replace(temp_path, path)
+
+        if namespace in self._points:
+            keys, points = self._points[namespace]
+            keys.append(key)
+            points.append(np.asarray(x, dtype=np.float64).ravel())
+
+    def _path(self, namespace, key):
+        """
+        Returns the path of the cache file of a point
+        """
+
+        return os.path.join(self.directory, namespace, key + ".npz")
+
+    def _nearest(self, namespace, x):
+        """
+        Returns the path of the cached point closest to x, if it lies within
+        the distance self.tol. The cached points of a namespace are read once
+        and kept in memory.
+        """
+
+        if namespace not in self._points:
+            keys, points = [], []
+            folder = os.path.join(self.directory, namespace)
+            if os.path.isdir(folder):
+                for name in sorted(os.listdir(folder)):
+                    if name.endswith(".npz"):
+                        with np.load(os.path.join(folder, name)) as file:
+                            points.append(file["x"])
+                        keys.append(name[: -len(".npz")])
+            self._points[namespace] = (keys, points)
+
+        keys, points = self._points[namespace]
+        if not keys:
+            return None
+
+        distances = np.linalg.norm(
+            np.array(points) - np.asarray(x, dtype=np.float64).ravel(), axis=1
+        )
+        nearest = np.argmin(distances)
+        if distances[nearest] > self.tol:
+            return None
+
+        return self._path(namespace, keys[nearest])
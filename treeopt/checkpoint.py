@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+from pathlib import Path
+
+
+def get_rng_state():
+    """
+    Returns the state of numpy's global random number generator as a
+    dictionary of arrays, which can be stored with save_checkpoint
+
+    :return: State of the random number generator
+    :rtype: Dictionary
+    """
+
+    _, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+
+    return {
+        "rng_keys": keys,
+        "rng_pos": np.array(pos),
+        "rng_has_gauss": np.array(has_gauss),
+        "rng_cached_gaussian": np.array(cached_gaussian),
+    }
+
+
+def set_rng_state(state):
+    """
+    Restores the state of numpy's global random number generator from a
+    dictionary created by get_rng_state
+
+    :param state: State of the random number generator
+    :type state: Dictionary
+    """
+
+    np.random.set_state(
+        (
+            "MT19937",
+            state["rng_keys"],
+            int(state["rng_pos"]),
+            int(state["rng_has_gauss"]),
+            float(state["rng_cached_gaussian"]),
+        )
+    )
+
+
+def save_checkpoint(path, **data):
+    """
+    Writes arrays into a .npz file. The data is written into a temporary file
+    first, which then replaces the checkpoint, so a crash while writing never
+    leaves a broken checkpoint behind.
+
+    :param path: Path of the checkpoint file
+    :type path: String
+    :param data: Arrays to be stored, passed as keywords
+    :type data: Numpy arrays
+    """
+
+    Path(os.path.dirname(os.path.abspath(path))).mkdir(
+        parents=True, exist_ok=True
+    )
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as file:
+        np.savez(file, **data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+def load_checkpoint(path):
+    """
+    Reads a checkpoint written by save_checkpoint
+
+    :param path: Path of the checkpoint file
+    :type path: String
+    :return: Stored arrays by their keywords, None if there is no checkpoint
+    :rtype: Dictionary
+    """
+
+    if not os.path.exists(path):
+        return None
+
+    with np.load(path) as file:
+        return {key: file[key] for key in file.files}
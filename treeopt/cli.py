@@ -53,11 +53,15 @@ def cli(info: Info, verbose: int):
     """Run treeopt."""
     # Use the verbosity count to determine the logging level...
     if verbose > 0:
-        logging.basicConfig(
-            level=LOGGING_LEVELS[verbose]
+        level = (
+            LOGGING_LEVELS[verbose]
             if verbose in LOGGING_LEVELS
             else logging.DEBUG
         )
+        logging.basicConfig(level=level)
+        # The diagnostics of the library (and the output of smt at DEBUG)
+        # follow the verbosity
+        logging.getLogger("treeopt").setLevel(level)
         click.echo(
             click.style(
                 f"Verbose logging is enabled. "
@@ -79,3 +83,58 @@ def hello(_: Info):
 def version():
     """Get the library version."""
     click.echo(click.style(f"{__version__}", bold=True))
+
+
+@cli.command()
+@click.option(
+    "--method",
+    "-m",
+    "methods",
+    multiple=True,
+    help="Metamodel to be measured (default: all).",
+)
+@click.option(
+    "--samples",
+    "-n",
+    "sample_counts",
+    multiple=True,
+    type=int,
+    help="Number of training points (default: 50 ... 5000).",
+)
+@click.option(
+    "--dimension",
+    "-d",
+    "dimensions",
+    multiple=True,
+    type=int,
+    help="Number of dimensions (default: 2 ... 50).",
+)
+@click.option(
+    "--time-limit",
+    type=float,
+    default=60.0,
+    help="Training time in seconds, above which larger sample counts are "
+    "skipped.",
+)
+@click.option(
+    "--output", "-o", type=click.Path(), help="JSON file for the results."
+)
+@pass_info
+def scaling(_: Info, methods, sample_counts, dimensions, time_limit, output):
+    """Measure the cost of the metamodels vs. sample count and dimension."""
+    from . import scaling as scaling_suite
+
+    results = scaling_suite.sweep(
+        methods=list(methods) or None,
+        sample_counts=sample_counts or scaling_suite.SAMPLE_COUNTS,
+        dimensions=dimensions or scaling_suite.DIMENSIONS,
+        time_limit=time_limit,
+        path=output,
+    )
+    for m in results["measurements"]:
+        click.echo(
+            f"{m['method']:16s} n={m['n']:5d} d={m['d']:3d} "
+            f"train={m['train_time']:9.3f}s "
+            f"values={m['predict_values_rate']:12.0f}/s "
+            f"memory={m['train_memory'] / 2 ** 20:8.1f}MiB"
+        )
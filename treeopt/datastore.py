@@ -0,0 +1,277 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+class SampleStore:
+    """
+    Storage for the points of the design space and the corresponding system
+    responses of an optimization. The data is kept in contiguous float64
+    buffers, whose capacity is doubled when they are full. Appending a point
+    therefore costs amortized O(1), instead of copying the whole history as
+    np.vstack does. The properties x and y return views of the filled part of
+    the buffers.
+
+    The points are indexed: find looks up a stored point in O(1) by its exact
+    value, nearest and query_radius search a set of k-d trees over
+    consecutive blocks of rows. Whenever 32 new points have been appended,
+    they form a new block, which is merged with the preceding blocks that
+    are not larger than itself. Each point is therefore part of O(log n)
+    tree builds and a query searches O(log n) trees plus the at most 32
+    newest points.
+    """
+
+    def __init__(self, capacity=64):
+        """
+        Initializes an empty store
+
+        :param capacity: Number of rows that are allocated for the first
+            append
+        :type capacity: Integer
+        """
+        self._capacity = max(int(capacity), 1)
+        self._buffers = {"x": None, "y": None}
+        self._rows = {"x": 0, "y": 0}
+        self._reset_index()
+
+    def __len__(self):
+        """
+        Returns the number of complete samples, i.e. points of which the
+        system response is known.
+        """
+        return min(self._rows["x"], self._rows["y"])
+
+    @property
+    def x(self):
+        """
+        View of the stored points of the design space, one point per row.
+        None, as long as no point was stored.
+        """
+        return self._view("x")
+
+    @x.setter
+    def x(self, data):
+        """
+        Replaces all stored points of the design space
+        """
+        self._reset("x", data, True)
+
+    @property
+    def y(self):
+        """
+        View of the stored system responses, one response per row. None, as
+        long as no response was stored.
+        """
+        return self._view("y")
+
+    @y.setter
+    def y(self, data):
+        """
+        Replaces all stored system responses
+        """
+        self._reset("y", data, False)
+
+    def append_x(self, xi):
+        """
+        Appends one or several points to the design space. A one dimensional
+        array is treated as a single point.
+
+        :param xi: Point(s) in the design space
+        :type xi: Numpy array
+        """
+        self._append("x", xi, True)
+
+    def append_y(self, yi):
+        """
+        Appends one or several system responses. Before the number of
+        responses per point is known, a one dimensional array is treated as
+        one response per point.
+
+        :param yi: System response(s)
+        :type yi: Numpy array
+        """
+        self._append("y", yi, False)
+
+    def append(self, xi, yi):
+        """
+        Appends points of the design space together with their system
+        responses
+
+        :param xi: Point(s) in the design space
+        :type xi: Numpy array
+        :param yi: System response(s)
+        :type yi: Numpy array
+        """
+        self.append_x(xi)
+        self.append_y(yi)
+
+    def clear(self):
+        """
+        Removes all points and responses, but keeps the allocated buffers.
+        Views returned before are overwritten by following appends.
+        """
+        self._rows = {"x": 0, "y": 0}
+        self._reset_index()
+
+    def find(self, xi):
+        """
+        Returns the row of a point, that is exactly equal to xi
+
+        :param xi: Point in the design space
+        :type xi: Numpy array
+        :return: Row of the point, None if the point is not stored
+        :rtype: Integer
+        """
+        if self._buffers["x"] is None:
+            return None
+        return self._rows_by_value.get(self._value_key(xi))
+
+    def nearest(self, xi):
+        """
+        Returns the distance and row of the stored point closest to xi
+
+        :param xi: Point in the design space
+        :type xi: Numpy array
+        :return: Distance and row, (inf, None) if no point is stored
+        :rtype: Tuple
+        """
+        best = (np.inf, None)
+        if self._buffers["x"] is None:
+            return best
+
+        xi = self._as_rows("x", xi, True)[0]
+        for tree, start in self._trees:
+            distance, row = tree.query(xi)
+            if distance < best[0]:
+                best = (distance, start + int(row))
+
+        tail = self.x[self._tree_rows :]
+        if len(tail) > 0:
+            distances = np.linalg.norm(tail - xi, axis=1)
+            row = int(np.argmin(distances))
+            if distances[row] < best[0]:
+                best = (distances[row], self._tree_rows + row)
+
+        return best
+
+    def query_radius(self, xi, radius):
+        """
+        Returns the rows of all stored points within a distance of xi
+
+        :param xi: Point in the design space
+        :type xi: Numpy array
+        :param radius: Maximum distance
+        :type radius: Float
+        :return: Rows of the points, sorted by distance
+        :rtype: Numpy array
+        """
+        if self._buffers["x"] is None:
+            return np.zeros(0, dtype=int)
+
+        xi = self._as_rows("x", xi, True)[0]
+        rows = [
+            start + np.asarray(tree.query_ball_point(xi, radius), dtype=int)
+            for tree, start in self._trees
+        ]
+
+        tail = self.x[self._tree_rows :]
+        if len(tail) > 0:
+            near = np.flatnonzero(np.linalg.norm(tail - xi, axis=1) <= radius)
+            rows.append(self._tree_rows + near)
+
+        rows = np.concatenate(rows + [np.zeros(0, dtype=int)]).astype(int)
+        distances = np.linalg.norm(self.x[rows] - xi, axis=1)
+
+        return rows[np.argsort(distances, kind="stable")]
+
+    def _value_key(self, xi):
+        """
+        Returns the key of a point in the exact lookup table. Adding zero
+        turns -0.0 into 0.0.
+        """
+        return (self._as_rows("x", xi, True)[0] + 0.0).tobytes()
+
+    def _reset_index(self):
+        """
+        Drops the lookup table and the k-d trees of the points
+        """
+        self._rows_by_value = {}
+        self._trees = []
+        self._tree_sizes = []
+        self._tree_rows = 0
+
+    def _index(self, start, stop):
+        """
+        Adds the points in the rows start to stop to the index
+        """
+        points = self._buffers["x"]
+        for row in range(start, stop):
+            self._rows_by_value.setdefault(self._value_key(points[row]), row)
+
+        if stop - self._tree_rows >= 32:
+            start = self._tree_rows
+            while self._tree_sizes and self._tree_sizes[-1] <= stop - start:
+                start -= self._tree_sizes.pop()
+                self._trees.pop()
+            self._trees.append((cKDTree(points[start:stop].copy()), start))
+            self._tree_sizes.append(stop - start)
+            self._tree_rows = stop
+
+    def _view(self, name):
+        """
+        Returns the filled part of a buffer
+        """
+        if self._buffers[name] is None:
+            return None
+        return self._buffers[name][: self._rows[name]]
+
+    def _as_rows(self, name, data, vector_is_row):
+        """
+        Converts data into a two dimensional float64 array with the number of
+        columns of the buffer
+        """
+        data = np.asarray(data, dtype=np.float64)
+        if self._buffers[name] is not None:
+            return data.reshape(-1, self._buffers[name].shape[1])
+        if data.ndim >= 2:
+            return data.reshape(-1, data.shape[-1])
+        if vector_is_row:
+            return data.reshape(1, -1)
+        return data.reshape(-1, 1)
+
+    def _reset(self, name, data, vector_is_row):
+        """
+        Drops a buffer and fills a new one with data. Views of the old buffer
+        stay valid.
+        """
+        self._buffers[name] = None
+        self._rows[name] = 0
+        if name == "x":
+            self._reset_index()
+        if data is not None:
+            self._append(name, data, vector_is_row)
+
+    def _append(self, name, data, vector_is_row):
+        """
+        Writes data behind the filled part of a buffer, after doubling its
+        capacity if necessary
+        """
+        rows = self._as_rows(name, data, vector_is_row)
+        buffer = self._buffers[name]
+        start = self._rows[name]
+        stop = start + rows.shape[0]
+
+        if buffer is None:
+            capacity = max(self._capacity, stop)
+            buffer = np.empty((capacity, rows.shape[1]), dtype=np.float64)
+        elif stop > buffer.shape[0]:
+            capacity = max(2 * buffer.shape[0], stop)
+            grown = np.empty((capacity, buffer.shape[1]), dtype=np.float64)
+            grown[:start] = buffer[:start]
+            buffer = grown
+
+        buffer[start:stop] = rows
+        self._buffers[name] = buffer
+        self._rows[name] = stop
+
+        if name == "x":
+            self._index(start, stop)
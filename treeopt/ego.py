@@ -1,30 +1,56 @@
+import logging
+import time
+
 import numpy as np
 
-from smt.applications import EGO
 from smt.surrogate_models import KRG
+from treeopt.metamodel import IncrementalKriging, smt_options
 import scipy.optimize as sciopt
 
+import treeopt.checkpoint as checkpoint
+import treeopt.instrument as instrument
+import treeopt.optimize as optimize
+import treeopt.termination as termination
+from treeopt.datastore import SampleStore
 from treeopt.visualize2 import VisualizeMetamodel
 
 import matplotlib.pyplot as plt
 
+logger = logging.getLogger(__name__)
+
 class OptimizeEGO:
     """
     Class that runs a Efficient Global Optimization Algorithm on a metamodel. The number of iterations is not fixed.
     The algorithm runs until one of two possible termination criteria is fulfilled. The first criterion checks, if two
     support points of the metamodel are closer than a minimum threshold. If that state is not archived prior before a
-    maximum of allowed function evaluations is reached, the optimization also terminates.
+    maximum of allowed function evaluations is reached, the optimization also terminates. Further policies of the
+    termination module can be added with the termination property.
+
+    The kriging surrogate is kept between the iterations and updated with each new point. Its hyperparameters are
+    kept fixed in between and warm-started from their previous values when they are optimized again.
     """
     def __init__(self):
         self._doe_data = None
-        self._x_data = []
-        self._y_data = []
+        self._data = SampleStore()
         self._opti_object = None
         self._x_limits = None
         self._num_evals = 0
         self._max_evals = None
         self._x_opt = None
         self._y_opt = None
+        self._x_opt_ego = None
+        self._checkpoint = None
+        self._cache = None
+        self._duplicate_radius = 0.0
+        self._min_distance = np.inf
+        self._n_start = 50
+        self._surrogate = None
+        self._termination = None
+        self._instrumentation = instrument.Instrumentation()
+        self.state = None
+        self.termination_reason = None
+        self._start_time = None
+        self._ite = 0
 
     @property
     def doe_data(self):
@@ -44,38 +70,69 @@ class OptimizeEGO:
     @property
     def x_data(self):
         """
-        Getter for the self._x_data variable. The variable stores the input variables that have been simulated.
+        Getter for the input variables that have been simulated. Returns a view of the points stored in a SampleStore,
+        one point per row.
         """
-        return self._x_data
+        x = self._data.x
+        return np.zeros((0, 0)) if x is None else x
 
     @x_data.setter
     def x_data(self, data):
         """
-        Setter for the self._x_data variable. If the variable is empty, the variable is overwritten. In all other cases
-        the data is appended to the list.
+        Setter for the input variables. The data is appended to the points that have been simulated. The distance of
+        each new point to its nearest neighbour updates the minimum distance between all points.
         """
-        if self._x_data is None:
-            self._x_data = data
-        else:
-            self._x_data.append(data)
+        for point in np.atleast_2d(data):
+            distance, _ = self._data.nearest(point)
+            self._min_distance = min(self._min_distance, distance)
+            self._data.append_x(point)
 
     @property
     def y_data(self):
         """
-        Getter for the self._y_data variable. the variable stores the output variables that have been simulated.
+        Getter for the output variables that have been simulated. Returns a view of the responses stored in a
+        SampleStore, one response per row.
         """
-        return self._y_data
+        y = self._data.y
+        return np.zeros((0, 1)) if y is None else y
 
     @y_data.setter
     def y_data(self, data):
         """
-        Setter for the self._y_data variable. If the variable is empty, the variable is overwritten. In all other cases
-        the data is appended to the list.
+        Setter for the output variables. The data is appended to the responses that have been simulated.
         """
-        if self._y_data is None:
-            self.y_data = data
-        else:
-            self._y_data.append(data)
+        self._data.append_y(data)
+
+    @property
+    def min_distance(self):
+        """
+        Getter for the distance of the two closest points in the self.x_data variable. The value is updated whenever
+        a point is added, so reading it is cheap. It is infinite as long as less than two points are stored.
+        """
+        return self._min_distance
+
+    @property
+    def n_start(self):
+        """
+        Getter for the self._n_start variable. The variable stores the number of random candidate points for the search
+        of the largest expected improvement.
+        """
+        return self._n_start
+
+    @n_start.setter
+    def n_start(self, number):
+        """
+        Setter for the self._n_start variable
+        """
+        self._n_start = number
+
+    @property
+    def surrogate(self):
+        """
+        Getter for the self._surrogate variable. The variable stores the kriging surrogate trained on the simulated
+        data.
+        """
+        return self._surrogate
 
     @property
     def opti_object(self):
@@ -164,66 +221,289 @@ class OptimizeEGO:
         """
         self._num_evals = num
 
+    @property
+    def checkpoint(self):
+        """
+        Getter for the self._checkpoint variable. The variable stores the path of a .npz file, in which the simulated
+        data is stored after each function evaluation.
+        """
+        return self._checkpoint
+
+    @checkpoint.setter
+    def checkpoint(self, path):
+        """
+        Setter for the self._checkpoint variable
+        """
+        self._checkpoint = path
+
+    @property
+    def cache(self):
+        """
+        Getter for the self._cache variable. The variable stores an EvaluationCache, in which the results of the
+        objective function are stored across runs. Points found in the cache are not simulated.
+        """
+        return self._cache
+
+    @cache.setter
+    def cache(self, cache):
+        """
+        Setter for the self._cache variable
+        """
+        self._cache = cache
+
+    @property
+    def duplicate_radius(self):
+        """
+        Getter for the self._duplicate_radius variable. A design vector within this distance of a simulated point is
+        treated as that point and not simulated again (default 0, only exactly equal points).
+        """
+        return self._duplicate_radius
+
+    @duplicate_radius.setter
+    def duplicate_radius(self, radius):
+        """
+        Setter for the self._duplicate_radius variable
+        """
+        self._duplicate_radius = radius
+
+    @property
+    def termination(self):
+        """
+        Getter for the self._termination variable. The variable stores a policy of the termination module (e.g.
+        termination.Stall(5) | termination.WallClock(3600)), which stops the optimization in addition to the minimum
+        distance and the maximum number of function evaluations (default None, no further policy).
+        """
+        return self._termination
+
+    @termination.setter
+    def termination(self, policy):
+        """
+        Setter for the self._termination variable
+        """
+        self._termination = policy
+
+    @property
+    def instrumentation(self):
+        """
+        Getter for the self._instrumentation variable. The variable stores an Instrumentation, which measures the wall
+        time of the phases of each iteration ("simulation", "fit", "acquisition", "io") and counts the predictions of
+        the surrogate. After the initial points, each iteration and the end of the optimization an event is passed to
+        its callback and written to its JSON-lines trace file.
+        """
+        return self._instrumentation
+
+    @instrumentation.setter
+    def instrumentation(self, instrumentation):
+        """
+        Setter for the self._instrumentation variable
+        """
+        self._instrumentation = instrumentation
+
+    def emit_event(self, event, **data):
+        """
+        Reports an event of the optimization with the number of function evaluations and the current best value to
+        the instrumentation.
+        """
+        return self.instrumentation.emit(
+            event, optimizer="OptimizeEGO", num_evals=self.num_evals, best=float(np.min(self.y_data[:, 0])), **data
+        )
+
+    def find_datapoint(self, datapoint):
+        """
+        Returns the index of a simulated point that is equal to the datapoint or lies within the duplicate radius
+        around it. Returns None if there is no such point.
+        """
+        index = self._data.find(datapoint)
+        if index is None and self.duplicate_radius > 0:
+            near = self._data.query_radius(datapoint, self.duplicate_radius)
+            if near.size > 0:
+                index = int(near[0])
+
+        return index
+
+    def save_checkpoint(self):
+        """
+        Writes the simulated data, the number of function evaluations and iterations, the wall time and the state of
+        numpy's random number generator into the checkpoint file, if a checkpoint is set.
+        """
+        if self.checkpoint is None:
+            return
+
+        with self.instrumentation.phase("io"):
+            self._save_checkpoint()
+
+    def elapsed(self):
+        """
+        Returns the wall time of do_ego in seconds, measured from the start of the DoE and including the time of the
+        run a resumed checkpoint was written by.
+        """
+        if self._start_time is None:
+            return 0.0
+        return time.perf_counter() - self._start_time
+
+    def _save_checkpoint(self):
+        """
+        Writes the checkpoint file
+        """
+        checkpoint.save_checkpoint(
+            self.checkpoint,
+            x_data=self.x_data,
+            y_data=self.y_data,
+            num_evals=np.array(self.num_evals),
+            ite=np.array(self.state.ite if self.state is not None else 0),
+            elapsed=np.array(self.elapsed()),
+            **checkpoint.get_rng_state()
+        )
+
+    def load_checkpoint(self):
+        """
+        Restores the simulated data from the checkpoint file. Returns False if there is no checkpoint file.
+        """
+        state = checkpoint.load_checkpoint(self.checkpoint)
+        if state is None:
+            return False
+
+        self._data = SampleStore()
+        self._min_distance = np.inf
+        self._surrogate = None
+        self.x_data = state["x_data"]
+        self.y_data = state["y_data"]
+        self.num_evals = int(state["num_evals"])
+        self._ite = int(state.get("ite", 0))
+        if self._start_time is not None:
+            # The wall clock continues from the time of the checkpoint
+            self._start_time -= float(state.get("elapsed", 0.0))
+        checkpoint.set_rng_state(state)
+
+        return True
+
     def get_datapoints(self):
         """
         Function that returns disappoints to the metamodel. For the first iteration the date from the self.doe_data
         """
-        if self.x_data == []:
+        if len(self._data) == 0:
             return self.doe_data
         else:
-            return np.array(self.x_data)
+            return self.x_data
 
     def calc_min_distance(self):
         """
         Function that returns the distance of the two closest points in the self.x_data variable.
         """
-        data = []
-
-        for i_num, prim_element in enumerate(self.x_data):
-            for sec_element in self.x_data[i_num + 1:]:
-                data.append(
-                    np.linalg.norm(
-                        np.abs(np.array(prim_element) - np.array(sec_element))
-                    )
-                )
-
-        return min(data)
+        return self.min_distance
 
     def solve_problem(self, design_vector):
         """
         Function that returns the simulation result for a given design vector. If the value is already known, the
-        simulation is not started but the value from the self.y_data variable gets returned.
+        simulation is not started but the value from the self.y_data variable (or from the cache) gets returned.
         """
         ret = []
-        for datapoint in design_vector.tolist():
-            if datapoint in self.x_data:
-                ret.append(self.y_data[self.x_data.index(datapoint)])
+        for datapoint in np.atleast_2d(design_vector):
+            index = self.find_datapoint(datapoint)
+            if index is not None:
+                ret.append(self.y_data[index])
             else:
-                result = self.opti_object(datapoint)
+                result = None
+                if self.cache is not None:
+                    result = self.cache.lookup(self.opti_object, (), datapoint)
+                if result is None:
+                    with self.instrumentation.phase("simulation"):
+                        result = self.opti_object(datapoint.tolist())
+                    self.num_evals += 1
+                    if self.cache is not None:
+                        with self.instrumentation.phase("io"):
+                            self.cache.store(self.opti_object, (), datapoint, result)
                 self.x_data = datapoint
                 self.y_data = result
-                self.num_evals += 1
-                ret.append(result)
+                self.save_checkpoint()
+                ret.append(self.y_data[-1])
 
         return np.array(ret)
 
-    def do_ego(self, min_dist):
-        """
-        Starts the EGO algorithm for the next iteration.
-        """
+    def do_ego(self, min_dist, resume=False):
+        """
+        Starts the EGO algorithm. In each iteration the surrogate is updated
+        and the point of the largest expected improvement is simulated. The
+        search of that point also starts at the current best point. If
+        resume is True and a checkpoint file exists, the optimization starts
+        from the stored data and points that have been simulated before are
+        not simulated again.
+        """
+        # The wall clock of the termination policies includes the DoE
+        self._start_time = time.perf_counter()
+        self._ite = 0
+        self.state = None
+        if resume and self.checkpoint is not None:
+            self.load_checkpoint()
+
+        if self.doe_data is not None:
+            # A checkpoint may have been written within the DoE. Its points
+            # are found and not simulated again, the missing ones are
+            self.solve_problem(self.doe_data)
+        else:
+            self.solve_problem(self.get_datapoints())
+
+        policy = termination.MinSpacing(min_dist)
+        if self.max_evals is not None:
+            policy = policy | termination.MaxEvaluations(self.max_evals)
+        if self.termination is not None:
+            policy = policy | self.termination
+        self.state = termination.State(
+            self._ite,
+            self.num_evals,
+            np.min(self.y_data[:, 0]),
+            self.elapsed(),
+        )
+        self.emit_event("doe")
+
         done = False
         while not done:
-            ego = EGO(
-                n_iter=1,
-                criterion="EI",
-                n_start=50,
-                xdoe=self.get_datapoints(),
-                xlimits=self.x_limits,
+            with self.instrumentation.phase("fit"):
+                self.train_surrogate()
+
+            with self.instrumentation.phase("acquisition"):
+                x_new, ei = optimize.maximize_expected_improvement(
+                    self.instrumentation.wrap(self.surrogate),
+                    self.x_limits,
+                    np.min(self.y_data[:, 0]),
+                    n_start=self.n_start,
+                    starts=self.x_opt,
+                )
+            known = self.find_datapoint(x_new) is not None
+            self.solve_problem(x_new)
+
+            best = np.argmin(self.y_data[:, 0])
+            self.x_opt = self.x_data[best]
+            self.y_opt = self.y_data[best]
+
+            self.state.update(self.state.ite + 1, self.num_evals, self.y_opt[0], ei, self.calc_min_distance())
+            self.termination_reason = "known point" if known else policy.reason(self.state)
+            done = self.termination_reason is not None
+            self.save_checkpoint()
+            self.emit_event("iteration", ite=self.state.ite, expected_improvement=ei, termination=self.termination_reason)
+            logger.info(
+                "EGO iteration %d: %d evaluations, best value %g, expected improvement %g",
+                self.state.ite, self.num_evals, self.y_opt[0], ei,
             )
-            self.x_opt, self.y_opt, _, x_data, y_data = ego.optimize(fun=self.solve_problem)
 
-            if self.calc_min_distance() < min_dist or self.num_evals == self.max_evals:
-                done = True
+        logger.info("EGO finished: %s", self.termination_reason)
+
+        self.emit_event("end", termination=self.termination_reason, total=self.instrumentation.summary())
+
+    def train_surrogate(self):
+        """
+        Trains the kriging surrogate on the simulated data. After the first training, the surrogate is only updated
+        with the new points. Its hyperparameters stay fixed and are optimized again every few points, starting from
+        their previous values (see IncrementalKriging).
+        """
+        if self._surrogate is None:
+            self._surrogate = IncrementalKriging()
+            self._surrogate.set_training_values(self.x_data, self.y_data)
+            self._surrogate.train()
+        else:
+            num = self._surrogate.num_training_points
+            if num < len(self._data):
+                self._surrogate.update(self.x_data[num:], self.y_data[num:])
 
     def conv_plot(self):
         """
@@ -252,7 +532,7 @@ class OptimizeEGO:
         Function that plots the simulated points in the design space. Only works for functions with a two dimensional
         design space.
         """
-        data = np.array(self.x_data)
+        data = self.x_data
         len_doe = len(self._doe_data)
 
         plt.plot(data[:, 0][:len_doe], data[:, 1][:len_doe], "rx")
@@ -275,8 +555,8 @@ class OptimizeEGO:
         """
         Visualizes the created metamodell using the VisualizeMetamodel class.
         """
-        sm = KRG(theta0=[1e-2])
-        sm.set_training_values(np.array(self.x_data), np.array(self.y_data))
+        sm = KRG(theta0=[1e-2], **smt_options())
+        sm.set_training_values(self.x_data, self.y_data)
         sm.train()
 
         vis = VisualizeMetamodel()
@@ -0,0 +1,315 @@
+import threading
+import time
+
+import numpy as np
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+
+
+def _timed_call(fun, xi, args):
+    """
+    Evaluates the cost function in a single point of the design space and
+    measures the wall time of the call
+
+    :param fun: Cost function, called as fun(x, arg1, ..., argN)
+    :type fun: Python function
+    :param xi: One point in the design space
+    :type xi: Numpy array
+    :param args: Additional arguments of the cost function
+    :type args: Tuple
+    :return: System response and wall time of the call in seconds
+    :rtype: Tuple
+    """
+
+    start = time.perf_counter()
+    yi = fun(np.atleast_2d(xi), *args)
+    return yi, time.perf_counter() - start
+
+
+def make_executor(method, n_workers=None):
+    """
+    Creates an executor matching an evaluation method, which can be used to
+    submit single evaluations with the submit function. Process pools are
+    used for evaluate.process_pool, thread pools for all other methods.
+
+    :param method: one of the evaluate functions
+    :type method: python function
+    :param n_workers: Number of threads or processes
+    :type n_workers: Integer
+    :return: Executor running the evaluations
+    :rtype: concurrent.futures.Executor
+    """
+
+    if method is process_pool:
+        return ProcessPoolExecutor(max_workers=n_workers)
+    return ThreadPoolExecutor(max_workers=n_workers)
+
+
+def submit(executor, fun, xi, args=()):
+    """
+    Submits the evaluation of the cost function in a single point to an
+    executor
+
+    :param executor: Executor created with make_executor
+    :type executor: concurrent.futures.Executor
+    :param fun: Cost function, called as fun(x, arg1, ..., argN)
+    :type fun: Python function
+    :param xi: One point in the design space
+    :type xi: Numpy array
+    :param args: Additional arguments of the cost function
+    :type args: Tuple
+    :return: Future, whose result is the system response and the wall time
+        of the evaluation
+    :rtype: concurrent.futures.Future
+    """
+
+    return executor.submit(_timed_call, fun, xi, tuple(args))
+
+
+def _pool(executor_class, fun, x, args, n_workers, callback):
+    """
+    Submits every point of x to an executor and collects the results in the
+    order of x, regardless of the order in which the evaluations finish
+
+    :param executor_class: Class of the executor that runs the evaluations
+    :type executor_class: concurrent.futures.Executor
+    :return: System responses and wall times of each evaluation
+    :rtype: Tuple
+    """
+
+    y = [None] * len(x)
+    times = np.zeros(len(x))
+
+    with executor_class(max_workers=n_workers) as executor:
+        futures = {
+            executor.submit(_timed_call, fun, xi, tuple(args)): i
+            for i, xi in enumerate(x)
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            y[i], times[i] = future.result()
+            if callback is not None:
+                callback(i, y[i], times[i])
+
+    return np.vstack(y), times
+
+
+def serial(fun, x, args=(), n_workers=None, callback=None):
+    """
+    Evaluates the cost function one point after another
+
+    :param fun: Cost function, called as fun(x, arg1, ..., argN) with x being
+        a single row of the design space
+    :type fun: Python function
+    :param x: Points in the design space, one point per row
+    :type x: Numpy array
+    :param args: Additional arguments of the cost function
+    :type args: Tuple
+    :param n_workers: Unused, exists for a common signature of all evaluators
+    :type n_workers: Integer
+    :param callback: Function called as callback(i, yi, wall_time) each time
+        the evaluation of the i-th point finished
+    :type callback: Python function
+    :return: System responses in the order of x (one row per point) and the
+        wall time of each evaluation in seconds
+    :rtype: Tuple
+    """
+
+    y = []
+    times = np.zeros(len(x))
+
+    for i, xi in enumerate(x):
+        yi, times[i] = _timed_call(fun, xi, args)
+        y.append(yi)
+        if callback is not None:
+            callback(i, yi, times[i])
+
+    return np.vstack(y), times
+
+
+def thread_pool(fun, x, args=(), n_workers=None, callback=None):
+    """
+    Evaluates the cost function concurrently in a pool of threads. Suited for
+    cost functions that spend their time outside of the python interpreter,
+    e.g. in external simulation programs.
+
+    :param fun: Cost function, called as fun(x, arg1, ..., argN) with x being
+        a single row of the design space
+    :type fun: Python function
+    :param x: Points in the design space, one point per row
+    :type x: Numpy array
+    :param args: Additional arguments of the cost function
+    :type args: Tuple
+    :param n_workers: Number of threads (default: chosen by python)
+    :type n_workers: Integer
+    :param callback: Function called as callback(i, yi, wall_time) each time
+        the evaluation of the i-th point finished
+    :type callback: Python function
+    :return: System responses in the order of x (one row per point) and the
+        wall time of each evaluation in seconds
+    :rtype: Tuple
+    """
+
+    return _pool(ThreadPoolExecutor, fun, x, args, n_workers, callback)
+
+
+def process_pool(fun, x, args=(), n_workers=None, callback=None):
+    """
+    Evaluates the cost function concurrently in a pool of processes. The cost
+    function and its arguments have to be picklable, i.e. defined on module
+    level.
+
+    :param fun: Cost function, called as fun(x, arg1, ..., argN) with x being
+        a single row of the design space
+    :type fun: Python function
+    :param x: Points in the design space, one point per row
+    :type x: Numpy array
+    :param args: Additional arguments of the cost function
+    :type args: Tuple
+    :param n_workers: Number of processes (default: number of CPUs)
+    :type n_workers: Integer
+    :param callback: Function called as callback(i, yi, wall_time) each time
+        the evaluation of the i-th point finished
+    :type callback: Python function
+    :return: System responses in the order of x (one row per point) and the
+        wall time of each evaluation in seconds
+    :rtype: Tuple
+    """
+
+    return _pool(ProcessPoolExecutor, fun, x, args, n_workers, callback)
+
+
+def vectorized(fun, x, args=(), n_workers=None, callback=None):
+    """
+    Evaluates the cost function in one call with the whole matrix x. The cost
+    function has to return one row (or one value) per row of x. The wall time
+    of the call is distributed evenly over all points.
+
+    :param fun: Cost function, called as fun(x, arg1, ..., argN) with x being
+        all points of the design space at once
+    :type fun: Python function
+    :param x: Points in the design space, one point per row
+    :type x: Numpy array
+    :param args: Additional arguments of the cost function
+    :type args: Tuple
+    :param n_workers: Unused, exists for a common signature of all evaluators
+    :type n_workers: Integer
+    :param callback: Function called as callback(i, yi, wall_time) for each
+        point after the call finished
+    :type callback: Python function
+    :return: System responses in the order of x (one row per point) and the
+        wall time of each evaluation in seconds
+    :rtype: Tuple
+    """
+
+    x = np.atleast_2d(x)
+
+    start = time.perf_counter()
+    y = np.asarray(fun(x, *args))
+    wall_time = time.perf_counter() - start
+
+    y = y.reshape(x.shape[0], -1)
+    times = np.full(x.shape[0], wall_time / max(x.shape[0], 1))
+
+    if callback is not None:
+        for i, yi in enumerate(y):
+            callback(i, yi, times[i])
+
+    return y, times
+
+
+class BatchEvaluator:
+    """
+    Collects the points, that several threads request at the same time, and
+    evaluates them in one call of a batched cost function. Each of the
+    num_clients threads calls the evaluator with its points and waits; once
+    every thread, that has not finished yet, waits, all requested points are
+    evaluated at once and the responses are returned to their threads. A
+    thread has to call finish when it needs no further evaluations.
+    """
+
+    def __init__(self, fun, num_clients, args=(), kwargs=None, callback=None):
+        """
+        :param fun: Batched cost function, called as fun(x, arg1, ...,
+            argN, **kwargs) with one point per row of x, returning one row
+            per point
+        :type fun: Python function
+        :param num_clients: Number of threads requesting evaluations
+        :type num_clients: Integer
+        :param args: Additional arguments of the cost function
+        :type args: Tuple
+        :param kwargs: Additional keyword arguments of the cost function
+        :type kwargs: Dictionary
+        :param callback: Function called as callback(x, y) after each call
+            of the cost function
+        :type callback: Python function
+        """
+
+        self.fun = fun
+        self.args = tuple(args)
+        self.kwargs = kwargs or {}
+        self.callback = callback
+        self.num_active = num_clients
+        self.num_calls = 0
+        self._pending = []
+        self._condition = threading.Condition()
+
+    def __call__(self, x):
+        """
+        Requests the evaluation of points and waits for their responses
+
+        :param x: Points in the design space, one point per row
+        :type x: Numpy array
+        :return: Responses, one row per point
+        :rtype: Numpy array
+        """
+
+        request = {"x": np.atleast_2d(x)}
+        with self._condition:
+            self._pending.append(request)
+            self._evaluate_if_complete()
+            while "y" not in request and "error" not in request:
+                self._condition.wait()
+
+        if "error" in request:
+            raise request["error"]
+        return request["y"]
+
+    def finish(self):
+        """
+        Reports, that the calling thread needs no further evaluations
+        """
+
+        with self._condition:
+            self.num_active -= 1
+            self._evaluate_if_complete()
+
+    def _evaluate_if_complete(self):
+        """
+        Evaluates the pending points, if every active thread waits
+        """
+
+        if not self._pending or len(self._pending) < self.num_active:
+            return
+
+        requests, self._pending = self._pending, []
+        x = np.vstack([request["x"] for request in requests])
+        try:
+            y = np.asarray(self.fun(x, *self.args, **self.kwargs))
+            y = y.reshape(x.shape[0], -1)
+            self.num_calls += 1
+            if self.callback is not None:
+                self.callback(x, y)
+        except Exception as error:
+            for request in requests:
+                request["error"] = error
+        else:
+            first = 0
+            for request in requests:
+                num = request["x"].shape[0]
+                request["y"] = y[first : first + num]
+                first += num
+        self._condition.notify_all()
@@ -0,0 +1,266 @@
+import json
+import time
+
+import numpy as np
+from pathlib import Path
+
+import treeopt.benchmark as benchmark
+import treeopt.sampling as sampling
+import treeopt.termination as termination
+from treeopt.ego import OptimizeEGO
+from treeopt.treeOpt import adaptive_metamodell, least_squares
+
+
+class Recorder:
+    """
+    Wraps a benchmark problem and records every value it returns, in the
+    order of the calls, together with the wall time spent in the problem.
+    The optimizers only see the recorder, so the values are recorded in the
+    same way for all of them.
+    """
+
+    def __init__(self, problem):
+        """
+        :param problem: Benchmark problem
+        :type problem: benchmark.Problem
+        """
+        self.problem = problem
+        self.values = []
+        self.time = 0.0
+
+    def __call__(self, x, *args):
+        start = time.perf_counter()
+        y = self.problem(np.asarray(x, dtype=float))
+        self.time += time.perf_counter() - start
+        self.values.extend(np.ravel(y).tolist())
+
+        return y
+
+
+def run_adaptive_metamodell(problem, fun, budget, num_doe):
+    """
+    Minimizes a problem with adaptive_metamodell and the kriging metamodel,
+    until budget evaluations are done
+
+    :param problem: Benchmark problem
+    :type problem: benchmark.Problem
+    :param fun: Function to be minimized (the recorder of the problem)
+    :type fun: Python function
+    :param budget: Maximum number of evaluations
+    :type budget: Integer
+    :param num_doe: Number of points of the initial sampling
+    :type num_doe: Integer
+    """
+
+    opt = adaptive_metamodell()
+    opt.set_limits(problem.limits)
+    opt.set_num_doe(num_doe)
+    opt.set_cost_function(fun)
+    opt.set_termination(termination.MaxEvaluations(budget))
+    opt.optimize()
+
+
+def run_optimize_ego(problem, fun, budget, num_doe):
+    """
+    Minimizes a problem with OptimizeEGO, starting from a latin hypercube,
+    until budget evaluations are done or two points nearly coincide
+
+    :param problem: Benchmark problem
+    :type problem: benchmark.Problem
+    :param fun: Function to be minimized (the recorder of the problem)
+    :type fun: Python function
+    :param budget: Maximum number of evaluations
+    :type budget: Integer
+    :param num_doe: Number of points of the initial sampling
+    :type num_doe: Integer
+    """
+
+    ego = OptimizeEGO()
+    ego.opti_object = lambda x: fun(x)[0]
+    ego.x_limits = problem.limits
+    ego.doe_data = sampling.latin_hypercube(problem.limits, num_doe)
+    ego.max_evals = budget
+    width = problem.limits[:, 1] - problem.limits[:, 0]
+    ego.do_ego(1e-6 * np.linalg.norm(width))
+
+
+def run_least_squares(problem, fun, budget, num_doe):
+    """
+    Minimizes a problem with least_squares from a random start point. The
+    residual is sqrt(f(x) - f_opt) (or sqrt(f(x)), if the minimum is
+    unknown), so the cost of least squares is half the gap to the minimum.
+    As each iteration evaluates the problem d + 1 times (with the finite
+    difference Jacobian), the number of iterations is limited to
+    budget / (d + 1).
+
+    :param problem: Benchmark problem
+    :type problem: benchmark.Problem
+    :param fun: Function to be minimized (the recorder of the problem)
+    :type fun: Python function
+    :param budget: Maximum number of evaluations
+    :type budget: Integer
+    :param num_doe: Unused, exists for a common signature of all runners
+    :type num_doe: Integer
+    """
+
+    shift = problem.f_opt if problem.f_opt is not None else 0.0
+
+    def residual(x):
+        return np.sqrt(np.maximum(fun(x) - shift, 0.0))
+
+    opt = least_squares()
+    opt.set_cost_function(residual)
+    opt.set_start_point(
+        np.random.uniform(problem.limits[:, 0], problem.limits[:, 1])
+    )
+    opt.set_limits((problem.limits[:, 0], problem.limits[:, 1]))
+    opt.set_max_nfev(max(budget // (problem.dim + 1), 1))
+    opt.optimize()
+
+
+#: Runners of the optimizers by their names
+OPTIMIZERS = {
+    "adaptive_metamodell": run_adaptive_metamodell,
+    "OptimizeEGO": run_optimize_ego,
+    "least_squares": run_least_squares,
+}
+
+
+def run(
+    problem,
+    optimizer="adaptive_metamodell",
+    budget=30,
+    num_doe=None,
+    tol=1e-2,
+    seed=0,
+):
+    """
+    Minimizes a benchmark problem with one of the optimizers and measures
+    how fast it approaches the known minimum
+
+    :param problem: Benchmark problem or its name in benchmark.PROBLEMS
+    :type problem: benchmark.Problem
+    :param optimizer: Name of the optimizer in OPTIMIZERS
+    :type optimizer: String
+    :param budget: Maximum number of evaluations of the problem
+    :type budget: Integer
+    :param num_doe: Number of points of the initial sampling (default 5
+        points per dimension)
+    :type num_doe: Integer
+    :param tol: The target is reached, if a value below f_opt + tol is
+        found
+    :type tol: Float
+    :param seed: Seed of numpy's random number generator
+    :type seed: Integer
+    :return: Result with the keys problem, optimizer, dim, evaluations,
+        evaluations_to_target (None if the target was not reached), best,
+        gap, wall_time, simulation_time and overhead (the wall time spent
+        outside of the problem, mainly in the metamodel)
+    :rtype: Dictionary
+    """
+
+    if isinstance(problem, str):
+        problem = benchmark.get_problem(problem)
+    if num_doe is None:
+        num_doe = 5 * problem.dim
+
+    np.random.seed(seed)
+    recorder = Recorder(problem)
+
+    start = time.perf_counter()
+    OPTIMIZERS[optimizer](problem, recorder, budget, num_doe)
+    wall_time = time.perf_counter() - start
+
+    values = np.array(recorder.values)
+    best = float(np.min(values))
+    evaluations_to_target, gap = None, None
+    if problem.f_opt is not None:
+        gap = best - problem.f_opt
+        reached = np.flatnonzero(values <= problem.f_opt + tol)
+        if reached.size > 0:
+            evaluations_to_target = int(reached[0]) + 1
+
+    return {
+        "problem": problem.name,
+        "optimizer": optimizer,
+        "dim": problem.dim,
+        "evaluations": len(values),
+        "evaluations_to_target": evaluations_to_target,
+        "best": best,
+        "gap": gap,
+        "wall_time": wall_time,
+        "simulation_time": recorder.time,
+        "overhead": wall_time - recorder.time,
+    }
+
+
+def run_suite(problems=None, optimizers=None, path=None, **options):
+    """
+    Runs every optimizer on every problem
+
+    :param problems: Problems or their names (default all of
+        benchmark.PROBLEMS in two dimensions)
+    :type problems: List
+    :param optimizers: Names of the optimizers (default all of OPTIMIZERS)
+    :type optimizers: List
+    :param path: Path of a JSON file, into which the results are written
+    :type path: String
+    :param options: Options of run, e.g. budget=50
+    :return: Results of all runs, see run
+    :rtype: List
+    """
+
+    problems = benchmark.PROBLEMS if problems is None else problems
+    optimizers = list(OPTIMIZERS) if optimizers is None else optimizers
+
+    results = [
+        run(problem, optimizer, **options)
+        for problem in problems
+        for optimizer in optimizers
+    ]
+
+    if path is not None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(results, file, indent=2)
+
+    return results
+
+
+def report(results):
+    """
+    Formats results of run_suite as a table
+
+    :param results: Results of run or run_suite
+    :type results: List
+    :return: Table with one line per run
+    :rtype: String
+    """
+
+    header = "%-24s %-20s %5s %8s %10s %12s %10s %10s" % (
+        "problem",
+        "optimizer",
+        "evals",
+        "to_tgt",
+        "gap",
+        "wall_time",
+        "sim_time",
+        "overhead",
+    )
+    lines = [header, "-" * len(header)]
+    for result in results:
+        lines.append(
+            "%-24s %-20s %5d %8s %10.3g %12.3f %10.3f %10.3f"
+            % (
+                result["problem"],
+                result["optimizer"],
+                result["evaluations"],
+                result["evaluations_to_target"] or "-",
+                np.nan if result["gap"] is None else result["gap"],
+                result["wall_time"],
+                result["simulation_time"],
+                result["overhead"],
+            )
+        )
+
+    return "\n".join(lines)
@@ -0,0 +1,236 @@
+import contextlib
+import copy
+import json
+import threading
+import time
+
+import numpy as np
+from pathlib import Path
+
+# Methods of the metamodels, whose calls are counted by CountingModel
+PREDICT_METHODS = (
+    "predict_values",
+    "predict_variances",
+    "predict_derivatives",
+    "predict_variance_derivatives",
+)
+
+
+def _to_json(value):
+    """
+    Converts numpy objects, that the json module can not serialize
+    """
+
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return repr(value)
+
+
+class CountingModel:
+    """
+    Wraps a metamodel and counts the calls of its predict methods and the
+    number of predicted points in an Instrumentation. All other attributes
+    are taken from the wrapped metamodel. A deep copy (as made by
+    optimize.kriging_believer) copies the metamodel, but still counts in the
+    same Instrumentation.
+    """
+
+    def __init__(self, model, instrumentation):
+        """
+        :param model: Metamodel to be wrapped
+        :type model: Smt-object
+        :param instrumentation: Instrumentation, in which the calls are
+            counted
+        :type instrumentation: instrument.Instrumentation
+        """
+        self.model = model
+        self.instrumentation = instrumentation
+
+    def __getattr__(self, name):
+        model = self.__dict__.get("model")
+        if model is None:
+            raise AttributeError(name)
+        attribute = getattr(model, name)
+        if name not in PREDICT_METHODS:
+            return attribute
+
+        def counted(x, *args, **kwargs):
+            self.instrumentation.count(name, len(np.atleast_2d(x)))
+            return attribute(x, *args, **kwargs)
+
+        return counted
+
+    def __deepcopy__(self, memo):
+        return CountingModel(
+            copy.deepcopy(self.model, memo), self.instrumentation
+        )
+
+
+class Instrumentation:
+    """
+    Measures where the time of an optimization is spent. The loops of the
+    optimizers time their phases (e.g. "simulation", "fit", "acquisition",
+    "io") with the phase context manager and report an event after each
+    iteration. Phases can be nested, the time of an inner phase is not
+    counted in the outer phase. An event is a dictionary with the wall time
+    of each phase since the previous event, the calls of the predict methods
+    of the metamodel and the data given by the optimizer. Events are passed
+    to a callback, appended to a JSON-lines trace file, one JSON object per
+    line, and, if requested, kept in self.records. The totals of all events
+    are always available with summary, so memory does not grow with the
+    number of events by default.
+    """
+
+    def __init__(self, trace_path=None, callback=None, keep_records=False):
+        """
+        :param trace_path: Path of the JSON-lines trace file (default None,
+            no file is written). Existing files are continued.
+        :type trace_path: String
+        :param callback: Function called as callback(event) with each event
+        :type callback: Python function
+        :param keep_records: If True, all events are kept in self.records.
+            Least squares reports an event per evaluation, so the records of
+            long runs can become large.
+        :type keep_records: Bool
+        """
+
+        self.trace_path = trace_path
+        self.callback = callback
+        self.keep_records = keep_records
+        self.records = []
+        self.totals = {}
+        self.predict_calls = {}
+        self.predicted_points = 0
+        self._lock = threading.Lock()
+        self._times = {}
+        self._calls = {}
+        self._points = 0
+        self._local = threading.local()
+        self.start_time = time.perf_counter()
+
+        if trace_path is not None:
+            Path(trace_path).parent.mkdir(parents=True, exist_ok=True)
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Context manager, that adds its wall time to a phase
+
+        :param name: Name of the phase
+        :type name: String
+        """
+
+        stack = self._local.__dict__.setdefault("stack", [])
+        # Time of the inner phases
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            own = elapsed - stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            with self._lock:
+                self._times[name] = self._times.get(name, 0.0) + own
+                self.totals[name] = self.totals.get(name, 0.0) + own
+
+    def wrap(self, model):
+        """
+        Wraps a metamodel into a CountingModel, so its predictions are
+        counted. Metamodels that are wrapped already are returned as they
+        are.
+
+        :param model: Metamodel
+        :type model: Smt-object
+        :return: Wrapped metamodel
+        :rtype: instrument.CountingModel
+        """
+
+        if model is None or isinstance(model, CountingModel):
+            return model
+        return CountingModel(model, self)
+
+    def count(self, method, num_points):
+        """
+        Counts a call of a predict method
+
+        :param method: Name of the method
+        :type method: String
+        :param num_points: Number of predicted points
+        :type num_points: Integer
+        """
+
+        with self._lock:
+            self._calls[method] = self._calls.get(method, 0) + 1
+            self.predict_calls[method] = self.predict_calls.get(method, 0) + 1
+            self._points += num_points
+            self.predicted_points += num_points
+
+    def emit(self, event, **data):
+        """
+        Reports an event with the phase times and predict calls since the
+        previous event
+
+        :param event: Type of the event, e.g. "iteration"
+        :type event: String
+        :param data: Further data of the event, passed as keywords
+        :return: The event
+        :rtype: Dictionary
+        """
+
+        with self._lock:
+            record = {
+                "event": event,
+                "elapsed": time.perf_counter() - self.start_time,
+                "time": self._times,
+                "predict_calls": self._calls,
+                "predicted_points": self._points,
+            }
+            self._times = {}
+            self._calls = {}
+            self._points = 0
+        record.update(data)
+
+        if self.keep_records:
+            self.records.append(record)
+        if self.trace_path is not None:
+            with open(self.trace_path, "a") as file:
+                file.write(json.dumps(record, default=_to_json) + "\n")
+        if self.callback is not None:
+            self.callback(record)
+
+        return record
+
+    def summary(self):
+        """
+        Returns the total wall time of each phase and the total predict calls
+        of all events
+
+        :return: Totals by their names
+        :rtype: Dictionary
+        """
+
+        with self._lock:
+            return {
+                "elapsed": time.perf_counter() - self.start_time,
+                "time": dict(self.totals),
+                "predict_calls": dict(self.predict_calls),
+                "predicted_points": self.predicted_points,
+            }
+
+
+def read_trace(path):
+    """
+    Reads the events of a JSON-lines trace file
+
+    :param path: Path of the trace file
+    :type path: String
+    :return: Events in the order they were written
+    :rtype: List
+    """
+
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.strip()]
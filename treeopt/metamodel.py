@@ -1,5 +1,59 @@
+import contextlib
+import io
+import logging
+import warnings
+
+import numpy as np
+import scipy.linalg as linalg
 import smt.surrogate_models as smt
 
+logger = logging.getLogger(__name__)
+
+
+def smt_options():
+    """
+    Returns the printing options of the smt models. The models print their
+    banners and timings to stdout only if the treeopt loggers are set to
+    DEBUG (e.g. with cli -vvvv), otherwise they are silent.
+
+    :return: Keyword arguments for the constructors of smt models
+    :rtype: Dictionary
+    """
+
+    return {"print_global": logger.isEnabledFor(logging.DEBUG)}
+
+
+def _train_logged(sm, xt, yt):
+    """
+    Sets the training values of an smt model and trains it. The messages,
+    that smt prints to stdout regardless of the printing options (e.g.
+    "fmin_cobyla failed but the best value is retained"), are passed to the
+    logger at DEBUG level. The warning of the kriging models about several
+    outputs is logged the same way, as treeopt fits shared hyperparameters
+    of several outputs on purpose.
+    """
+
+    output = io.StringIO()
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        with contextlib.redirect_stdout(output):
+            sm.set_training_values(xt, yt)
+            sm.train()
+    for line in output.getvalue().splitlines():
+        if line.strip():
+            logger.debug("smt: %s", line.strip())
+    for warning in caught:
+        message = str(warning.message)
+        if message.startswith("Kriging-based surrogate is not intended"):
+            logger.debug("smt: %s", message)
+        else:
+            warnings.warn_explicit(
+                warning.message,
+                warning.category,
+                warning.filename,
+                warning.lineno,
+            )
+
 
 def rbf(xt, yt):
     """
@@ -14,7 +68,7 @@ def rbf(xt, yt):
     :rtype: Smt-object
     """
 
-    sm = smt.RBF(print_prediction=False, poly_degree=0, print_global=False)
+    sm = smt.RBF(print_prediction=False, poly_degree=0, **smt_options())
     sm.set_training_values(xt, yt)
     sm.train()
 
@@ -33,7 +87,7 @@ def krg(xt, yt):
     :rtype: smt-object
     """
 
-    sm = smt.KRG(theta0=[1e-2])
+    sm = smt.KRG(theta0=[1e-2], **smt_options())
     sm.set_training_values(xt, yt)
     sm.train()
 
@@ -53,8 +107,602 @@ def idw(xt, yt):
     :rtype: Smt-object
     """
 
-    sm = smt.IDW(p=2)
+    sm = smt.IDW(p=2, **smt_options())
+    sm.set_training_values(xt, yt)
+    sm.train()
+
+    return sm
+
+
+class IncrementalKriging:
+    """
+    Ordinary kriging metamodel with a squared exponential correlation, that
+    can be updated with new points without retraining. The hyperparameters
+    are optimized by smt.KRG. While they are kept fixed, a new point extends
+    the Cholesky factor of the correlation matrix by one row, which costs
+    O(n^2) instead of the O(n^3) of a new training. The hyperparameters are
+    optimized again every refit_interval points, or earlier if the likelihood
+    per point drifts by more than likelihood_tol, warm-started from their
+    previous values. Several outputs share the hyperparameters, which
+    smt.KRG fits on the summed variance of the standardized outputs.
+
+    The object provides the prediction functions of the smt-toolkit that are
+    used by treeopt (predict_values, predict_variances, predict_derivatives,
+    predict_variance_derivatives).
+    """
+
+    supports = {
+        "derivatives": True,
+        "variances": True,
+        "variance_derivatives": True,
+    }
+
+    def __init__(
+        self,
+        theta0=(1e-2,),
+        refit_interval=10,
+        likelihood_tol=0.5,
+        nugget=100.0 * np.finfo(float).eps,
+    ):
+        """
+        Initializes an untrained metamodel
+
+        :param theta0: Start values of the hyperparameters of the first
+            training
+        :type theta0: Tuple
+        :param refit_interval: Number of updates after which the
+            hyperparameters are optimized again
+        :type refit_interval: Integer
+        :param likelihood_tol: Change of the log-likelihood per point, that
+            triggers an early optimization of the hyperparameters
+        :type likelihood_tol: Float
+        :param nugget: Value added to the diagonal of the correlation matrix
+            (default as in smt.KRG)
+        :type nugget: Float
+        """
+        self.theta0 = np.atleast_1d(theta0)
+        self.refit_interval = refit_interval
+        self.likelihood_tol = likelihood_tol
+        self.nugget = nugget
+        self.optimal_theta = None
+        self.num_refits = 0
+        self._xt = None
+        self._yt = None
+        self._n = 0
+
+    @property
+    def num_training_points(self):
+        """
+        Number of points the metamodel is trained on
+        """
+        return self._n
+
+    def set_training_values(self, xt, yt):
+        """
+        Sets the points and responses of a new training
+
+        :param xt: Array of points in which the system response is known
+        :type xt: Numpy array
+        :param yt: Array containing the system response
+        :type yt: Numpy array
+        """
+        self._xt = np.array(xt, dtype=float)
+        self._yt = np.array(yt, dtype=float).reshape(self._xt.shape[0], -1)
+
+    def train(self):
+        """
+        Optimizes the hyperparameters on the training values with smt.KRG
+        and factorizes the correlation matrix
+        """
+        n = self._xt.shape[0]
+        theta0 = self.theta0
+        if self.optimal_theta is not None:
+            theta0 = self.optimal_theta
+        if n > 1:
+            options = {} if self.optimal_theta is None else {"n_start": 1}
+            sm = smt.KRG(theta0=list(theta0), **options, **smt_options())
+            _train_logged(sm, self._xt, self._yt)
+            self.optimal_theta = np.array(sm.optimal_theta, dtype=float)
+            self.num_refits += 1
+            logger.debug(
+                "Kriging hyperparameters optimized on %d points: theta=%s",
+                n,
+                self.optimal_theta,
+            )
+        else:
+            # A single point does not determine the hyperparameters, the
+            # start values are kept until the next training
+            self.optimal_theta = np.array(theta0, dtype=float)
+
+        # A single point has no spread, its scales stay one
+        ddof = 1 if n > 1 else 0
+        self._x_offset = np.mean(self._xt, axis=0)
+        self._x_scale = self._xt.std(axis=0, ddof=ddof)
+        self._x_scale[np.abs(self._x_scale) < 100.0 * np.finfo(float).eps] = 1
+        self._y_mean = np.mean(self._yt, axis=0)
+        self._y_std = self._yt.std(axis=0, ddof=ddof)
+        self._y_std[self._y_std == 0.0] = 1.0
+
+        capacity = max(2 * n, 16)
+        self._X = np.empty((capacity, self._xt.shape[1]))
+        self._Y = np.empty((capacity, self._yt.shape[1]))
+        self._L = np.zeros((capacity, capacity))
+        self._X[:n] = (self._xt - self._x_offset) / self._x_scale
+        self._Y[:n] = (self._yt - self._y_mean) / self._y_std
+        self._n = n
+
+        R = self._correlation(self._X[:n], self._X[:n])
+        R[np.diag_indices(n)] += self.nugget
+        self._L[:n, :n] = linalg.cholesky(R, lower=True)
+
+        self._updates = 0
+        self._solve()
+        self._fit_likelihood = self._likelihood
+
+    def update(self, xt, yt):
+        """
+        Adds new points to the metamodel. The Cholesky factor of the
+        correlation matrix is extended row by row with fixed hyperparameters,
+        unless a new optimization of the hyperparameters is due.
+
+        :param xt: New points in which the system response is known
+        :type xt: Numpy array
+        :param yt: System responses in the new points
+        :type yt: Numpy array
+        """
+        xt = np.atleast_2d(np.asarray(xt, dtype=float))
+        yt = np.asarray(yt, dtype=float).reshape(xt.shape[0], -1)
+        self._xt = np.vstack([self._xt, xt])
+        self._yt = np.vstack([self._yt, yt])
+
+        if self._updates + xt.shape[0] >= self.refit_interval:
+            self.train()
+            return
+
+        for xi, yi in zip(xt, yt):
+            self._append(
+                (xi - self._x_offset) / self._x_scale,
+                (yi - self._y_mean) / self._y_std,
+            )
+        self._updates += xt.shape[0]
+        self._solve()
+
+        if abs(self._likelihood - self._fit_likelihood) > self.likelihood_tol:
+            self.train()
+
+    def predict_values(self, x):
+        """
+        Predicts the system response in the points x
+
+        :param x: Points in the design space, one point per row
+        :type x: Numpy array
+        :return: Predicted responses, one row per point
+        :rtype: Numpy array
+        """
+        r = self._correlation(self._normalize(x), self._X[: self._n])
+        return self._y_mean + self._y_std * (self._beta + r @ self._alpha)
+
+    def predict_variances(self, x):
+        """
+        Predicts the variance of the system response in the points x
+
+        :param x: Points in the design space, one point per row
+        :type x: Numpy array
+        :return: Predicted variances, one row per point
+        :rtype: Numpy array
+        """
+        r = self._correlation(self._normalize(x), self._X[: self._n])
+        L = self._L[: self._n, : self._n]
+        v = linalg.solve_triangular(L, r.T, lower=True)
+        u = r @ self._rinv_one - 1.0
+        mse = 1.0 - np.sum(v ** 2, axis=0) + u ** 2 / self._one_rinv_one
+        mse = np.maximum(mse, 0.0)
+        return mse[:, np.newaxis] * self._sigma2 * self._y_std ** 2
+
+    def predict_derivatives(self, x, kx):
+        """
+        Predicts the derivative of the system response with respect to the
+        kx-th input variable
+
+        :param x: Points in the design space, one point per row
+        :type x: Numpy array
+        :param kx: Index of the input variable
+        :type kx: Integer
+        :return: Derivatives, one row per point
+        :rtype: Numpy array
+        """
+        dr = self._correlation_derivative(x, kx)
+        return self._y_std * (dr @ self._alpha)
+
+    def predict_variance_derivatives(self, x, kx):
+        """
+        Predicts the derivative of the variance with respect to the kx-th
+        input variable
+
+        :param x: Points in the design space, one point per row
+        :type x: Numpy array
+        :param kx: Index of the input variable
+        :type kx: Integer
+        :return: Derivatives of the variances, one row per point
+        :rtype: Numpy array
+        """
+        L = self._L[: self._n, : self._n]
+        r = self._correlation(self._normalize(x), self._X[: self._n])
+        dr = self._correlation_derivative(x, kx)
+        rinv_r = linalg.cho_solve((L, True), r.T).T
+        u = r @ self._rinv_one - 1.0
+        dmse = (
+            -2.0 * np.sum(rinv_r * dr, axis=1)
+            + 2.0 * u * (dr @ self._rinv_one) / self._one_rinv_one
+        )
+        return dmse[:, np.newaxis] * self._sigma2 * self._y_std ** 2
+
+    def _normalize(self, x):
+        """
+        Scales points like the training points
+        """
+        return (np.atleast_2d(x) - self._x_offset) / self._x_scale
+
+    def _correlation(self, a, b):
+        """
+        Squared exponential correlation between the rows of a and b
+        """
+        diff = a[:, np.newaxis, :] - b[np.newaxis, :, :]
+        return np.exp(-np.sum(self.optimal_theta * diff ** 2, axis=2))
+
+    def _correlation_derivative(self, x, kx):
+        """
+        Derivative of the correlation between x and the training points with
+        respect to the kx-th (unscaled) input variable
+        """
+        xn = self._normalize(x)
+        X = self._X[: self._n]
+        r = self._correlation(xn, X)
+        diff = xn[:, kx, np.newaxis] - X[np.newaxis, :, kx]
+        return -2.0 * self.optimal_theta[kx] * diff * r / self._x_scale[kx]
+
+    def _append(self, xn, yn):
+        """
+        Extends the Cholesky factor by the row of one normalized point
+        """
+        n = self._n
+        if n == self._L.shape[0]:
+            capacity = 2 * n
+            L = np.zeros((capacity, capacity))
+            L[:n, :n] = self._L[:n, :n]
+            self._L = L
+            self._X = np.resize(self._X[:n], (capacity, self._X.shape[1]))
+            self._Y = np.resize(self._Y[:n], (capacity, self._Y.shape[1]))
+
+        r = self._correlation(xn[np.newaxis, :], self._X[:n])[0]
+        l_row = linalg.solve_triangular(self._L[:n, :n], r, lower=True)
+        d2 = 1.0 + self.nugget - l_row @ l_row
+        self._L[n, :n] = l_row
+        self._L[n, n] = np.sqrt(max(d2, self.nugget))
+        self._X[n] = xn
+        self._Y[n] = yn
+        self._n = n + 1
+
+    def _solve(self):
+        """
+        Computes the kriging weights, the process variance and the
+        log-likelihood per point from the Cholesky factor
+        """
+        n = self._n
+        L = self._L[:n, :n]
+        Y = self._Y[:n]
+
+        self._rinv_one = linalg.cho_solve((L, True), np.ones(n))
+        rinv_y = linalg.cho_solve((L, True), Y)
+        self._one_rinv_one = np.sum(self._rinv_one)
+        self._beta = np.sum(rinv_y, axis=0) / self._one_rinv_one
+        self._alpha = rinv_y - np.outer(self._rinv_one, self._beta)
+        self._sigma2 = np.maximum(
+            np.sum((Y - self._beta) * self._alpha, axis=0) / n,
+            np.finfo(float).tiny,
+        )
+        log_det = 2.0 * np.sum(np.log(np.diag(L)))
+        self._likelihood = -0.5 * (np.sum(np.log(self._sigma2)) + log_det / n)
+
+
+def krg_incremental(xt, yt):
+    """
+    Function, that trains a kriging metamodel, which can be updated with new
+    points without retraining (see IncrementalKriging)
+
+    :param xt: Array of points in which the system response is known
+    :type xt: Numpy array
+    :param yt: Array containing the system response
+    :type yt: Numpy array
+    :return: python object containing the trained metamodel
+    :rtype: IncrementalKriging
+    """
+
+    sm = IncrementalKriging()
+    sm.set_training_values(xt, yt)
+    sm.train()
+
+    return sm
+
+
+class LocalKriging:
+    """
+    Mixture of local kriging metamodels for large numbers of training
+    points. The design space is split recursively at the median of the
+    widest coordinate, until no part contains more than max_points points,
+    and an IncrementalKriging metamodel is trained on each part. A
+    prediction blends the num_experts parts with the nearest centres, so
+    training costs O(n max_points^2) instead of O(n^3) and a prediction
+    O(num_experts max_points) instead of O(n).
+
+    The weight of a part is (1/d^2 - 1/d_next^2) / s^2, where d is the
+    scaled distance to its centre, d_next the distance to the nearest centre
+    that is not blended and s^2 the local variance. The weights vanish where
+    a part drops out of the blend, so the prediction is continuous, and the
+    local metamodel that knows a point dominates in it, so the training
+    points are interpolated. The variance is the variance of the mixture of
+    the local predictions.
+
+    New points are added to the part with the nearest centre (see
+    IncrementalKriging.update). A part, that has grown to 2 max_points
+    points, is split and its halves are trained anew.
+    """
+
+    supports = {
+        "derivatives": False,
+        "variances": True,
+        "variance_derivatives": False,
+    }
+
+    def __init__(self, max_points=200, num_experts=3, refit_interval=10):
+        """
+        Initializes an untrained metamodel
+
+        :param max_points: Maximum number of points of a part after the
+            training
+        :type max_points: Integer
+        :param num_experts: Number of local metamodels blended in a
+            prediction
+        :type num_experts: Integer
+        :param refit_interval: Number of updates after which the
+            hyperparameters of a local metamodel are optimized again
+        :type refit_interval: Integer
+        """
+        self.max_points = max_points
+        self.num_experts = num_experts
+        self.refit_interval = refit_interval
+        self.experts = []
+        self._parts = []
+        self._xt = None
+        self._yt = None
+
+    @property
+    def num_training_points(self):
+        """
+        Number of points the metamodel is trained on
+        """
+        return 0 if self._xt is None else self._xt.shape[0]
+
+    def set_training_values(self, xt, yt):
+        """
+        Sets the points and responses of a new training
+
+        :param xt: Array of points in which the system response is known
+        :type xt: Numpy array
+        :param yt: Array containing the system response
+        :type yt: Numpy array
+        """
+        self._xt = np.array(xt, dtype=float)
+        self._yt = np.array(yt, dtype=float).reshape(self._xt.shape[0], -1)
+
+    def train(self):
+        """
+        Splits the training points into parts and trains a local metamodel
+        on each part
+        """
+        # A single point has no spread, it keeps the scale one
+        ddof = 1 if self._xt.shape[0] > 1 else 0
+        self._x_scale = self._xt.std(axis=0, ddof=ddof)
+        self._x_scale[np.abs(self._x_scale) < 100.0 * np.finfo(float).eps] = 1
+
+        self._parts = self._split(np.arange(self._xt.shape[0]))
+        self.experts = []
+        for part in self._parts:
+            self.experts.append(self._train_expert(part))
+        self._centres = np.array(
+            [np.mean(self._xt[part], axis=0) for part in self._parts]
+        )
+        logger.debug(
+            "Local kriging trained on %d points in %d parts",
+            self._xt.shape[0],
+            len(self._parts),
+        )
+
+    def update(self, xt, yt):
+        """
+        Adds new points to the local metamodels with the nearest centres
+
+        :param xt: New points in which the system response is known
+        :type xt: Numpy array
+        :param yt: System responses in the new points
+        :type yt: Numpy array
+        """
+        xt = np.atleast_2d(np.asarray(xt, dtype=float))
+        yt = np.asarray(yt, dtype=float).reshape(xt.shape[0], -1)
+        first = self._xt.shape[0]
+        self._xt = np.vstack([self._xt, xt])
+        self._yt = np.vstack([self._yt, yt])
+
+        nearest = np.argmin(self._distances(xt), axis=1)
+        for j in np.unique(nearest):
+            new = np.flatnonzero(nearest == j)
+            part = np.concatenate([self._parts[j], first + new])
+            if len(part) < 2 * self.max_points:
+                self.experts[j].update(xt[new], yt[new])
+                self._parts[j] = part
+                self._centres[j] = np.mean(self._xt[part], axis=0)
+                continue
+            halves = self._split(part)
+            self._parts[j : j + 1] = [None]
+            self._parts.extend(halves)
+            self.experts.extend(self._train_expert(half) for half in halves)
+            self._centres = np.vstack(
+                [self._centres]
+                + [np.mean(self._xt[half], axis=0) for half in halves]
+            )
+
+        # Remove the parts, that were split
+        keep = [j for j, part in enumerate(self._parts) if part is not None]
+        self._parts = [self._parts[j] for j in keep]
+        self.experts = [self.experts[j] for j in keep]
+        self._centres = self._centres[keep]
+
+    def predict_values(self, x):
+        """
+        Predicts the system response in the points x
+
+        :param x: Points in the design space, one point per row
+        :type x: Numpy array
+        :return: Predicted responses, one row per point
+        :rtype: Numpy array
+        """
+        return self._predict(x)[0]
+
+    def predict_variances(self, x):
+        """
+        Predicts the variance of the system response in the points x
+
+        :param x: Points in the design space, one point per row
+        :type x: Numpy array
+        :return: Predicted variances, one row per point
+        :rtype: Numpy array
+        """
+        return self._predict(x)[1]
+
+    def _split(self, index):
+        """
+        Splits the points of index recursively at the median of the widest
+        scaled coordinate into parts of at most max_points points
+        """
+        if len(index) <= self.max_points:
+            return [index]
+        x = self._xt[index]
+        k = np.argmax(np.ptp(x, axis=0) / self._x_scale)
+        order = index[np.argsort(x[:, k], kind="stable")]
+        half = len(order) // 2
+
+        return self._split(order[:half]) + self._split(order[half:])
+
+    def _train_expert(self, index):
+        """
+        Trains the local metamodel of one part. The hyperparameters are
+        warm-started from the first local metamodel.
+        """
+        sm = IncrementalKriging(refit_interval=self.refit_interval)
+        if self.experts:
+            sm.optimal_theta = self.experts[0].optimal_theta
+        sm.set_training_values(self._xt[index], self._yt[index])
+        sm.train()
+
+        return sm
+
+    def _distances(self, x):
+        """
+        Squared scaled distances between the points x and the centres
+        """
+        diff = (
+            np.atleast_2d(x)[:, np.newaxis, :]
+            - self._centres[np.newaxis, :, :]
+        )
+        return np.sum((diff / self._x_scale) ** 2, axis=2)
+
+    def _predict(self, x):
+        """
+        Blends the predictions of the local metamodels with the nearest
+        centres
+        """
+        x = np.atleast_2d(x)
+        d2 = np.maximum(self._distances(x), 1e-12)
+        order = np.argsort(d2, axis=1)
+        k = min(self.num_experts, len(self.experts))
+        nearest = order[:, :k]
+        weights = 1.0 / np.take_along_axis(d2, nearest, axis=1)
+        if k < len(self.experts):
+            d2_next = np.take_along_axis(d2, order[:, k : k + 1], axis=1)
+            weights = np.maximum(weights - 1.0 / d2_next, 1e-300)
+
+        values = np.zeros((x.shape[0], k, self._yt.shape[1]))
+        local_variances = np.zeros_like(values)
+        for j, sm in enumerate(self.experts):
+            rows, cols = np.nonzero(nearest == j)
+            if rows.size > 0:
+                values[rows, cols] = sm.predict_values(x[rows])
+                local_variances[rows, cols] = sm.predict_variances(x[rows])
+
+        # Precise local predictions dominate, so that the mixture
+        # interpolates the training points of each part
+        # (constant responses, e.g. of a single point, have the scale one)
+        scale = np.var(self._yt, axis=0)
+        scale[scale == 0.0] = 1.0
+        floor = 1e-10 * scale
+        weights = weights[:, :, np.newaxis] / np.maximum(
+            local_variances, floor
+        )
+        weights /= np.sum(weights, axis=1, keepdims=True)
+        mean = np.sum(weights * values, axis=1)
+        second = np.sum(weights * (local_variances + values ** 2), axis=1)
+
+        return mean, np.maximum(second - mean ** 2, 0.0)
+
+
+def krg_local(xt, yt, max_points=200):
+    """
+    Function, that trains a mixture of local kriging metamodels, whose
+    training and prediction costs stay bounded for large numbers of points
+    (see LocalKriging)
+
+    :param xt: Array of points in which the system response is known
+    :type xt: Numpy array
+    :param yt: Array containing the system response
+    :type yt: Numpy array
+    :param max_points: Maximum number of points of a local metamodel
+    :type max_points: Integer
+    :return: python object containing the trained metamodel
+    :rtype: LocalKriging
+    """
+
+    sm = LocalKriging(max_points=max_points)
+    sm.set_training_values(xt, yt)
+    sm.train()
+
+    return sm
+
+
+def sgp(xt, yt, num_inducing=50):
+    """
+    Function, that trains a sparse gaussian process (smt.SGP). The process
+    is approximated by num_inducing inducing points, chosen at random from
+    the training points, so the training costs O(n num_inducing^2). The
+    noise of the responses is estimated, so the metamodel does not
+    interpolate the training points exactly.
+
+    :param xt: Array of points in which the system response is known
+    :type xt: Numpy array
+    :param yt: Array containing the system response
+    :type yt: Numpy array
+    :param num_inducing: Maximum number of inducing points
+    :type num_inducing: Integer
+    :return: python object containing the trained metamodel
+    :rtype: Smt-object
+    """
+
+    xt = np.asarray(xt, dtype=float)
+    rng = np.random.RandomState(0)
+    inducing = rng.choice(xt.shape[0], min(num_inducing, xt.shape[0]), False)
+
+    sm = smt.SGP(**smt_options())
     sm.set_training_values(xt, yt)
+    sm.set_inducing_inputs(Z=xt[inducing])
     sm.train()
 
     return sm
@@ -1,7 +1,16 @@
+import copy
+import functools
+import logging
+
 import numpy as np
 import scipy.optimize as optimize
+import scipy.stats as stats
 import time
 
+import treeopt.evaluate as evaluate
+
+logger = logging.getLogger(__name__)
+
 
 def predict_value(x, sm):
     """
@@ -22,7 +31,194 @@ def predict_value(x, sm):
     return y[0]
 
 
-def search_higest_uncertainty(sm, limits):
+def supports_gradients(sm, variances=False):
+    """
+    Checks whether a metamodel provides the derivatives of its predictions
+    (and of its variances) with respect to the design variables
+
+    :param sm: Metamodel
+    :type sm: Smt-object
+    :param variances: If True, the derivatives of the variances are required
+        as well
+    :type variances: Bool
+    :return: True, if the analytic derivatives can be used
+    :rtype: Bool
+    """
+
+    supports = getattr(sm, "supports", {})
+    required = ["derivatives"]
+    if variances:
+        required += ["variances", "variance_derivatives"]
+
+    return all(supports.get(name, False) for name in required)
+
+
+def predict_gradients(sm, x):
+    """
+    Returns the derivatives of the prediction of a metamodel with respect to
+    the design variables for several points at once
+
+    :param sm: Metamodel, that supports derivatives
+    :type sm: Smt-object
+    :param x: Points in the design space, one point per row
+    :type x: Numpy-array
+    :return: Gradient of the (first) prediction, one row per point
+    :rtype: Numpy-array
+    """
+
+    x = np.atleast_2d(x)
+
+    return np.column_stack(
+        [sm.predict_derivatives(x, kx)[:, 0] for kx in range(x.shape[1])]
+    )
+
+
+def predict_std_gradients(sm, x):
+    """
+    Returns the standard deviation of the prediction of a metamodel and its
+    derivatives with respect to the design variables for several points at
+    once. In points with vanishing variance the derivatives are set to zero.
+
+    :param sm: Metamodel, that supports variance derivatives
+    :type sm: Smt-object
+    :param x: Points in the design space, one point per row
+    :type x: Numpy-array
+    :return: Standard deviation in each point and its gradient, one row per
+        point
+    :rtype: Tuple
+    """
+
+    x = np.atleast_2d(x)
+
+    sm_std = np.sqrt(np.maximum(sm.predict_variances(x)[:, 0], 0.0))
+    sm_var_grad = np.column_stack(
+        [
+            sm.predict_variance_derivatives(x, kx)[:, 0]
+            for kx in range(x.shape[1])
+        ]
+    )
+
+    sm_std_grad = np.zeros_like(sm_var_grad)
+    positive = sm_std > 0
+    sm_std_grad[positive] = (
+        sm_var_grad[positive] / (2 * sm_std[positive])[:, np.newaxis]
+    )
+
+    return sm_std, sm_std_grad
+
+
+def _scalar_call(fun, x):
+    """
+    Evaluates a function, that takes one point per row, in a single point
+    """
+    return np.ravel(fun(np.atleast_2d(x)))[0]
+
+
+def _gradient_call(jac, x):
+    """
+    Evaluates a gradient, that takes one point per row, in a single point
+    """
+    return jac(np.atleast_2d(x))[0]
+
+
+def _refine(fun, jac, start, bounds):
+    """
+    Refines a start point with L-BFGS-B. Defined on module level, so it can
+    be sent to a process pool.
+    """
+    return optimize.minimize(
+        functools.partial(_scalar_call, fun),
+        start,
+        jac=None if jac is None else functools.partial(_gradient_call, jac),
+        bounds=bounds,
+        method="L-BFGS-B",
+    )
+
+
+def multistart_minimize(
+    fun,
+    limits,
+    n_candidates=1000,
+    n_starts=5,
+    starts=None,
+    n_workers=None,
+    jac=None,
+    method=None,
+):
+    """
+    Minimizes a function, that can be evaluated for many points at once, in
+    the design space. The function is evaluated in n_candidates random points
+    in a single call. The best n_starts of them (and the additional starts)
+    are refined with L-BFGS-B, one after another by default. If the
+    gradient of the function is given, L-BFGS-B uses it instead of finite
+    differences, which need d + 1 evaluations per step in d dimensions.
+
+    :param fun: Function that takes an array with one point per row and
+        returns one value per point
+    :type fun: Python function
+    :param limits: Limits of the design-space
+    :type limits: Numpy-array
+    :param n_candidates: Number of random candidate points
+    :type n_candidates: Integer
+    :param n_starts: Number of local refinements
+    :type n_starts: Integer
+    :param starts: Additional start points of the refinements
+    :type starts: Numpy-array
+    :param n_workers: Number of threads or processes running the refinements
+        (default: chosen by python)
+    :type n_workers: Integer
+    :param jac: Function that takes an array with one point per row and
+        returns the gradient of fun, one row per point (default None, finite
+        differences)
+    :type jac: Python function
+    :param method: Evaluation method of the evaluate module, that runs the
+        refinements (default None, one after another). The predictions of
+        the metamodels hold the GIL most of the time, so evaluate.thread_pool
+        rarely pays off; evaluate.process_pool requires, that fun and jac
+        can be pickled.
+    :type method: Python function
+    :return: Result of the best refinement
+    :rtype: Scipy-Optimize Object
+    """
+
+    limits = np.asarray(limits, dtype=float)
+    bounds = tuple(map(tuple, limits))
+
+    candidates = np.random.uniform(
+        limits[:, 0], limits[:, 1], (n_candidates, limits.shape[0])
+    )
+    if starts is not None:
+        candidates = np.vstack([np.atleast_2d(starts), candidates])
+    scores = np.ravel(fun(candidates))
+
+    best = np.argsort(scores, kind="stable")[:n_starts]
+    if starts is not None:
+        best = np.union1d(best, np.arange(len(np.atleast_2d(starts))))
+
+    if method in (None, evaluate.serial) or len(best) == 1:
+        results = [
+            _refine(fun, jac, start, bounds) for start in candidates[best]
+        ]
+    else:
+        with evaluate.make_executor(method, n_workers) as executor:
+            results = list(
+                executor.map(
+                    _refine,
+                    [fun] * len(best),
+                    [jac] * len(best),
+                    candidates[best],
+                    [bounds] * len(best),
+                )
+            )
+
+    res = min(results, key=lambda result: result.fun)
+    if np.min(scores) < res.fun:
+        res.x, res.fun = candidates[np.argmin(scores)], np.min(scores)
+
+    return res
+
+
+def search_higest_uncertainty(sm, limits, **kwargs):
     """
     Searches in the response surface of a given metamodel for the point in the
     design-space with the highest uncertainty
@@ -32,49 +228,50 @@ def search_higest_uncertainty(sm, limits):
     :type sm: Smt-object
     :param limits: Limits of the design-space
     :type limits: Numpy-array
+    :param kwargs: Options of multistart_minimize
     :return: Point in the design space with the highest uncertainty
     :rtype: Numpy-array
     """
 
-    def get_largest_uncertainty(x, sm):
+    def get_largest_uncertainty(x):
         """
-        Function to calculate and return a the function value of the
-        uncertainty at a given point x
-
-        :param sm: Python object representing the benchmarking function
-        :type sm: SMT-Object
-        :param x: Numpy array representing a point on which the lowest variance
-            function is to be evaluated
-        :type x: Numpy array :return: Function Value at the point x
+        Function to calculate the negative width of the 3-sigma interval of
+        the metamodel in several points x
+
+        :param x: Numpy array representing points on which the uncertainty
+            is to be evaluated, one point per row
+        :type x: Numpy array
+        :return: Function Values at the points x
         :rtype: Numpy array
         """
 
-        x = np.atleast_2d(x)
+        sm_var = sm.predict_variances(x)[:, 0]
 
-        sm_val = sm.predict_values(x)
-        sm_var = sm.predict_variances(x)
+        return -6 * np.sqrt(np.maximum(sm_var, 0.0))
 
-        pyvar = sm_val + 3 * np.sqrt(sm_var)
-        nyvar = sm_val - 3 * np.sqrt(sm_var)
+    def get_largest_uncertainty_gradient(x):
+        """
+        Function to calculate the gradient of get_largest_uncertainty in
+        several points x
 
-        return np.abs(pyvar - nyvar)
+        :param x: Numpy array representing points on which the gradient is
+            to be evaluated, one point per row
+        :type x: Numpy array
+        :return: Gradients at the points x, one row per point
+        :rtype: Numpy array
+        """
 
-    start = np.empty(limits.shape[0], dtype=float)
-    for dim in range(limits.shape[0]):
-        start[dim] = limits[dim][1] + limits[dim][0]
+        return -6 * predict_std_gradients(sm, x)[1]
 
-    res = optimize.minimize(
-        get_largest_uncertainty,
-        start,
-        args=(sm),
-        bounds=tuple(map(tuple, limits)),
-        method="L-BFGS-B",
-    )
+    if supports_gradients(sm, variances=True):
+        kwargs.setdefault("jac", get_largest_uncertainty_gradient)
+
+    res = multistart_minimize(get_largest_uncertainty, limits, **kwargs)
 
     return res.x
 
 
-def search_lowest_variance(sm, limits):
+def search_lowest_variance(sm, limits, **kwargs):
     """
     Searches in the response surface of a given metamodel for the point in
     the design-space with the lowest variance
@@ -84,51 +281,53 @@ def search_lowest_variance(sm, limits):
     :type sm: Smt-object
     :param limits: Limits of the design-space
     :type limits: Numpy-array
+    :param kwargs: Options of multistart_minimize
     :return: Point in the design space with the highest uncertainty
     :rtype: Numpy-array
     """
 
-    def get_lowest_variance(x, sm):
+    def get_lowest_variance(x):
         """
-        Function to calculate the lower variance of an SMT-metamodel at a given
-        point x
+        Function to calculate the lower variance of an SMT-metamodel in
+        several points x
 
-        :param sm: Python object representing the benchmarking function
-        :type sm: SMT-Object
-        :param x: Numpy array representing a point on which the lowest variance
-            function is to be evaluated
+        :param x: Numpy array representing points on which the lowest
+            variance function is to be evaluated, one point per row
         :type x: Numpy array
-        :return: Function Value at the point x
+        :return: Function Values at the points x
         :rtype: Numpy array
         """
 
-        x = np.atleast_2d(x)
+        sm_val = sm.predict_values(x)[:, 0]
+        sm_var = sm.predict_variances(x)[:, 0]
 
-        sm_val = sm.predict_values(x)
-        sm_var = sm.predict_variances(x)
+        return sm_val - 3 * np.sqrt(np.maximum(sm_var, 0.0))
 
-        nyvar = sm_val - 3 * np.sqrt(sm_var)
+    def get_lowest_variance_gradient(x):
+        """
+        Function to calculate the gradient of get_lowest_variance in several
+        points x
 
-        return nyvar[0]
+        :param x: Numpy array representing points on which the gradient is
+            to be evaluated, one point per row
+        :type x: Numpy array
+        :return: Gradients at the points x, one row per point
+        :rtype: Numpy array
+        """
 
-    start = np.empty(limits.shape[0], dtype=float)
-    for dim in range(limits.shape[0]):
-        start[dim] = (limits[dim][1] + limits[dim][0]) / 2
+        return predict_gradients(sm, x) - 3 * predict_std_gradients(sm, x)[1]
 
-    res = optimize.minimize(
-        get_lowest_variance,
-        start,
-        args=(sm),
-        bounds=tuple(map(tuple, limits)),
-        method="L-BFGS-B",
-    )
+    if supports_gradients(sm, variances=True):
+        kwargs.setdefault("jac", get_lowest_variance_gradient)
+
+    res = multistart_minimize(get_lowest_variance, limits, **kwargs)
 
-    print(res)
+    logger.debug("Search of the lowest variance: %s", res)
 
     return res.x
 
 
-def find_minimum(sm, limits):
+def find_minimum(sm, limits, **kwargs):
     """
     Searches in the response surface of a given metamodel for the Point with
     the lowest valued system response
@@ -137,18 +336,240 @@ def find_minimum(sm, limits):
     :type sm: SMT-Object
     :param limits: the limits of the design-space
     :type limits: numpy-array
+    :param kwargs: Options of multistart_minimize
     """
 
-    start = np.empty(limits.shape[0], dtype=float)
-    for dim in range(limits.shape[0]):
-        start[dim] = limits[dim][1] + limits[dim][0]
+    if supports_gradients(sm):
+        kwargs.setdefault("jac", lambda x: predict_gradients(sm, x))
 
-    res = optimize.minimize(
-        predict_value,
-        start,
-        args=(sm),
-        bounds=tuple(map(tuple, limits)),
-        method="L-BFGS-B",
+    res = multistart_minimize(
+        lambda x: sm.predict_values(x)[:, 0], limits, **kwargs
     )
 
     return res.x
+
+
+def _distance_to(x, point):
+    """
+    Returns the distance of a point to the closest point in x
+    """
+
+    return np.min(np.linalg.norm(np.atleast_2d(x) - point, axis=1))
+
+
+def _most_distant_point(x, limits, n_candidates=1000):
+    """
+    Returns the one of randomly drawn candidates in the design space, that
+    has the largest distance to the closest point in x
+    """
+
+    candidates = np.random.uniform(
+        limits[:, 0], limits[:, 1], (n_candidates, limits.shape[0])
+    )
+    distances = np.linalg.norm(
+        candidates[:, np.newaxis, :] - np.atleast_2d(x)[np.newaxis, :, :],
+        axis=2,
+    )
+
+    return candidates[np.argmax(np.min(distances, axis=1))]
+
+
+def _believe(sm, sm_method, x, y, x_new, y_new):
+    """
+    Returns a metamodel trained on x and y extended by fictitious responses.
+    Metamodels that can be updated are copied and updated, all others are
+    trained anew with sm_method.
+    """
+
+    if hasattr(sm, "update"):
+        sm = copy.deepcopy(sm)
+        sm.update(x_new, y_new)
+        return sm
+
+    return sm_method(np.vstack([x, x_new]), np.vstack([y, y_new]))
+
+
+def kriging_believer(
+    sm, sm_method, x, y, limits, q, liar=None, pending=None, search=None
+):
+    """
+    Proposes a batch of q points of the design space, that can be simulated
+    concurrently. After each proposed point the metamodel is retrained with a
+    fictitious system response at that point, so that the variance there
+    vanishes and the next search is pushed into another region of the design
+    space. By default the prediction of the metamodel is used as fictitious
+    response (kriging believer), with liar set to a function like np.min the
+    response is a constant of the known responses (constant liar).
+
+    :param sm: Metamodel trained on x and y
+    :type sm: Smt-object
+    :param sm_method: one of the metamodel functions, used for retraining
+    :type sm_method: python function
+    :param x: Points in which the system response is known
+    :type x: Numpy-array
+    :param y: Known system responses
+    :type y: Numpy-array
+    :param limits: Limits of the design-space
+    :type limits: Numpy-array
+    :param q: Number of points to be proposed
+    :type q: Integer
+    :param liar: Function that reduces the known responses to a constant
+        fictitious response (default None, kriging believer)
+    :type liar: Python function
+    :param pending: Points which are currently simulated and whose responses
+        are not known yet. They get a fictitious response like the proposed
+        points, so that no point is proposed twice.
+    :type pending: Numpy-array
+    :param search: Function called as search(sm, limits, y_min), that
+        returns the next point (default None, search_lowest_variance)
+    :type search: Python function
+    :return: Proposed points, one point per row
+    :rtype: Numpy-array
+    """
+
+    limits = np.asarray(limits, dtype=float)
+    tol = 1e-6 * np.linalg.norm(limits[:, 1] - limits[:, 0])
+
+    if pending is not None and len(pending) > 0:
+        pending = np.atleast_2d(pending)
+        if liar is None:
+            y_lie = sm.predict_values(pending)
+        else:
+            y_lie = np.tile(liar(y, axis=0), (len(pending), 1))
+        sm = _believe(sm, sm_method, x, y, pending, y_lie)
+        x = np.vstack([x, pending])
+        y = np.vstack([y, y_lie])
+
+    points = []
+    for i in range(q):
+        if search is None:
+            nx = search_lowest_variance(sm, limits)
+        else:
+            nx = search(sm, limits, np.min(y))
+        if _distance_to(x, nx) <= tol:
+            # The lower bound is already minimal in a known point, so the
+            # most uncertain region is explored instead
+            nx = search_higest_uncertainty(sm, limits)
+        if _distance_to(x, nx) <= tol:
+            nx = _most_distant_point(x, limits)
+        points.append(nx)
+
+        if i < q - 1:
+            if liar is None:
+                y_lie = sm.predict_values(np.atleast_2d(nx))
+            else:
+                y_lie = np.atleast_2d(liar(y, axis=0))
+            sm = _believe(sm, sm_method, x, y, nx, y_lie)
+            x = np.vstack([x, nx])
+            y = np.vstack([y, y_lie])
+
+    return np.array(points)
+
+
+def expected_improvement(sm, x, y_min):
+    """
+    Calculates the expected improvement of a metamodel over the lowest known
+    system response for several points at once
+
+    :param sm: A metamodel object from the smt-toolkit. Must be able to
+        calculate variances
+    :type sm: Smt-object
+    :param x: Points in the design space, one point per row
+    :type x: Numpy-array
+    :param y_min: Lowest known system response
+    :type y_min: Float
+    :return: Expected improvement in each point
+    :rtype: Numpy-array
+    """
+
+    x = np.atleast_2d(x)
+
+    sm_val = sm.predict_values(x)[:, 0]
+    sm_std = np.sqrt(np.maximum(sm.predict_variances(x)[:, 0], 0.0))
+
+    ei = np.zeros(x.shape[0])
+    positive = sm_std > 0
+    gain, std = y_min - sm_val[positive], sm_std[positive]
+    z = gain / std
+    ei[positive] = gain * stats.norm.cdf(z) + std * stats.norm.pdf(z)
+
+    return ei
+
+
+def expected_improvement_gradient(sm, x, y_min):
+    """
+    Calculates the gradient of the expected improvement with respect to the
+    design variables for several points at once
+
+    :param sm: A metamodel object from the smt-toolkit. Must be able to
+        calculate the derivatives of values and variances
+    :type sm: Smt-object
+    :param x: Points in the design space, one point per row
+    :type x: Numpy-array
+    :param y_min: Lowest known system response
+    :type y_min: Float
+    :return: Gradient of the expected improvement, one row per point
+    :rtype: Numpy-array
+    """
+
+    x = np.atleast_2d(x)
+
+    sm_val = sm.predict_values(x)[:, 0]
+    sm_std, sm_std_grad = predict_std_gradients(sm, x)
+    sm_val_grad = predict_gradients(sm, x)
+
+    grad = np.zeros_like(sm_val_grad)
+    positive = sm_std > 0
+    z = (y_min - sm_val[positive]) / sm_std[positive]
+    grad[positive] = (
+        -stats.norm.cdf(z)[:, np.newaxis] * sm_val_grad[positive]
+        + stats.norm.pdf(z)[:, np.newaxis] * sm_std_grad[positive]
+    )
+
+    return grad
+
+
+def maximize_expected_improvement(
+    sm, limits, y_min, n_start=50, n_local=5, starts=None
+):
+    """
+    Searches the point of the largest expected improvement with
+    multistart_minimize. The expected improvement is calculated for n_start
+    random points in one call, the best n_local of them (and the additional
+    starts) are refined with L-BFGS-B.
+
+    :param sm: A metamodel object from the smt-toolkit. Must be able to
+        calculate variances
+    :type sm: Smt-object
+    :param limits: Limits of the design-space
+    :type limits: Numpy-array
+    :param y_min: Lowest known system response
+    :type y_min: Float
+    :param n_start: Number of random candidate points
+    :type n_start: Integer
+    :param n_local: Number of local refinements
+    :type n_local: Integer
+    :param starts: Additional start points of the refinements, e.g. the
+        result of the previous search
+    :type starts: Numpy-array
+    :return: Point with the largest expected improvement and its value
+    :rtype: Tuple
+    """
+
+    def negative_gradient(x):
+        return -expected_improvement_gradient(sm, x, y_min)
+
+    jac = None
+    if supports_gradients(sm, variances=True):
+        jac = negative_gradient
+
+    res = multistart_minimize(
+        lambda x: -expected_improvement(sm, x, y_min),
+        limits,
+        n_candidates=n_start,
+        n_starts=n_local,
+        starts=starts,
+        jac=jac,
+    )
+
+    return res.x, -res.fun
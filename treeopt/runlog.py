@@ -0,0 +1,228 @@
+import ast
+import os
+
+import numpy as np
+from pathlib import Path
+
+# Fixed size of the header of appendable .npy files. The header is rewritten
+# in place after each append, so it has to be large enough for any shape.
+NPY_HEADER_SIZE = 128
+
+
+def _sync(file):
+    """
+    Flushes a file object and forces the operating system to write it to disk
+    """
+
+    file.flush()
+    os.fsync(file.fileno())
+
+
+def _npy_header(rows, cols):
+    """
+    Returns the header of a version 1.0 .npy file containing a C-ordered
+    float64 array of the shape (rows, cols), padded to NPY_HEADER_SIZE bytes
+    """
+
+    magic = np.lib.format.magic(1, 0)
+    length = NPY_HEADER_SIZE - len(magic) - 2
+    header = "{'descr': '<f8', 'fortran_order': False, 'shape': (%d, %d), }"
+    header = header % (rows, cols)
+    header = header.ljust(length - 1) + "\n"
+
+    return magic + np.uint16(length).astype("<u2").tobytes() + header.encode()
+
+
+class RunLog:
+    """
+    Append-only log of the points and responses of an optimization run. In
+    contrast to rewriting the whole data with np.savetxt after each iteration,
+    only the new rows are written to the end of the files and synced to disk.
+    Two formats are supported:
+    * "csv": comma separated text files, the same files write_data creates
+    * "npy": binary .npy files, which can be read with np.load (or memory
+      mapped with np.load(path, mmap_mode="r")). Suited for runs with
+      thousands of points.
+    """
+
+    def __init__(self, filepath, filename, file_format="csv", resume=False):
+        """
+        Creates a log with the files filename + "DoeData" and
+        filename + "DoeResponce" in the directory filepath.
+
+        :param filepath: Directory of the log files
+        :type filepath: String
+        :param filename: Prefix of the names of the log files
+        :type filename: String
+        :param file_format: Either "csv" (default) or "npy"
+        :type file_format: String
+        :param resume: If True, existing log files are continued, otherwise
+            they are overwritten
+        :type resume: Bool
+        """
+
+        if file_format not in ("csv", "npy"):
+            raise ValueError("Unknown file format %s" % file_format)
+
+        Path(filepath).mkdir(parents=True, exist_ok=True)
+        self.file_format = file_format
+        self.paths = {
+            name: os.path.join(filepath, filename + name + "." + file_format)
+            for name in ("DoeData", "DoeResponce")
+        }
+
+        if not resume:
+            for path in self.paths.values():
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def append(self, x, y):
+        """
+        Appends points of the design space and their responses to the log
+
+        :param x: Points in the design space, one point per row
+        :type x: Numpy array
+        :param y: System responses, one response per row
+        :type y: Numpy array
+        """
+
+        self._append(self.paths["DoeData"], x)
+        self._append(self.paths["DoeResponce"], y)
+
+    def read(self):
+        """
+        Reads all logged points and responses
+
+        :return: Points in the design space and their responses, None if
+            nothing was logged yet
+        :rtype: Tuple
+        """
+
+        return tuple(
+            self._read(self.paths[name]) for name in ("DoeData", "DoeResponce")
+        )
+
+    def trim(self, max_rows=None):
+        """
+        Truncates both log files to the rows, that both of them contain
+        completely (and to at most max_rows rows). A crash during an append
+        or between the appends of the points and their responses leaves the
+        files with different numbers of rows, so a resumed run trims them
+        before it continues the log.
+
+        :param max_rows: Maximum number of rows to keep (default None, no
+            limit)
+        :type max_rows: Integer
+        :return: Number of rows in both log files
+        :rtype: Integer
+        """
+
+        num_rows = min(self._num_rows(path) for path in self.paths.values())
+        if max_rows is not None:
+            num_rows = min(num_rows, max_rows)
+        for path in self.paths.values():
+            if num_rows == 0:
+                if os.path.exists(path):
+                    os.remove(path)
+            else:
+                self._truncate(path, num_rows)
+
+        return num_rows
+
+    def _num_rows(self, path):
+        """
+        Number of complete rows in one log file
+        """
+
+        if not os.path.exists(path):
+            return 0
+        if self.file_format == "csv":
+            with open(path, "rb") as file:
+                return file.read().count(b"\n")
+
+        rows, cols = self._npy_shape(path)
+        data_size = os.path.getsize(path) - NPY_HEADER_SIZE
+        return min(rows, max(data_size, 0) // (cols * 8))
+
+    def _truncate(self, path, num_rows):
+        """
+        Truncates one log file to its first num_rows rows
+        """
+
+        with open(path, "r+b") as file:
+            if self.file_format == "csv":
+                content = file.read()
+                end = 0
+                for _ in range(num_rows):
+                    end = content.index(b"\n", end) + 1
+                file.truncate(end)
+            else:
+                cols = self._npy_shape(path)[1]
+                file.truncate(NPY_HEADER_SIZE + num_rows * cols * 8)
+                file.seek(0)
+                file.write(_npy_header(num_rows, cols))
+            _sync(file)
+
+    @staticmethod
+    def _npy_shape(path):
+        """
+        Reads the shape from the header of an appendable .npy file
+        """
+
+        with open(path, "rb") as file:
+            file.seek(len(np.lib.format.magic(1, 0)) + 2)
+            header = file.read(NPY_HEADER_SIZE - file.tell()).decode()
+
+        return ast.literal_eval(header)["shape"]
+
+    def _read(self, path):
+        """
+        Reads one log file into a two dimensional array
+        """
+
+        if not os.path.exists(path):
+            return None
+        if self.file_format == "csv":
+            data = np.loadtxt(path, delimiter=",", ndmin=2)
+        else:
+            data = np.load(path)
+
+        return data
+
+    def _append(self, path, data):
+        """
+        Appends rows to one log file and syncs the file to disk
+        """
+
+        data = np.asarray(data, dtype="<f8")
+        data = data.reshape(data.shape[0] if data.ndim > 1 else 1, -1)
+
+        if self.file_format == "csv":
+            with open(path, "a") as file:
+                np.savetxt(file, data, delimiter=",")
+                _sync(file)
+            return
+
+        if not os.path.exists(path):
+            with open(path, "wb") as file:
+                file.write(_npy_header(0, data.shape[1]))
+                _sync(file)
+
+        rows, cols = self._npy_shape(path)
+        if cols != data.shape[1]:
+            raise ValueError(
+                "Data with %d columns can not be appended to %s"
+                % (data.shape[1], path)
+            )
+
+        # The rows are written behind the rows of the header and not at the
+        # end of the file, so that bytes left by an interrupted append are
+        # overwritten. The header is only updated, once the rows are on disk.
+        with open(path, "r+b") as file:
+            file.seek(NPY_HEADER_SIZE + rows * cols * data.itemsize)
+            file.write(np.ascontiguousarray(data).tobytes())
+            file.truncate()
+            _sync(file)
+            file.seek(0)
+            file.write(_npy_header(rows + data.shape[0], cols))
+            _sync(file)
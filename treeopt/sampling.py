@@ -1,7 +1,34 @@
+import time
+import warnings
+
+import numpy as np
+import scipy.spatial as spatial
+import scipy.stats.qmc as qmc
 import smt.sampling_methods as smtSam
 
 
-def latin_hypercube(limits, ndoe):
+def _seed(seed):
+    """
+    Returns the seed of a sampling. If no seed is given, it is drawn from
+    numpy's global random state, so np.random.seed makes all samplings
+    reproducible.
+    """
+
+    if seed is None:
+        return int(np.random.randint(2 ** 31 - 1))
+    return seed
+
+
+def _scale(u, limits):
+    """
+    Scales points of the unit hypercube to the limits of the design space
+    """
+
+    limits = np.asarray(limits, dtype=float)
+    return limits[:, 0] + u * (limits[:, 1] - limits[:, 0])
+
+
+def latin_hypercube(limits, ndoe, seed=None):
     """
     Function to define the experiment by using a latin hypercube algorithm
 
@@ -9,11 +36,14 @@ def latin_hypercube(limits, ndoe):
     :type limits: Numpy array
     :param ndoe: Number of points to be sampled in the design-space
     :type ndoe: Integer
+    :param seed: Seed of the random numbers (default None, drawn from
+        numpy's global random state)
+    :type seed: Integer
     :return: Numpy array containing the sampled points
     :rtype: Numpy array
     """
 
-    sampling = smtSam.LHS(xlimits=limits, criterion="m")
+    sampling = smtSam.LHS(xlimits=limits, criterion="m", seed=_seed(seed))
     x = sampling(ndoe)
     return x
 
@@ -35,7 +65,7 @@ def full_factorial(limits, ndoe):
     return x
 
 
-def random(limits, ndoe):
+def random(limits, ndoe, seed=None):
     """
     Function define the experiment by randomly picking points in the
     designspace
@@ -44,10 +74,285 @@ def random(limits, ndoe):
     :type limits: Numpy array
     :param ndoe: Number of points to be sampled in the design-space
     :type ndoe: Integer
+    :param seed: Seed of the random numbers (default None, drawn from
+        numpy's global random state)
+    :type seed: Integer
     :return: Numpy-array containing the sampled points
     :rtype: Numpy array
     """
 
-    sampling = smtSam.Random(xlimits=limits)
+    sampling = smtSam.Random(xlimits=limits, seed=_seed(seed))
     x = sampling(ndoe)
     return x
+
+
+def maximin_latin_hypercube(
+    limits, ndoe, seed=None, outer_iterations=10, time_limit=None, p=10
+):
+    """
+    Function to define the experiment by a latin hypercube, whose points are
+    spread by the enhanced stochastic evolutionary algorithm (Jin, Chen and
+    Sudjianto 2005). The algorithm minimizes the criterion
+    phi_p = (sum_(i<j) d_ij^-p)^(1/p) of the pairwise distances d_ij, which
+    approaches the maximin criterion for large p, by exchanging two values
+    of a column. An exchange only changes the distances of two points, so
+    each candidate is evaluated with O(ndoe) operations on the stored
+    matrix of the squared distances (memory 8 ndoe^2 bytes) instead of
+    O(ndoe^2 d). Worse designs are accepted below a threshold, that is
+    adapted after each outer iteration.
+
+    :param limits: Numpy array representing the limit of the desingn-space
+    :type limits: Numpy array
+    :param ndoe: Number of points to be sampled in the design-space
+    :type ndoe: Integer
+    :param seed: Seed of the random numbers (default None, drawn from
+        numpy's global random state)
+    :type seed: Integer
+    :param outer_iterations: Number of adaptions of the threshold
+    :type outer_iterations: Integer
+    :param time_limit: Time in seconds, after which the best design found
+        so far is returned (default None, no limit)
+    :type time_limit: Float
+    :param p: Exponent of the criterion
+    :type p: Integer
+    :return: Numpy array containing the sampled points
+    :rtype: Numpy array
+    """
+
+    start = time.perf_counter()
+    rng = np.random.default_rng(_seed(seed))
+    dim = np.asarray(limits).shape[0]
+
+    u = np.column_stack(
+        [(rng.permutation(ndoe) + rng.random(ndoe)) / ndoe for _ in range(dim)]
+    )
+    if ndoe < 3:
+        return _scale(u, limits)
+
+    d2 = np.sum((u[:, np.newaxis, :] - u[np.newaxis, :, :]) ** 2, axis=2)
+    d2[np.diag_indices(ndoe)] = np.inf
+    phi_sum = np.sum(np.triu(d2 ** (-p / 2), 1))
+    best, best_phi_sum = u.copy(), phi_sum
+
+    num_candidates = min(50, ndoe * (ndoe - 1) // 2)
+    inner_iterations = max(1, min(100, 2 * ndoe * dim // num_candidates))
+    threshold = 0.005 * phi_sum ** (1 / p)
+    rows = np.arange(num_candidates)
+
+    for _ in range(outer_iterations):
+        old_best_phi_sum = best_phi_sum
+        num_accepted = num_improved = 0
+        for inner in range(inner_iterations):
+            k = inner % dim
+            i1 = rng.integers(ndoe, size=num_candidates)
+            i2 = (i1 + rng.integers(1, ndoe, size=num_candidates)) % ndoe
+
+            # Change of the squared distances of i1 and i2 to all points,
+            # if the values of column k of i1 and i2 are exchanged
+            column = u[:, k]
+            c1 = column[i1, np.newaxis]
+            c2 = column[i2, np.newaxis]
+            delta = (c2 - column) ** 2 - (c1 - column) ** 2
+            delta[rows, i1] = 0.0
+            delta[rows, i2] = 0.0
+            new1 = d2[i1] + delta
+            new2 = d2[i2] - delta
+            change = np.sum(
+                new1 ** (-p / 2)
+                - d2[i1] ** (-p / 2)
+                + new2 ** (-p / 2)
+                - d2[i2] ** (-p / 2),
+                axis=1,
+            )
+
+            c = np.argmin(change)
+            new_phi_sum = max(phi_sum + change[c], 0.0)
+            difference = new_phi_sum ** (1 / p) - phi_sum ** (1 / p)
+            if difference > threshold * rng.random():
+                continue
+
+            a, b = i1[c], i2[c]
+            u[a, k], u[b, k] = u[b, k], u[a, k]
+            d2[a], d2[:, a] = new1[c], new1[c]
+            d2[b], d2[:, b] = new2[c], new2[c]
+            d2[a, a] = d2[b, b] = np.inf
+            phi_sum = new_phi_sum
+            num_accepted += 1
+            if phi_sum < best_phi_sum:
+                best, best_phi_sum = u.copy(), phi_sum
+                num_improved += 1
+
+        # Rounding errors of the updates are removed
+        phi_sum = np.sum(np.triu(d2 ** (-p / 2), 1))
+
+        accepted = num_accepted / inner_iterations
+        if best_phi_sum < old_best_phi_sum:
+            # Improvement: the search is narrowed, unless every accepted
+            # design was an improvement
+            if accepted > 0.1 and num_improved < num_accepted:
+                threshold *= 0.8
+            elif accepted <= 0.1:
+                threshold /= 0.8
+        elif accepted < 0.1:
+            # Exploration: more designs are accepted
+            threshold /= 0.7
+        elif accepted > 0.8:
+            threshold *= 0.9
+
+        if time_limit is not None and time.perf_counter() - start > time_limit:
+            break
+
+    return _scale(best, limits)
+
+
+def sobol(limits, ndoe, seed=None):
+    """
+    Function to define the experiment by a scrambled Sobol sequence
+    (scipy.stats.qmc.Sobol). The balance properties of the sequence hold
+    for numbers of points, that are powers of two.
+
+    :param limits: Numpy array representing the limit of the desingn-space
+    :type limits: Numpy array
+    :param ndoe: Number of points to be sampled in the design-space
+    :type ndoe: Integer
+    :param seed: Seed of the scrambling (default None, drawn from numpy's
+        global random state)
+    :type seed: Integer
+    :return: Numpy array containing the sampled points
+    :rtype: Numpy array
+    """
+
+    sequence = qmc.Sobol(np.asarray(limits).shape[0], seed=_seed(seed))
+    with warnings.catch_warnings():
+        # Warns for numbers of points, that are not powers of two
+        warnings.simplefilter("ignore", UserWarning)
+        u = sequence.random(ndoe)
+
+    return _scale(u, limits)
+
+
+def halton(limits, ndoe, seed=None):
+    """
+    Function to define the experiment by a scrambled Halton sequence
+    (scipy.stats.qmc.Halton)
+
+    :param limits: Numpy array representing the limit of the desingn-space
+    :type limits: Numpy array
+    :param ndoe: Number of points to be sampled in the design-space
+    :type ndoe: Integer
+    :param seed: Seed of the scrambling (default None, drawn from numpy's
+        global random state)
+    :type seed: Integer
+    :return: Numpy array containing the sampled points
+    :rtype: Numpy array
+    """
+
+    sequence = qmc.Halton(np.asarray(limits).shape[0], seed=_seed(seed))
+
+    return _scale(sequence.random(ndoe), limits)
+
+
+#: Sampling methods compared by measure, by their names
+METHODS = {
+    "latin_hypercube": latin_hypercube,
+    "maximin_latin_hypercube": maximin_latin_hypercube,
+    "sobol": sobol,
+    "halton": halton,
+    "random": random,
+}
+
+
+def min_distance(x, limits):
+    """
+    Returns the smallest distance between two points of a sampling, scaled
+    to the unit hypercube
+
+    :param x: Sampled points, one point per row
+    :type x: Numpy array
+    :param limits: Numpy array representing the limit of the desingn-space
+    :type limits: Numpy array
+    :return: Smallest distance
+    :rtype: Float
+    """
+
+    limits = np.asarray(limits, dtype=float)
+    u = (x - limits[:, 0]) / (limits[:, 1] - limits[:, 0])
+    distances, _ = spatial.cKDTree(u).query(u, k=2)
+
+    return float(np.min(distances[:, 1]))
+
+
+def measure(
+    methods=None, sample_counts=(100, 1000), dimensions=(2, 10), seed=0
+):
+    """
+    Measures the wall time and the smallest distance between two points of
+    the sampling methods on the unit hypercube
+
+    :param methods: Names of the sampling methods (default all of METHODS)
+    :type methods: List
+    :param sample_counts: Numbers of points
+    :type sample_counts: List
+    :param dimensions: Numbers of dimensions
+    :type dimensions: List
+    :param seed: Seed of the samplings
+    :type seed: Integer
+    :return: One result per combination with the keys method, n, d, time
+        and min_distance
+    :rtype: List
+    """
+
+    methods = list(METHODS) if methods is None else methods
+
+    results = []
+    for method in methods:
+        for d in dimensions:
+            limits = np.array([[0.0, 1.0]] * d)
+            for n in sample_counts:
+                start = time.perf_counter()
+                x = METHODS[method](limits, n, seed=seed)
+                wall_time = time.perf_counter() - start
+                results.append(
+                    {
+                        "method": method,
+                        "n": n,
+                        "d": d,
+                        "time": wall_time,
+                        "min_distance": min_distance(x, limits),
+                    }
+                )
+
+    return results
+
+
+def report(results):
+    """
+    Formats results of measure as a table
+
+    :param results: Results of measure
+    :type results: List
+    :return: Table with one line per sampling
+    :rtype: String
+    """
+
+    header = "%-24s %6s %4s %10s %12s" % (
+        "method",
+        "n",
+        "d",
+        "time",
+        "min_distance",
+    )
+    lines = [header, "-" * len(header)]
+    for result in results:
+        lines.append(
+            "%-24s %6d %4d %10.3f %12.4g"
+            % (
+                result["method"],
+                result["n"],
+                result["d"],
+                result["time"],
+                result["min_distance"],
+            )
+        )
+
+    return "\n".join(lines)
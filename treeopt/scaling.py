@@ -0,0 +1,318 @@
+import json
+import platform
+import time
+import tracemalloc
+
+import numpy as np
+import scipy
+import smt
+from pathlib import Path
+
+import treeopt.benchmark as benchmark
+import treeopt.metamodel as metamodel
+
+#: Metamodels measured by default, by their names
+METHODS = {
+    "krg": metamodel.krg,
+    "krg_incremental": metamodel.krg_incremental,
+    "krg_local": metamodel.krg_local,
+    "sgp": metamodel.sgp,
+    "rbf": metamodel.rbf,
+    "idw": metamodel.idw,
+}
+
+#: Exponent of the training time in the number of points, used to
+#: extrapolate beyond the measured sample counts (default 3, the dense
+#: solves of kriging and rbf)
+COST_EXPONENTS = {"krg_local": 1, "sgp": 1}
+
+#: Default number of training points and dimensions of a sweep
+SAMPLE_COUNTS = (50, 100, 200, 500, 1000, 2000, 5000)
+DIMENSIONS = (2, 5, 10, 20, 50)
+
+
+def _training_data(n, d, seed):
+    """
+    Returns n random points in [-1, 1]^d and the values of the rotated
+    hyper-ellipsoid function in them
+    """
+
+    rng = np.random.RandomState(seed)
+    x = rng.uniform(-1.0, 1.0, (n, d))
+    y = benchmark.rotated_hyper_ellipsoid_function(x).reshape(-1, 1)
+
+    return x, y
+
+
+def _timed_call(fun, *args):
+    """
+    Calls fun and returns its result and its wall time
+    """
+
+    start = time.perf_counter()
+    result = fun(*args)
+
+    return result, time.perf_counter() - start
+
+
+def _peak_memory(fun, *args):
+    """
+    Calls fun while tracemalloc traces the allocations and returns the peak
+    of the memory allocated during the call in bytes. Tracing slows down the
+    allocations, so the call is run separately from the timed one.
+    """
+
+    tracemalloc.start()
+    try:
+        fun(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak
+
+
+def measure(method, n, d, n_predict=1000, seed=0, memory=True):
+    """
+    Trains a metamodel on n points in d dimensions and measures the training
+    time, the throughput of batched predictions of values and variances and
+    the peak memory of training and prediction. The times are measured
+    without tracing; the memory is measured in a second, traced run of the
+    training and the predictions.
+
+    :param method: Name of a metamodel in METHODS
+    :type method: String
+    :param n: Number of training points
+    :type n: Integer
+    :param d: Number of dimensions
+    :type d: Integer
+    :param n_predict: Number of points predicted in one batch
+    :type n_predict: Integer
+    :param seed: Seed of the random training and prediction points
+    :type seed: Integer
+    :param memory: If False, the traced runs are skipped and the memory is
+        None
+    :type memory: Bool
+    :return: Measurement with the keys method, n, d, train_time,
+        train_memory, predict_values_rate, predict_variances_rate (points per
+        second, None if the metamodel has no variances) and predict_memory
+    :rtype: Dictionary
+    """
+
+    x, y = _training_data(n, d, seed)
+    x_predict, _ = _training_data(n_predict, d, seed + 1)
+
+    sm, train_time = _timed_call(METHODS[method], x, y)
+
+    _, values_time = _timed_call(sm.predict_values, x_predict)
+    variances = getattr(sm, "supports", {}).get("variances", False)
+    variances_rate = None
+    if variances:
+        _, variances_time = _timed_call(sm.predict_variances, x_predict)
+        variances_rate = n_predict / max(variances_time, 1e-12)
+
+    train_memory, predict_memory = None, None
+    if memory:
+        train_memory = _peak_memory(METHODS[method], x, y)
+        predict_memory = _peak_memory(sm.predict_values, x_predict)
+        if variances:
+            predict_memory = max(
+                predict_memory, _peak_memory(sm.predict_variances, x_predict)
+            )
+
+    return {
+        "method": method,
+        "n": n,
+        "d": d,
+        "train_time": train_time,
+        "train_memory": train_memory,
+        "predict_values_rate": n_predict / max(values_time, 1e-12),
+        "predict_variances_rate": variances_rate,
+        "predict_memory": predict_memory,
+    }
+
+
+def environment():
+    """
+    Returns the versions of python and the numerical libraries and the
+    machine, so that stored results can be compared
+
+    :return: Description of the environment
+    :rtype: Dictionary
+    """
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "smt": smt.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def sweep(
+    methods=None,
+    sample_counts=SAMPLE_COUNTS,
+    dimensions=DIMENSIONS,
+    n_predict=1000,
+    time_limit=60.0,
+    path=None,
+    seed=0,
+    memory=True,
+):
+    """
+    Measures metamodels for all combinations of sample counts and
+    dimensions. The sample counts are run in increasing order; once the
+    training of a metamodel takes longer than time_limit, larger sample
+    counts are skipped for that metamodel and dimension.
+
+    :param methods: Names of the metamodels (default all of METHODS)
+    :type methods: List
+    :param sample_counts: Numbers of training points
+    :type sample_counts: List
+    :param dimensions: Numbers of dimensions
+    :type dimensions: List
+    :param n_predict: Number of points predicted in one batch
+    :type n_predict: Integer
+    :param time_limit: Training time in seconds, above which larger sample
+        counts are skipped (None, never skip)
+    :type time_limit: Float
+    :param path: Path of a JSON file, into which the results are written
+    :type path: String
+    :param seed: Seed of the random training and prediction points
+    :type seed: Integer
+    :param memory: If False, the peak memory is not measured, which halves
+        the time of the sweep
+    :type memory: Bool
+    :return: The environment and the measurements
+    :rtype: Dictionary
+    """
+
+    methods = list(METHODS) if methods is None else methods
+
+    measurements = []
+    for method in methods:
+        for d in dimensions:
+            for n in sorted(sample_counts):
+                result = measure(method, n, d, n_predict, seed, memory)
+                measurements.append(result)
+                too_slow = result["train_time"] > (time_limit or np.inf)
+                if too_slow:
+                    break
+
+    results = {"environment": environment(), "measurements": measurements}
+
+    if path is not None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(results, file, indent=2)
+
+    return results
+
+
+def load(path):
+    """
+    Reads results written by sweep
+
+    :param path: Path of the JSON file
+    :type path: String
+    :return: The environment and the measurements
+    :rtype: Dictionary
+    """
+
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare(baseline, results, key="train_time"):
+    """
+    Compares a quantity of two sweeps for all measurements contained in
+    both
+
+    :param baseline: Results of the earlier sweep
+    :type baseline: Dictionary
+    :param results: Results of the later sweep
+    :type results: Dictionary
+    :param key: Compared quantity, e.g. "train_time" or
+        "predict_values_rate"
+    :type key: String
+    :return: Ratio later / earlier by (method, n, d)
+    :rtype: Dictionary
+    """
+
+    def index(res):
+        return {
+            (m["method"], m["n"], m["d"]): m[key]
+            for m in res["measurements"]
+            if m[key] is not None
+        }
+
+    old, new = index(baseline), index(results)
+
+    return {
+        config: new[config] / old[config]
+        for config in old
+        if config in new and old[config] > 0
+    }
+
+
+def choose_surrogate(
+    results,
+    n,
+    d,
+    max_train_time=10.0,
+    variances=True,
+    preference=("krg_incremental", "krg", "krg_local", "sgp", "rbf", "idw"),
+):
+    """
+    Chooses a metamodel for a study with n points in d dimensions from the
+    measurements of a sweep. The measurement with the nearest sample count
+    above (or the largest below) n and the nearest dimension is used for
+    each metamodel; the first metamodel of the preference list, whose
+    training time stays below max_train_time, is chosen.
+
+    :param results: Results of sweep
+    :type results: Dictionary
+    :param n: Number of points of the study
+    :type n: Integer
+    :param d: Number of dimensions of the study
+    :type d: Integer
+    :param max_train_time: Acceptable training time in seconds
+    :type max_train_time: Float
+    :param variances: If True, only metamodels with variances are chosen
+        (required by the acquisition functions)
+    :type variances: Bool
+    :param preference: Names of the metamodels, most preferred first
+    :type preference: List
+    :return: Name of the metamodel, None if no metamodel is fast enough
+    :rtype: String
+    """
+
+    for method in preference:
+        candidates = [
+            m for m in results["measurements"] if m["method"] == method
+        ]
+        if not candidates:
+            continue
+        d_near = min({m["d"] for m in candidates}, key=lambda k: abs(k - d))
+        candidates = [m for m in candidates if m["d"] == d_near]
+        above = [m for m in candidates if m["n"] >= n]
+        if above:
+            measurement = min(above, key=lambda m: m["n"])
+        else:
+            measurement = max(candidates, key=lambda m: m["n"])
+            if measurement["train_time"] <= max_train_time:
+                # Larger sample counts were not measured, the training time
+                # is extrapolated with the cost exponent of the metamodel
+                exponent = COST_EXPONENTS.get(method, 3)
+                measurement = dict(measurement)
+                measurement["train_time"] *= (n / measurement["n"]) ** exponent
+
+        if variances and measurement["predict_variances_rate"] is None:
+            continue
+        if measurement["train_time"] <= max_train_time:
+            return method
+
+    return None
@@ -0,0 +1,313 @@
+import time
+
+import numpy as np
+
+
+class State:
+    """
+    Progress of an optimization, on which the termination policies decide.
+    The optimization loops create a State before their first iteration, with
+    the wall time of the initial sampling, and update it after each
+    iteration.
+    """
+
+    def __init__(self, ite=0, num_evals=0, best=None, elapsed=0.0):
+        """
+        Starts the wall clock of the optimization
+
+        :param ite: Number of iterations done so far
+        :type ite: Integer
+        :param num_evals: Number of evaluations of the problem done so far
+        :type num_evals: Integer
+        :param best: Lowest known system response, if there is one
+        :type best: Float
+        :param elapsed: Wall time in seconds spent before the State was
+            created, e.g. in the initial sampling or in the run a checkpoint
+            was written by
+        :type elapsed: Float
+        """
+
+        self.start_time = time.perf_counter() - elapsed
+        self.ite = ite
+        self.num_evals = num_evals
+        self.best = [] if best is None else [float(best)]
+        self.acquisition_value = None
+        self.min_distance = np.inf
+
+    @property
+    def elapsed(self):
+        """
+        Wall time in seconds since the State was created, including the
+        elapsed time it was created with
+        """
+        return time.perf_counter() - self.start_time
+
+    def update(
+        self, ite, num_evals, best, acquisition_value=None, min_distance=None
+    ):
+        """
+        Records the progress of one iteration
+
+        :param ite: Number of iterations done so far
+        :type ite: Integer
+        :param num_evals: Number of evaluations of the problem done so far
+        :type num_evals: Integer
+        :param best: Lowest known system response
+        :type best: Float
+        :param acquisition_value: Value of the acquisition function in the
+            points of the iteration, large values being promising (see
+            acquisition.promise)
+        :type acquisition_value: Float
+        :param min_distance: Smallest distance between any two known points
+        :type min_distance: Float
+        :return: Nothing
+        :rtype: None
+        """
+
+        self.ite = ite
+        self.num_evals = num_evals
+        self.best.append(float(best))
+        self.acquisition_value = acquisition_value
+        if min_distance is not None:
+            self.min_distance = min_distance
+
+
+class Termination:
+    """
+    Base class of the termination policies. A policy is called with the
+    State of an optimization and returns True, if the optimization should
+    stop. Policies can be combined with | (stop if any policy is met) and &
+    (stop if all policies are met).
+    """
+
+    def done(self, state):
+        """
+        Decides whether the optimization should stop
+
+        :param state: Progress of the optimization
+        :type state: termination.State
+        :return: True, if the policy is met
+        :rtype: Bool
+        """
+
+        raise NotImplementedError
+
+    def reason(self, state):
+        """
+        Returns a description of the met policies
+
+        :param state: Progress of the optimization
+        :type state: termination.State
+        :return: Description, None if the optimization should go on
+        :rtype: String
+        """
+
+        if self.done(state):
+            return repr(self)
+        return None
+
+    def budget(self, state):
+        """
+        Returns the number of evaluations that can still be started before
+        the policy is met. Used by the asynchronous loop, to not start more
+        evaluations than allowed.
+
+        :param state: Progress of the optimization
+        :type state: termination.State
+        :return: Number of evaluations, inf if the policy sets no limit
+        :rtype: Float
+        """
+
+        return np.inf
+
+    def __call__(self, state):
+        return self.reason(state) is not None
+
+    def __or__(self, other):
+        return Any(self, other)
+
+    def __and__(self, other):
+        return All(self, other)
+
+
+class Any(Termination):
+    """
+    Stops the optimization as soon as one of several policies is met
+    """
+
+    def __init__(self, *policies):
+        self.policies = policies
+
+    def done(self, state):
+        return any(policy.done(state) for policy in self.policies)
+
+    def reason(self, state):
+        for policy in self.policies:
+            reason = policy.reason(state)
+            if reason is not None:
+                return reason
+        return None
+
+    def budget(self, state):
+        return min([np.inf] + [p.budget(state) for p in self.policies])
+
+    def __repr__(self):
+        return " | ".join(repr(policy) for policy in self.policies)
+
+
+class All(Termination):
+    """
+    Stops the optimization when all of several policies are met
+    """
+
+    def __init__(self, *policies):
+        self.policies = policies
+
+    def done(self, state):
+        return all(policy.done(state) for policy in self.policies)
+
+    def reason(self, state):
+        if not self.done(state):
+            return None
+        return " & ".join(policy.reason(state) for policy in self.policies)
+
+    def budget(self, state):
+        return max(p.budget(state) for p in self.policies)
+
+    def __repr__(self):
+        return " & ".join(repr(policy) for policy in self.policies)
+
+
+class MaxIterations(Termination):
+    """
+    Stops the optimization after a number of iterations of the adaptive loop
+    """
+
+    def __init__(self, max_ite):
+        """
+        :param max_ite: Maximum number of iterations
+        :type max_ite: Integer
+        """
+        self.max_ite = max_ite
+
+    def done(self, state):
+        return state.ite >= self.max_ite
+
+    def budget(self, state):
+        return self.max_ite - state.ite
+
+    def __repr__(self):
+        return "MaxIterations(%d)" % self.max_ite
+
+
+class MaxEvaluations(Termination):
+    """
+    Stops the optimization after a number of evaluations of the problem,
+    including the evaluations of the initial sampling
+    """
+
+    def __init__(self, max_evals):
+        """
+        :param max_evals: Maximum number of evaluations
+        :type max_evals: Integer
+        """
+        self.max_evals = max_evals
+
+    def done(self, state):
+        return state.num_evals >= self.max_evals
+
+    def budget(self, state):
+        return self.max_evals - state.num_evals
+
+    def __repr__(self):
+        return "MaxEvaluations(%d)" % self.max_evals
+
+
+class WallClock(Termination):
+    """
+    Stops the optimization, when its wall time exceeds a budget. Running
+    iterations are finished, so the budget can be exceeded by the duration
+    of one iteration.
+    """
+
+    def __init__(self, seconds):
+        """
+        :param seconds: Budget of wall time in seconds
+        :type seconds: Float
+        """
+        self.seconds = seconds
+
+    def done(self, state):
+        return state.elapsed >= self.seconds
+
+    def __repr__(self):
+        return "WallClock(%g)" % self.seconds
+
+
+class Stall(Termination):
+    """
+    Stops the optimization, when the lowest known system response has not
+    improved by more than tol during the last window iterations
+    """
+
+    def __init__(self, window, tol=0.0):
+        """
+        :param window: Number of iterations without improvement
+        :type window: Integer
+        :param tol: Smallest improvement, that counts as progress
+        :type tol: Float
+        """
+        self.window = window
+        self.tol = tol
+
+    def done(self, state):
+        if len(state.best) <= self.window:
+            return False
+        return state.best[-1 - self.window] - state.best[-1] <= self.tol
+
+    def __repr__(self):
+        return "Stall(%d, tol=%g)" % (self.window, self.tol)
+
+
+class AcquisitionThreshold(Termination):
+    """
+    Stops the optimization, when the acquisition function promises less than
+    a threshold in the points of the last iteration, e.g. an expected
+    improvement below the threshold
+    """
+
+    def __init__(self, threshold):
+        """
+        :param threshold: Smallest promising value of the acquisition function
+        :type threshold: Float
+        """
+        self.threshold = threshold
+
+    def done(self, state):
+        return (
+            state.acquisition_value is not None
+            and state.acquisition_value < self.threshold
+        )
+
+    def __repr__(self):
+        return "AcquisitionThreshold(%g)" % self.threshold
+
+
+class MinSpacing(Termination):
+    """
+    Stops the optimization, when two known points are closer than a minimal
+    distance, i.e. the optimization samples a region it already knows
+    """
+
+    def __init__(self, distance):
+        """
+        :param distance: Minimal distance of two points
+        :type distance: Float
+        """
+        self.distance = distance
+
+    def done(self, state):
+        return state.min_distance < self.distance
+
+    def __repr__(self):
+        return "MinSpacing(%g)" % self.distance
@@ -1,15 +1,60 @@
+import functools
+import logging
 import numpy as np
 import os
+import time
+
+from concurrent import futures
 
 from pathlib import Path
 import scipy.optimize as sk_optimize
 
 # Import of treeopt submodules
 import treeopt.sampling as sampling
+import treeopt.scaling as scaling
+import treeopt.evaluate as evaluate
+import treeopt.datastore as datastore
+import treeopt.runlog as runlog
+import treeopt.checkpoint as checkpoint
+import treeopt.instrument as instrument
 import treeopt.optimize as optimize
+import treeopt.acquisition as acquisition
+import treeopt.termination as termination
 import treeopt.metamodel as metamodel
 import treeopt.visualize as visualize
 
+logger = logging.getLogger(__name__)
+
+
+def _point_call(fun, kwargs, x, *args):
+    """
+    Calls a least-squares cost function, which takes a single point, with
+    the single row of x, as given by the evaluate functions. Defined on
+    module level, so it can be pickled for evaluate.process_pool.
+    """
+
+    return np.ravel(fun(np.ravel(x), *args, **kwargs))
+
+
+def _solve_start(fun, start, options):
+    """
+    Runs one local least-squares solve of a multistart optimization and
+    counts the calls of the cost function (including those of the finite
+    difference Jacobian). Defined on module level, so it can be run in a
+    process pool.
+    """
+
+    num_evals = [0]
+
+    def counted(x, *args, **kwargs):
+        num_evals[0] += 1
+        return fun(x, *args, **kwargs)
+
+    res = sk_optimize.least_squares(counted, start, **options)
+    res.num_evals = num_evals[0]
+
+    return res
+
 
 class least_squares:
     """
@@ -33,19 +78,39 @@ class least_squares:
         self.f_tol = 1e-8
         self.optimization_function_args = []
         self.optimization_function_kwargs = {}
-
-    def set_cost_function(self, cost_function):
+        self.instrumentation = instrument.Instrumentation()
+        self.jacobian_method = None
+        self.num_workers = None
+        self.surrogate_method = None
+        self.trust_radius = 0.1
+        self.batched = False
+        self.num_starts = 1
+        self.multistart_method = evaluate.process_pool
+        self.unique_distance = 1e-3
+        self._base_point = None
+
+    def set_cost_function(self, cost_function, batched=False):
         """Sets the problem of which an optimization is to be done. Arguments
         have to be passed in the following way:  function(x, args,
         kwargs), where x are the parameters which are to be optimized,
         args are static Variables and kwargs are keyword-Variables.
 
+        A batched cost function takes a matrix x with one parameter vector
+        per row and returns the residuals as one row per parameter vector.
+        It is called with all points of a finite difference Jacobian at
+        once, with the concurrent requests of the solves of a multistart
+        optimization and with the sampled points of optimize_surrogate.
+
         :param cost_function: A function that takes takes parameters and
             returns the system response
         :type cost_function: Python function
+        :param batched: True, if the cost function takes several parameter
+            vectors at once (default False)
+        :type batched: Bool
         """
 
         self.optimization_function = cost_function
+        self.batched = batched
 
     def set_cost_function_args(self, args):
         """
@@ -133,28 +198,683 @@ class least_squares:
 
         self.max_nfev = max_nfev
 
+    def set_jacobian_method(self, method):
+        """
+        Sets the Method that is used to evaluate the perturbed points of the
+        finite difference Jacobian. By default (None) scipy computes the
+        Jacobian and calls the cost function once per parameter, one call
+        after another. With one of the evaluate functions the d perturbed
+        points are evaluated at once, e.g. concurrently with
+        evaluate.thread_pool or evaluate.process_pool, so a Jacobian takes
+        about the wall time of one cost function call:
+        * evaluate.serial
+        * evaluate.thread_pool
+        * evaluate.process_pool (cost function and arguments have to be
+          picklable)
+
+        :param method: one of the evaluate functions or None
+        :type method: python function
+        :return: Nothing
+        :rtype: None
+        """
+
+        self.jacobian_method = method
+
+    def set_num_workers(self, num_workers):
+        """
+        Sets the Number of threads or processes used to evaluate the
+        Jacobian concurrently
+
+        :param num_workers: Number of concurrent evaluations
+        :type num_workers: Integer
+        :return: Nothing
+        :rtype: None
+        """
+
+        self.num_workers = num_workers
+
+    def set_surrogate_method(self, method):
+        """
+        Sets a metamodel of the residual vector, with which the optimization
+        takes trust-region steps (see optimize_surrogate). By default (None)
+        scipy minimizes the cost function directly. The metamodel has to
+        predict several outputs and extrapolate smoothly beyond its training
+        points, e.g.:
+        * metamodel.krg_incremental (kriging)
+        * metamodel.krg_local (mixture of local kriging metamodels)
+        The surrogate optimization runs from the start point only and cannot
+        be combined with a multistart optimization (set_num_starts).
+
+        :param method: one of the metamodel functions or None
+        :type method: python function
+        :return: Nothing
+        :rtype: None
+        """
+
+        self.surrogate_method = method
+
+    def set_trust_radius(self, value):
+        """
+        Sets the initial radius of the trust region of optimize_surrogate,
+        relative to the width of the limits (default 0.1)
+
+        :param value: Relative radius of the trust region
+        :type value: Float
+        """
+
+        self.trust_radius = value
+
+    def set_num_starts(self, num_starts):
+        """
+        Sets the number of local solves of a multistart optimization
+        (default 1, a single solve from the start point). The start point
+        (if it is set) and a latin hypercube sampling of the limits are used
+        as start points (see optimize_multistart). With a batched cost
+        function every local solve runs in its own thread, so that their
+        points are evaluated together; the multistart method and the number
+        of workers are ignored then.
+
+        :param num_starts: Number of start points
+        :type num_starts: Integer
+        """
+
+        self.num_starts = num_starts
+
+    def set_multistart_method(self, method):
+        """
+        Sets the Method that runs the local solves of a multistart
+        optimization concurrently:
+        * evaluate.process_pool (default, cost function and arguments have
+          to be picklable)
+        * evaluate.thread_pool
+        The number of workers is set with set_num_workers. The method is not
+        used for a batched cost function (see set_num_starts).
+
+        :param method: one of the evaluate functions
+        :type method: python function
+        """
+
+        self.multistart_method = method
+
+    def set_unique_distance(self, value):
+        """
+        Sets the distance relative to the width of the limits (default
+        1e-3), below which the solutions of two local solves are considered
+        the same
+
+        :param value: Relative distance of distinct solutions
+        :type value: Float
+        """
+
+        self.unique_distance = value
+
+    def set_instrumentation(self, instrumentation):
+        """
+        Sets the instrumentation, that measures the wall time of the cost
+        function calls ("simulation"). An event is passed to the callback of
+        the instrumentation and written to its trace file after each call of
+        the cost function and at the end of the optimization.
+
+        :param instrumentation: Instrumentation of the optimization
+        :type instrumentation: instrument.Instrumentation
+        """
+
+        self.instrumentation = instrumentation
+
+    def timed_cost_function(self, x, *args, **kwargs):
+        """
+        Calls the cost function, measures its wall time and reports an
+        "evaluation" event with the cost 0.5 * sum(f**2) to the
+        instrumentation
+
+        :param x: Point in the design space
+        :type x: Numpy-array
+        :return: Residuals of the cost function
+        :rtype: Numpy-array
+        """
+
+        with self.instrumentation.phase("simulation"):
+            if self.batched:
+                f = np.asarray(
+                    self.optimization_function(
+                        np.atleast_2d(x), *args, **kwargs
+                    )
+                ).reshape(1, -1)[0]
+            else:
+                f = self.optimization_function(x, *args, **kwargs)
+        self._base_point = (np.array(x, dtype=float), np.ravel(f))
+        self.count_evaluation(f)
+
+        return f
+
+    def count_evaluation(self, f):
+        """
+        Counts an evaluation of the cost function and reports an
+        "evaluation" event with the cost 0.5 * sum(f**2)
+
+        :param f: Residuals of the cost function
+        :type f: Numpy-array
+        """
+
+        self.num_evals += 1
+        self.instrumentation.emit(
+            "evaluation",
+            optimizer="least_squares",
+            num_evals=self.num_evals,
+            cost=0.5 * float(np.sum(np.square(f))),
+        )
+
+    def difference_steps(self, x):
+        """
+        Returns the steps of the forward difference Jacobian in x, chosen as
+        by scipy: diff_step relative to abs(x) (or the square root of the
+        machine precision relative to max(1, abs(x)) for zero steps), taken
+        backwards where the forward step leaves the limits. Where the step
+        fits neither forwards nor backwards, it is shrunk to the distance to
+        the farther limit.
+
+        :param x: Point in the design space
+        :type x: Numpy-array
+        :return: Step of each parameter
+        :rtype: Numpy-array
+        """
+
+        x = np.array(x, dtype=float)
+        lower, upper = (np.broadcast_to(b, x.shape) for b in self.limits)
+        sign = np.where(x >= 0, 1.0, -1.0)
+        h = self.diff_step * sign * np.abs(x)
+        fallback = (
+            np.sqrt(np.finfo(float).eps) * sign * np.maximum(1.0, abs(x))
+        )
+        h = np.where((x + h) - x == 0, fallback, h)
+        lower_dist, upper_dist = x - lower, upper - x
+        outside = (x + h < lower) | (x + h > upper)
+        fitting = np.abs(h) <= np.maximum(lower_dist, upper_dist)
+        h[outside & fitting] *= -1.0
+        forward = ~fitting & (upper_dist >= lower_dist)
+        h[forward] = upper_dist[forward]
+        backward = ~fitting & (upper_dist < lower_dist)
+        h[backward] = -lower_dist[backward]
+
+        return (x + h) - x
+
+    def jacobian(self, x, *args, **kwargs):
+        """
+        Calculates the forward difference Jacobian of the cost function with
+        the jacobian method and the steps of difference_steps. The residuals
+        in x are taken from the last call of the cost function, if it was
+        made in x, otherwise x is evaluated together with the perturbed
+        points.
+
+        :param x: Point in the design space
+        :type x: Numpy-array
+        :return: Jacobian, one row per residual and one column per parameter
+        :rtype: Numpy-array
+        """
+
+        def evaluate_points(points):
+            return self.evaluate_points(points, *args, **kwargs)
+
+        return self.forward_differences(x, evaluate_points, self._base_point)
+
+    def forward_differences(self, x, evaluate_points, base_point=None):
+        """
+        Calculates the forward difference Jacobian with the steps of
+        difference_steps, evaluating all perturbed points at once
+
+        :param x: Point in the design space
+        :type x: Numpy-array
+        :param evaluate_points: Function returning the residuals of several
+            points, one row per point
+        :type evaluate_points: Python function
+        :param base_point: Point and its residuals, which are reused if the
+            point is x (default None, x is evaluated with the perturbed
+            points)
+        :type base_point: Tuple
+        :return: Jacobian, one row per residual and one column per parameter
+        :rtype: Numpy-array
+        """
+
+        x = np.array(x, dtype=float)
+        h = self.difference_steps(x)
+
+        points = x + np.diag(h)
+        cached = base_point is not None and np.array_equal(base_point[0], x)
+        if not cached:
+            points = np.vstack([points, x])
+
+        f = evaluate_points(points)
+        f0 = base_point[1] if cached else f[-1]
+
+        return ((f[: x.size] - f0) / h[:, np.newaxis]).T
+
+    def evaluate_points(self, points, *args, **kwargs):
+        """
+        Evaluates the cost function in several points at once with the
+        jacobian method (default evaluate.serial, evaluate.vectorized for
+        batched cost functions) and counts each evaluation
+
+        :param points: Points in the design space, one point per row
+        :type points: Numpy-array
+        :return: Residuals, one row per point
+        :rtype: Numpy-array
+        """
+
+        if self.batched:
+            method = evaluate.vectorized
+            fun = functools.partial(self.optimization_function, **kwargs)
+        else:
+            method = self.jacobian_method or evaluate.serial
+            fun = functools.partial(
+                _point_call, self.optimization_function, dict(kwargs)
+            )
+
+        def store_result(i, fi, wall_time):
+            self.count_evaluation(fi)
+
+        with self.instrumentation.phase("simulation"):
+            f, _ = method(fun, points, args, self.num_workers, store_result)
+
+        return f
+
+    def optimize_surrogate(self):
+        """
+        Minimizes the cost function with trust-region steps on a metamodel of
+        the residual vector. In each iteration the metamodel is trained on
+        the evaluated points within twice the trust region around the best
+        point (in coordinates scaled by the radius) and shifted to the
+        residuals of the best point. The metamodel is minimized within the
+        trust region by scipy and only its minimum is evaluated with the
+        cost function. The radius is halved, if the actual reduction of the
+        cost is less than a quarter of the predicted one, and doubled, if it
+        is more than three quarters and the step reached the border. Missing
+        points of the local training set are sampled with a latin hypercube
+        in the trust region.
+
+        If the metamodel predicts a reduction below f_tol relative to the
+        cost, its prediction is verified with the forward difference
+        Jacobian of the cost function (evaluated with the jacobian method):
+        the optimization stops, if the Gauss-Newton step within the limits
+        does not reduce the cost by more than f_tol either, otherwise the
+        perturbed points are added to the training points. Points, that
+        have been evaluated before (e.g. the perturbed points of a repeated
+        verification), are not evaluated again. The optimization also stops
+        after max_nfev evaluations (default 100 per parameter) and if the
+        radius drops below x_tol relative to the limits.
+
+        :return: Object containing the Optimization result
+        :rtype: Scipy-Optimize Object
+        """
+
+        args = self.optimization_function_args
+        kwargs = self.optimization_function_kwargs
+        x_best = np.array(self.start_point, dtype=float)
+        lower, upper = (
+            np.broadcast_to(np.asarray(b, dtype=float), x_best.shape)
+            for b in self.limits
+        )
+        x_best = np.clip(x_best, lower, upper)
+        width = upper - lower
+        radius = self.trust_radius * width
+        max_nfev = self.max_nfev or 100 * x_best.size
+
+        x = x_best[np.newaxis, :]
+        f = self.evaluate_points(x, *args, **kwargs)
+        f_best = f[0]
+
+        def evaluate_new(points):
+            # Takes the residuals of evaluated points from x and f and only
+            # evaluates the others with the cost function
+            nonlocal x, f
+            found = [np.flatnonzero(np.all(x == p, axis=1)) for p in points]
+            missing = [i for i, index in enumerate(found) if index.size == 0]
+            values = np.empty((len(points), f.shape[1]))
+            for i, index in enumerate(found):
+                if index.size > 0:
+                    values[i] = f[index[0]]
+            if missing:
+                values[missing] = self.evaluate_points(
+                    points[missing], *args, **kwargs
+                )
+                x = np.vstack([x, points[missing]])
+                f = np.vstack([f, values[missing]])
+            return values
+
+        cost_best = 0.5 * np.sum(f_best ** 2)
+        status, ite = 0, 0
+
+        while self.num_evals < max_nfev:
+            low = np.maximum(lower, x_best - radius)
+            high = np.minimum(upper, x_best + radius)
+
+            local = np.all(np.abs(x - x_best) <= 2 * radius, axis=1)
+            missing = x_best.size + 1 - np.count_nonzero(local)
+            if missing > 0:
+                # The latin hypercube needs at least two points
+                new = sampling.latin_hypercube(
+                    np.column_stack([low, high]), max(missing, 2)
+                )
+                x = np.vstack([x, new])
+                f = np.vstack([f, self.evaluate_points(new, *args, **kwargs)])
+                continue
+
+            with self.instrumentation.phase("fit"):
+                sm = self.surrogate_method(
+                    (x[local] - x_best) / radius, f[local]
+                )
+            shift = f_best - sm.predict_values(np.zeros((1, x_best.size)))[0]
+
+            def surrogate_residuals(u):
+                return sm.predict_values(u[np.newaxis, :])[0] + shift
+
+            with self.instrumentation.phase("step"):
+                sub = sk_optimize.least_squares(
+                    surrogate_residuals,
+                    np.zeros(x_best.size),
+                    bounds=((low - x_best) / radius, (high - x_best) / radius),
+                )
+            predicted = cost_best - sub.cost
+            step = sub.x * radius
+
+            if predicted <= self.f_tol * cost_best:
+                # Verify with the Jacobian of the cost function, whose
+                # Gauss-Newton step replaces the step on the metamodel
+                h = self.difference_steps(x_best)
+                f_new = evaluate_new(x_best + np.diag(h))
+                jac = ((f_new - f_best) / h[:, np.newaxis]).T
+                step = sk_optimize.lsq_linear(
+                    jac, -f_best, bounds=(low - x_best, high - x_best)
+                ).x
+                predicted = cost_best - 0.5 * np.sum(
+                    (f_best + jac @ step) ** 2
+                )
+                small_step = np.linalg.norm(step) <= self.x_tol * (
+                    self.x_tol + np.linalg.norm(x_best)
+                )
+                if predicted <= self.f_tol * cost_best or small_step:
+                    status = 2
+                    break
+
+            x_new = np.clip(x_best + step, lower, upper)
+            f_new = evaluate_new(x_new[np.newaxis, :])
+            cost_new = 0.5 * np.sum(f_new[0] ** 2)
+            actual = cost_best - cost_new
+            rho = actual / predicted
+            ite += 1
+
+            if rho < 0.25:
+                radius = 0.5 * radius
+            elif rho > 0.75 and np.max(np.abs(step) / radius) > 0.99:
+                radius = np.minimum(2 * radius, width)
+            if actual > 0:
+                x_best, f_best, cost_best = x_new, f_new[0], cost_new
+
+            self.instrumentation.emit(
+                "iteration",
+                optimizer="least_squares",
+                ite=ite,
+                num_evals=self.num_evals,
+                cost=float(cost_best),
+                ratio=float(rho),
+                trust_radius=radius,
+            )
+            logger.debug(
+                "Trust-region step %d: cost %g, ratio %g", ite, cost_new, rho
+            )
+
+            if np.all(radius < self.x_tol * width):
+                status = 2
+                break
+
+        messages = {
+            0: "The maximum number of function evaluations is exceeded.",
+            2: "The reduction of the cost or the trust region fell below the "
+            "tolerances.",
+        }
+
+        return sk_optimize.OptimizeResult(
+            x=x_best,
+            cost=cost_best,
+            fun=f_best,
+            nfev=self.num_evals,
+            njev=0,
+            nit=ite,
+            status=status,
+            message=messages[status],
+            success=status > 0,
+        )
+
+    def solve_starts(self, starts, options):
+        """
+        Runs the local solves of a multistart optimization concurrently with
+        the multistart method
+
+        :param starts: Start points
+        :type starts: List
+        :param options: Options of scipy.optimize.least_squares
+        :type options: Dictionary
+        :return: Results of the solves in the order of the start points
+        :rtype: List
+        """
+
+        results = [None] * len(starts)
+        with self.instrumentation.phase("simulation"):
+            with evaluate.make_executor(
+                self.multistart_method, self.num_workers
+            ) as executor:
+                jobs = {
+                    executor.submit(
+                        _solve_start, self.optimization_function, x0, options
+                    ): i
+                    for i, x0 in enumerate(starts)
+                }
+                for job in futures.as_completed(jobs):
+                    i = jobs[job]
+                    results[i] = job.result()
+                    self.num_evals += results[i].num_evals
+                    self.instrumentation.emit(
+                        "start",
+                        optimizer="least_squares",
+                        start=i,
+                        num_evals=self.num_evals,
+                        cost=float(results[i].cost),
+                    )
+
+        return results
+
+    def solve_batched_starts(self, starts, options):
+        """
+        Runs the local solves of a multistart optimization with a batched
+        cost function. Each solve runs in its own thread; the points, that
+        the solves request at the same time (including the perturbed points
+        of their Jacobians), are evaluated in one call of the cost function
+        by an evaluate.BatchEvaluator.
+
+        :param starts: Start points
+        :type starts: List
+        :param options: Options of scipy.optimize.least_squares
+        :type options: Dictionary
+        :return: Results of the solves in the order of the start points
+        :rtype: List
+        """
+
+        def count_batch(x, f):
+            for fi in f:
+                self.count_evaluation(fi)
+
+        evaluator = evaluate.BatchEvaluator(
+            self.optimization_function,
+            len(starts),
+            options["args"],
+            options["kwargs"],
+            count_batch,
+        )
+        options = dict(options, args=(), kwargs={})
+
+        def solve(i, x0):
+            base_point = [None]
+
+            def residuals(x):
+                f = evaluator(x)[0]
+                base_point[0] = (np.array(x), f)
+                return f
+
+            def jacobian(x):
+                return self.forward_differences(x, evaluator, base_point[0])
+
+            try:
+                res = sk_optimize.least_squares(
+                    residuals, x0, jac=jacobian, **options
+                )
+            finally:
+                evaluator.finish()
+            self.instrumentation.emit(
+                "start",
+                optimizer="least_squares",
+                start=i,
+                num_evals=self.num_evals,
+                cost=float(res.cost),
+            )
+
+            return res
+
+        # Every solve needs its own thread, as the evaluator waits for all
+        # active solves
+        with self.instrumentation.phase("simulation"):
+            with futures.ThreadPoolExecutor(len(starts)) as executor:
+                jobs = [
+                    executor.submit(solve, i, x0)
+                    for i, x0 in enumerate(starts)
+                ]
+                results = [job.result() for job in jobs]
+
+        logger.debug(
+            "Batched multistart evaluated %d points in %d calls",
+            self.num_evals,
+            evaluator.num_calls,
+        )
+
+        return results
+
+    def optimize_multistart(self):
+        """
+        Runs independent local least-squares solves from num_starts start
+        points concurrently with the multistart method. The start points are
+        the start point (if it is set) and a latin hypercube sampling of the
+        limits. Solutions closer than unique_distance (relative to the limits)
+        to a better solution are merged into it.
+
+        :return: Result of the best solve. Its attribute solutions holds the
+            results of all distinct solutions ranked by their cost, each with
+            the number of starts that converged to it in num_starts.
+        :rtype: Scipy-Optimize Object
+        """
+
+        lower, upper = (np.asarray(b, dtype=float) for b in self.limits)
+        limits = np.column_stack(np.broadcast_arrays(lower, upper))
+        starts = []
+        if getattr(self, "start_point", None) is not None:
+            starts.append(np.array(self.start_point, dtype=float))
+        num_sampled = self.num_starts - len(starts)
+        if num_sampled > 0:
+            # The latin hypercube needs at least two points
+            sampled = sampling.latin_hypercube(limits, max(num_sampled, 2))
+            starts.extend(sampled[:num_sampled])
+
+        options = {
+            "bounds": self.limits,
+            "args": self.optimization_function_args,
+            "kwargs": self.optimization_function_kwargs,
+            "diff_step": self.diff_step,
+            "max_nfev": self.max_nfev,
+            "xtol": self.x_tol,
+            "ftol": self.f_tol,
+        }
+
+        if self.batched:
+            results = self.solve_batched_starts(starts, options)
+        else:
+            results = self.solve_starts(starts, options)
+
+        width = limits[:, 1] - limits[:, 0]
+        solutions = []
+        for res in sorted(results, key=lambda res: res.cost):
+            for solution in solutions:
+                distance = np.max(np.abs(res.x - solution.x) / width)
+                if distance <= self.unique_distance:
+                    solution.num_starts += 1
+                    break
+            else:
+                res.num_starts = 1
+                solutions.append(res)
+
+        logger.info(
+            "Multistart least squares found %d distinct solutions from %d "
+            "starts",
+            len(solutions),
+            len(starts),
+        )
+
+        op = sk_optimize.OptimizeResult(solutions[0])
+        op.solutions = solutions
+
+        return op
+
     def optimize(self):
         """
         Function that starts the previously parameterized adaptive optimization
         loop. It uses the previously defined parameters, which are stored in as
         class variables. The function differs between four configurations
         containing different parameterizations of the
-        optimization_function_args and the optimization_function_kwargs
+        optimization_function_args and the optimization_function_kwargs. A
+        surrogate method can not be combined with several start points.
 
         :return: Object containing the Optimization result
         :rtype: Scipy-Optimize Object
         """
 
-        op = sk_optimize.least_squares(
-            self.optimization_function,
-            self.start_point,
-            bounds=self.limits,
-            args=self.optimization_function_args,
-            kwargs=self.optimization_function_kwargs,
-            diff_step=self.diff_step,
-            max_nfev=self.max_nfev,
-            xtol=self.x_tol,
-            ftol=self.f_tol,
+        if self.surrogate_method is not None and self.num_starts > 1:
+            raise ValueError(
+                "The surrogate optimization does not support %d start points"
+                % self.num_starts
+            )
+
+        self.num_evals = 0
+        self._base_point = None
+        jac = "2-point"
+        if self.jacobian_method is not None or self.batched:
+            jac = self.jacobian
+        if self.surrogate_method is not None:
+            op = self.optimize_surrogate()
+        elif self.num_starts > 1:
+            op = self.optimize_multistart()
+        else:
+            op = sk_optimize.least_squares(
+                self.timed_cost_function,
+                self.start_point,
+                jac=jac,
+                bounds=self.limits,
+                args=self.optimization_function_args,
+                kwargs=self.optimization_function_kwargs,
+                diff_step=self.diff_step,
+                max_nfev=self.max_nfev,
+                xtol=self.x_tol,
+                ftol=self.f_tol,
+            )
+
+        self.instrumentation.emit(
+            "end",
+            optimizer="least_squares",
+            num_evals=self.num_evals,
+            cost=float(op.cost),
+            status=int(op.status),
+            total=self.instrumentation.summary(),
+        )
+
+        logger.info(
+            "Least squares finished after %d evaluations: %s",
+            self.num_evals,
+            op.message,
         )
 
         self.sim_res = op
@@ -178,15 +898,55 @@ class adaptive_metamodell:
 
         self.samplingMethod = sampling.latin_hypercube
         self.smMethod = metamodel.krg
+        self.evaluationMethod = evaluate.serial
+        self.batched = False
+        self.num_workers = None
+        self.batch_size = 1
+        self.acquisition = "lcb"
+        self.acquisition_params = {}
+        self.termination = termination.MaxIterations(5)
+        self.min_distance = np.inf
         self.optimization_function_args = []
         self.vis_keyword = None
         self.filepath = None
         self.filename = None
+        self.log_format = "csv"
+        self.checkpoint_path = None
+        self.start_time = None
+        self.cache = None
+        self.instrumentation = instrument.Instrumentation()
+        self.data = datastore.SampleStore()
 
     # Functions for Data management
+    @property
+    def x(self):
+        """
+        Points in the design space in which the system response is known, one
+        point per row. View of the data in self.data.
+        """
+        return self.data.x
+
+    @x.setter
+    def x(self, x):
+        self.data.x = x
+
+    @property
+    def y(self):
+        """
+        System responses of the points in self.x, one response per row. View
+        of the data in self.data.
+        """
+        return self.data.y
+
+    @y.setter
+    def y(self, y):
+        self.data.y = y
+
     def append_x_data(self, xi):
         """
-        Appends a datapoint xi to the design space
+        Appends a datapoint xi (or several points, one per row) to the design
+        space. The smallest distance between any two points is kept up to
+        date in self.min_distance.
 
         :param xi: One point in the design space
         :type xi: Numpy array
@@ -194,7 +954,10 @@ class adaptive_metamodell:
         :rtype: None
         """
 
-        self.x = np.vstack([self.x, xi])
+        for row in np.atleast_2d(xi):
+            distance, _ = self.data.nearest(row)
+            self.min_distance = min(self.min_distance, distance)
+            self.data.append_x(row)
 
     def append_y_data(self, yi):
         """
@@ -206,7 +969,7 @@ class adaptive_metamodell:
         :rtype: none
         """
 
-        self.y = np.vstack([self.y, yi])
+        self.data.append_y(yi)
 
     def write_data(self, Data, filepath, filename):
         """
@@ -231,10 +994,87 @@ class adaptive_metamodell:
     def set_filename(self, filename):
         self.filename = filename
 
+    def set_checkpoint(self, path):
+        """
+        Sets the path of a .npz file, in which the state of the optimization
+        is stored after each evaluation. The checkpoint holds the points and
+        responses, the iteration counter and the state of numpy's random
+        number generator. A run can be continued from it with
+        optimize(resume=True). The metamodel is retrained from the stored
+        points.
+
+        :param path: Path of the checkpoint file
+        :type path: String
+        :return: Nothing
+        :rtype: None
+        """
+
+        self.checkpoint_path = path
+
+    def save_checkpoint(self, phase="adaptive", y=None):
+        """
+        Writes the current state of the optimization into the checkpoint
+        file, if a checkpoint is set
+
+        :param phase: "doe" while the initial sampling is evaluated, "batch"
+            while the points of an iteration are evaluated, otherwise
+            "adaptive"
+        :type phase: String
+        :param y: Responses to be stored instead of self.y. During the initial
+            sampling and a batch, responses that are not known yet are NaN.
+        :type y: Numpy array
+        :return: Nothing
+        :rtype: None
+        """
+
+        if self.checkpoint_path is None:
+            return
+
+        with self.instrumentation.phase("io"):
+            checkpoint.save_checkpoint(
+                self.checkpoint_path,
+                x=self.x,
+                y=self.y if y is None else y,
+                ite=np.array(self.ite),
+                elapsed=np.array(self.elapsed()),
+                phase=np.array(phase),
+                **checkpoint.get_rng_state()
+            )
+
+    def set_log_format(self, log_format):
+        """
+        Sets the format of the files, in which the data is written during the
+        optimization, if a filepath is set. Only new points are appended to
+        the files. See runlog.RunLog for details.
+
+        :param log_format: Either "csv" (default) or "npy"
+        :type log_format: String
+        :return: Nothing
+        :rtype: None
+        """
+
+        self.log_format = log_format
+
+    def log_new_points(self, num):
+        """
+        Appends the last num points and responses to the log files, if a
+        filepath is set
+
+        :param num: Number of new points
+        :type num: Integer
+        :return: Nothing
+        :rtype: None
+        """
+
+        if self.filepath is not None and num > 0:
+            with self.instrumentation.phase("io"):
+                self.run_log.append(self.x[-num:], self.y[-num:])
+
     def read_data(self, filename):
         """
-        Function that reads a file in the treeOptData directory and creates a
-        numpy array with this data
+        Function that reads a file in the directory set with set_filepath (or
+        the teeOptData directory, if no filepath is set) and creates a numpy
+        array with this data
 
         :param filename: Name of the file to be read
         :type filename: String
@@ -242,9 +1082,10 @@ class adaptive_metamodell:
         :rtype: Numpy Array
         """
 
-        path = os.path.join(
-            os.path.join(os.getcwd(), "teeOptData", filename + ".csv")
-        )
+        filepath = self.filepath
+        if filepath is None:
+            filepath = os.path.join(os.getcwd(), "teeOptData")
+        path = os.path.join(filepath, filename + ".csv")
         array = np.loadtxt(path, delimiter=",")
         return array
 
@@ -267,6 +1108,9 @@ class adaptive_metamodell:
         Sets the Sampling Method inteddet to be used by the individual
         Optimization Problem. TreeOpt provides the following methods:
         * sampling.latin_hypercube (default)
+        * sampling.maximin_latin_hypercube (large samplings)
+        * sampling.sobol
+        * sampling.halton
         * sampling.full_factorial
         * sampling.random
 
@@ -307,18 +1151,29 @@ class adaptive_metamodell:
 
         self.limits = limits
 
-    def set_cost_function(self, cost_function):
+    def set_cost_function(self, cost_function, batched=False):
         """
         Sets the problem of which an optimization is to be done. Arguments
         have to be passed in the following way:  function(x, arg1, arg2,
         ..., argN), where x are the parameters which are to be optimized and
         arg1 to argN are static Variables.
 
+        The cost function always gets x as a matrix with one point per row.
+        A batched cost function returns one row per point and is called with
+        all points of a batch (e.g. of the initial sampling) at once, i.e.
+        evaluate.vectorized is used instead of the evaluation method. The
+        asynchronous optimization still submits single points with the
+        evaluation method.
+
         :param cost_function: A function that takes takes parameters and
             returns the system response
         :type cost_function: Python function
+        :param batched: True, if the cost function takes several points at
+            once (default False)
+        :type batched: Bool
         """
         self.problem = cost_function
+        self.batched = batched
 
     def set_cost_function_args(self, args):
         """
@@ -355,6 +1210,12 @@ class adaptive_metamodell:
         * metamodel.rbf (radial basis functions) (default)
         * metamodel.krg (kriging)
         * metamodel.idw (inverse distance weighing)
+        * metamodel.krg_incremental (kriging, updated with new points instead
+          of being retrained in each iteration)
+        * metamodel.krg_local (mixture of local kriging metamodels, for large
+          numbers of points)
+        * metamodel.sgp (sparse gaussian process, for large numbers of points)
+        set_sm_method_from_scaling chooses one of them from measured costs.
 
         :param method: one of the metamodel functions
         :type method: python function
@@ -365,11 +1226,333 @@ class adaptive_metamodell:
 
         self.smMethod = method
 
+    def set_sm_method_from_scaling(
+        self, results, num_points=None, max_train_time=10.0
+    ):
+        """
+        Chooses the metamodel for this study from the measurements of a
+        scaling sweep (see scaling.sweep and scaling.choose_surrogate). The
+        most preferred metamodel with variances, whose training on the
+        number of points the study reaches stays below max_train_time, is
+        set as the metamodel. The limits and the number of points of the
+        initial sampling have to be set before.
+
+        :param results: Results of scaling.sweep, or the path of the JSON
+            file they were written to
+        :type results: Dictionary
+        :param num_points: Number of points the study reaches (default: the
+            initial sampling plus the evaluations the termination policy
+            allows, see termination.Termination.budget)
+        :type num_points: Integer
+        :param max_train_time: Acceptable training time in seconds
+        :type max_train_time: Float
+        :return: Name of the chosen metamodel
+        :rtype: String
+
+        """
+
+        if not isinstance(results, dict):
+            results = scaling.load(results)
+        if num_points is None:
+            budget = self.termination.budget(
+                termination.State(num_evals=self.numDOE)
+            )
+            if not np.isfinite(budget):
+                raise ValueError(
+                    "The termination policy %r sets no limit of the "
+                    "evaluations, pass num_points" % self.termination
+                )
+            num_points = self.numDOE + int(budget)
+
+        name = scaling.choose_surrogate(
+            results,
+            num_points,
+            np.shape(self.limits)[0],
+            max_train_time=max_train_time,
+        )
+        if name is None:
+            raise ValueError(
+                "No measured metamodel trains %d points within %g seconds"
+                % (num_points, max_train_time)
+            )
+
+        logger.info(
+            "Metamodel %s chosen for %d points from the scaling results",
+            name,
+            num_points,
+        )
+        self.smMethod = scaling.METHODS[name]
+
+        return name
+
+    def set_acquisition(self, name, **params):
+        """
+        Sets the acquisition function, that is optimized on the metamodel to
+        find the next point to be evaluated. In treeopt the following
+        functions are registered (see acquisition.register for own ones):
+        * "lcb" (lower confidence bound mu - kappa * sigma, kappa=3.0)
+          (default)
+        * "ei" (expected improvement, xi=0.0)
+        * "pi" (probability of improvement, xi=0.0)
+        * "max_variance" (largest variance, pure exploration)
+
+        :param name: Name of the acquisition function
+        :type name: String
+        :param params: Parameters of the acquisition function, e.g. kappa=2.0
+        :type params: Keywords
+        :return: Nothing
+        :rtype: None
+
+        """
+
+        acquisition.get(name)
+        self.acquisition = name
+        self.acquisition_params = params
+
+    def search_infill(self, sm, limits, y_min):
+        """
+        Searches the next point to be evaluated with the acquisition function
+        set with set_acquisition
+
+        :param sm: Metamodel
+        :type sm: Smt-object
+        :param limits: Limits of the design-space
+        :type limits: Numpy-array
+        :param y_min: Lowest known system response
+        :type y_min: Float
+        :return: Next point in the design space
+        :rtype: Numpy-array
+
+        """
+
+        with self.instrumentation.phase("acquisition"):
+            return acquisition.search(
+                sm,
+                limits,
+                y_min,
+                self.acquisition,
+                self.acquisition_params,
+            )
+
+    def set_termination(self, policy):
+        """
+        Sets the policy, that decides when the adaptive optimization stops.
+        Policies of the termination module can be combined with | (any) and
+        & (all), e.g.
+        termination.MaxEvaluations(100) | termination.Stall(10, tol=1e-3)
+        The following policies are implemented:
+        * termination.MaxIterations (default MaxIterations(5))
+        * termination.MaxEvaluations (including the initial sampling)
+        * termination.WallClock
+        * termination.Stall (no improvement of the best response)
+        * termination.AcquisitionThreshold (see acquisition.promise)
+        * termination.MinSpacing (smallest distance of two points)
+
+        :param policy: Termination policy
+        :type policy: termination.Termination
+        :return: Nothing
+        :rtype: None
+
+        """
+
+        self.termination = policy
+
+    def elapsed(self):
+        """
+        Returns the wall time of the optimization in seconds, measured from
+        the start of the initial sampling and including the time of the run
+        a resumed checkpoint was written by
+
+        :return: Wall time in seconds
+        :rtype: Float
+
+        """
+
+        if self.start_time is None:
+            return 0.0
+        return time.perf_counter() - self.start_time
+
+    def start_state(self):
+        """
+        Creates the termination.State of the current data, on which the
+        termination policy decides. Its wall clock includes the initial
+        sampling.
+
+        :return: Progress of the optimization
+        :rtype: termination.State
+
+        """
+
+        self.state = termination.State(
+            self.ite, len(self.x), np.min(self.y), self.elapsed()
+        )
+        self.state.min_distance = self.min_distance
+        self.termination_reason = self.termination.reason(self.state)
+
+        return self.state
+
+    def update_state(self, acquisition_value=None):
+        """
+        Records the progress of an iteration in self.state and checks the
+        termination policy
+
+        :param acquisition_value: Largest promise of the acquisition function
+            in the new points
+        :type acquisition_value: Float
+        :return: True, if the optimization should stop
+        :rtype: Bool
+
+        """
+
+        self.state.update(
+            self.ite,
+            len(self.x),
+            np.min(self.y),
+            acquisition_value,
+            self.min_distance,
+        )
+        self.termination_reason = self.termination.reason(self.state)
+
+        return self.termination_reason is not None
+
+    def acquisition_promise(self, points):
+        """
+        Returns the largest promise of the acquisition function in some
+        points on the current metamodel (see acquisition.promise)
+
+        :param points: Points in the design space, one point per row
+        :type points: Numpy-array
+        :return: Largest promise
+        :rtype: Float
+
+        """
+
+        with self.instrumentation.phase("acquisition"):
+            return float(
+                np.max(
+                    acquisition.promise(
+                        self.instrumentation.wrap(self.sm),
+                        points,
+                        np.min(self.y),
+                        self.acquisition,
+                        self.acquisition_params,
+                    )
+                )
+            )
+
+    def set_instrumentation(self, instrumentation):
+        """
+        Sets the instrumentation, that measures the wall time of the phases
+        of each iteration ("simulation", "fit", "acquisition", "minimum",
+        "io") and counts the predictions of the metamodel. After the initial
+        sampling, each iteration and the end of the optimization an event is
+        passed to the callback of the instrumentation and written to its
+        trace file, e.g.
+        instrument.Instrumentation("trace.jsonl", callback=print)
+
+        :param instrumentation: Instrumentation of the optimization
+        :type instrumentation: instrument.Instrumentation
+        :return: Nothing
+        :rtype: None
+
+        """
+
+        self.instrumentation = instrumentation
+
+    def emit_event(self, event, **data):
+        """
+        Reports an event of the optimization to the instrumentation. The
+        iteration counter, the number of evaluations and the lowest known
+        response are added to the data.
+
+        :param event: Type of the event ("doe", "iteration" or "end")
+        :type event: String
+        :param data: Further data of the event, passed as keywords
+        :return: The event
+        :rtype: Dictionary
+
+        """
+
+        return self.instrumentation.emit(
+            event,
+            optimizer="adaptive_metamodell",
+            ite=self.ite,
+            num_evals=len(self.x),
+            best=float(np.min(self.y)),
+            **data
+        )
+
+    def set_evaluation_method(self, method):
+        """
+        Sets the Method that is used to evaluate several points of the design
+        space, e.g. the points of the initial sampling. In treeopt the
+        following methods are implemented:
+        * evaluate.serial (default)
+        * evaluate.thread_pool
+        * evaluate.process_pool
+        * evaluate.vectorized (the cost function gets all points at once)
+        A batched cost function (see set_cost_function) is always evaluated
+        with evaluate.vectorized.
+
+        :param method: one of the evaluate functions
+        :type method: python function
+        :return: Nothing
+        :rtype: None
+
+        """
+
+        self.evaluationMethod = method
+
+    def set_batch_size(self, batch_size):
+        """
+        Sets the Number of points that are added to the metamodel in each
+        iteration. For a batch size larger than one the points are proposed
+        with optimize.kriging_believer and evaluated together with the
+        evaluation method, so a parallel evaluation method should be chosen.
+
+        :param batch_size: Number of points per iteration (default 1)
+        :type batch_size: Integer
+        :return: Nothing
+        :rtype: None
+
+        """
+
+        self.batch_size = batch_size
+
+    def set_num_workers(self, num_workers):
+        """
+        Sets the Number of threads or processes used by the parallel
+        evaluation methods
+
+        :param num_workers: Number of concurrent evaluations
+        :type num_workers: Integer
+        :return: Nothing
+        :rtype: None
+
+        """
+
+        self.num_workers = num_workers
+
+    def set_cache(self, cache):
+        """
+        Sets a cache, in which the responses of the problem are stored. Points
+        found in the cache are not evaluated again, also across runs.
+
+        :param cache: Cache of the responses
+        :type cache: cache.EvaluationCache
+        :return: Nothing
+        :rtype: None
+
+        """
+
+        self.cache = cache
+
     def execute_problem(self, x):
         """
         Executes the problem which is to be analyzed. If static Variables where
         defined as additional arguments for the problem, these arguments are
-        added to the function call.
+        added to the function call. If a cache is set, the response of a
+        single point is taken from the cache if possible.
 
         :param x: Point in the design space
         :type x: Numpy-array
@@ -378,64 +1561,415 @@ class adaptive_metamodell:
 
         """
 
-        return self.problem(x, *self.optimization_function_args)
+        args = self.optimization_function_args
+        if self.cache is None or np.atleast_2d(x).shape[0] != 1:
+            return self.problem(x, *args)
 
-    def optimize(self):
+        y = self.cache.lookup(self.problem, args, x)
+        if y is None:
+            y = self.problem(x, *args)
+            self.cache.store(self.problem, args, x, y)
+
+        return y
+
+    def evaluate_points(self, x, callback=None):
         """
-        Function that starts the previously parameterized adaptive optimization
-        loop
+        Evaluates the problem in several points of the design space with the
+        chosen evaluation method. Points found in the cache are not evaluated.
+        The wall time of each evaluation is appended to self.eval_times.
+
+        :param x: Points in the design space, one point per row
+        :type x: Numpy-array
+        :param callback: Function called as callback(i, yi, wall_time) each
+            time the evaluation of the i-th point finished
+        :type callback: Python function
+        :return: System responces, one row per point in the order of x
+        :rtype: Numpy-array
+
+        """
+
+        args = self.optimization_function_args
+        y = [None] * len(x)
+        times = np.zeros(len(x))
+
+        if self.cache is not None:
+            for i, xi in enumerate(x):
+                y[i] = self.cache.lookup(self.problem, args, xi)
+                if y[i] is not None and callback is not None:
+                    callback(i, y[i], 0.0)
+
+        missing = [i for i, yi in enumerate(y) if yi is None]
+
+        def store_result(j, yj, wall_time):
+            if self.cache is not None:
+                with self.instrumentation.phase("io"):
+                    self.cache.store(self.problem, args, x[missing[j]], yj)
+            if callback is not None:
+                callback(missing[j], yj, wall_time)
+
+        method = self.evaluationMethod
+        if self.batched:
+            method = evaluate.vectorized
+        if missing:
+            with self.instrumentation.phase("simulation"):
+                y_missing, times[missing] = method(
+                    self.problem,
+                    x[missing],
+                    args,
+                    self.num_workers,
+                    store_result,
+                )
+            for j, i in enumerate(missing):
+                y[i] = y_missing[j]
+        self.eval_times = np.concatenate([self.eval_times, times])
+
+        return np.vstack(y)
+
+    def evaluate_batch(self, x):
+        """
+        Evaluates the new points of an iteration, which have already been
+        appended to self.x. If a checkpoint is set, it is updated after each
+        evaluation, so an interrupted batch is continued on resume.
+
+        :param x: Points in the design space, one point per row
+        :type x: Numpy-array
+        :return: System responces, one row per point in the order of x
+        :rtype: Numpy-array
+
+        """
+
+        y_batch = np.full((len(x), self.y.shape[1]), np.nan)
+
+        def store_result(i, yi, wall_time):
+            y_batch[i] = np.ravel(yi)
+            self.save_checkpoint("batch", np.vstack([self.y, y_batch]))
+
+        return self.evaluate_points(x, callback=store_result)
+
+    def fit_surrogate(self):
+        """
+        Trains the metamodel on self.x and self.y. Metamodels that can be
+        updated (like metamodel.IncrementalKriging) are only updated with the
+        points added since the last call instead of being trained anew.
 
         :return: Nothing
         :rtype: None
 
         """
 
-        self.x = self.samplingMethod(self.limits, self.numDOE)
+        sm = getattr(self, "sm", None)
+        with self.instrumentation.phase("fit"):
+            if hasattr(sm, "update") and sm.num_training_points <= len(self.x):
+                num = sm.num_training_points
+                if num < len(self.x):
+                    sm.update(self.x[num:], self.y[num:])
+            else:
+                self.sm = self.smMethod(self.x, self.y)
 
-        self.y = self.execute_problem(np.atleast_2d(self.x[0]))
-        for xi in self.x[1:]:
-            self.append_y_data(self.execute_problem(np.atleast_2d(xi)))
+    def initial_sampling(self, resume=False):
+        """
+        Samples the design space with the sampling method and evaluates the
+        problem in all sampled points. If a checkpoint is set, it is updated
+        after each evaluation. The wall clock of the termination policies is
+        started before the sampling.
+
+        :param resume: If True and a checkpoint exists, the data of the
+            checkpoint is restored and only points of the initial sampling
+            or of an interrupted batch, that have not been evaluated yet, are
+            evaluated. The log files are continued.
+        :type resume: Bool
+        :return: Nothing
+        :rtype: None
 
-        if self.filepath is not None:
-            self.write_data(self.x, self.filepath, self.filename + "DoeData")
-            self.write_data(
-                self.y, self.filepath, self.filename + "DoeResponce"
-            )
+        """
 
-        self.optGoal = False
+        self.sm = None
+        self.start_time = time.perf_counter()
+        state = None
+        if resume and self.checkpoint_path is not None:
+            state = checkpoint.load_checkpoint(self.checkpoint_path)
 
+        self.eval_times = np.zeros(0)
         self.ite = 0
-        self.maxite = 5
-        self.all_nx_var = []
-        self.all_success = []
 
-        while self.optGoal is False:
+        self.x = None
+        self.min_distance = np.inf
+        if state is None:
+            self.append_x_data(self.samplingMethod(self.limits, self.numDOE))
+            y_doe = None
+            missing = np.arange(len(self.x))
+        else:
+            checkpoint.set_rng_state(state)
+            self.append_x_data(state["x"])
+            self.ite = int(state["ite"])
+            # The wall clock continues from the time of the checkpoint
+            self.start_time -= float(state.get("elapsed", 0.0))
+            y_doe = state["y"]
+            missing = np.flatnonzero(np.isnan(y_doe).any(axis=1))
+            if str(state["phase"]) == "batch":
+                # The interrupted iteration is finished below
+                self.ite += 1
+
+        def store_result(i, yi, wall_time):
+            nonlocal y_doe
+            yi = np.asarray(yi, dtype=float).ravel()
+            if y_doe is None:
+                y_doe = np.full((len(self.x), yi.size), np.nan)
+            y_doe[missing[i]] = yi
+            self.save_checkpoint("doe", y_doe)
+
+        if missing.size > 0:
+            self.evaluate_points(self.x[missing], callback=store_result)
+        self.y = y_doe
+        self.save_checkpoint()
+
+        num_logged = 0
+        if self.filepath is not None:
+            with self.instrumentation.phase("io"):
+                self.run_log = runlog.RunLog(
+                    self.filepath,
+                    self.filename,
+                    self.log_format,
+                    resume=state is not None,
+                )
+                if state is not None:
+                    num_logged = self.run_log.trim(len(self.x))
+        # Points of a resumed run, that were checkpointed but not logged yet
+        self.log_new_points(len(self.x) - num_logged)
+        self.emit_event("doe")
+        logger.info(
+            "Initial sampling: %d points, best value %g",
+            len(self.x),
+            np.min(self.y),
+        )
 
-            self.sm = self.smMethod(self.x, self.y)
+    def find_minimum(self):
+        """
+        Searches the minimum of the metamodel and stores it in
+        self.current_best_point
 
-            self.nX = optimize.search_lowest_variance(self.sm, self.limits)
+        :return: Nothing
+        :rtype: None
 
-            self.append_x_data(self.nX)
-            self.append_y_data(self.execute_problem(np.atleast_2d(self.nX)))
+        """
+
+        with self.instrumentation.phase("minimum"):
+            self.current_best_point = optimize.find_minimum(
+                self.instrumentation.wrap(self.sm), self.limits
+            )
+
+    def optimize(self, resume=False):
+        """
+        Function that starts the previously parameterized adaptive optimization
+        loop
+
+        :param resume: If True, the optimization continues from the
+            checkpoint set with set_checkpoint, without evaluating any point
+            again. Without a checkpoint file the optimization starts anew.
+        :type resume: Bool
+        :return: Nothing
+        :rtype: None
+
+        """
+
+        self.initial_sampling(resume)
+
+        self.all_nx_var = []
+        self.all_success = []
 
-            # Writes the Data in a file.
-            if self.filepath is not None:
-                self.write_data(
-                    self.x, self.filepath, self.filename + "DoeData"
+        self.start_state()
+        if self.termination_reason is not None:
+            # The resumed run was already finished
+            self.fit_surrogate()
+            self.find_minimum()
+
+        done = self.termination_reason is not None
+        while not done:
+
+            self.fit_surrogate()
+
+            if self.batch_size > 1:
+                self.nX = optimize.kriging_believer(
+                    self.instrumentation.wrap(self.sm),
+                    self.smMethod,
+                    self.x,
+                    self.y,
+                    self.limits,
+                    self.batch_size,
+                    search=self.search_infill,
                 )
-                self.write_data(
-                    self.y, self.filepath, self.filename + "DoeResponce"
+            else:
+                self.nX = self.search_infill(
+                    self.instrumentation.wrap(self.sm),
+                    self.limits,
+                    np.min(self.y),
                 )
+            value = self.acquisition_promise(self.nX)
 
+            self.append_x_data(self.nX)
+            self.append_y_data(self.evaluate_batch(np.atleast_2d(self.nX)))
             self.ite += 1
+            self.save_checkpoint()
 
-            if self.ite == self.maxite:
-                self.optGoal = True
+            # Appends the new Data to the files.
+            self.log_new_points(len(np.atleast_2d(self.nX)))
 
-            self.current_best_point = optimize.find_minimum(
-                self.sm, self.limits
+            done = self.update_state(value)
+
+            self.find_minimum()
+            self.emit_event(
+                "iteration",
+                acquisition_value=value,
+                termination=self.termination_reason,
+            )
+            logger.info(
+                "Iteration %d: %d evaluations, best value %g",
+                self.ite,
+                len(self.x),
+                np.min(self.y),
             )
 
+        self.emit_event(
+            "end",
+            termination=self.termination_reason,
+            total=self.instrumentation.summary(),
+        )
+        logger.info("Optimization finished: %s", self.termination_reason)
+
+        if self.vis_keyword is not None:
+            vis = visualize.Visualize(self)
+            vis.plot()
+
+    def optimize_async(self, resume=False):
+        """
+        Asynchronous variant of the adaptive optimization loop. After the
+        initial sampling, num_workers evaluations of the problem are kept
+        running at all times. As soon as one of them finishes, its result is
+        added to the data, the metamodel is retrained and a new point is
+        submitted. The new point is searched with optimize.kriging_believer,
+        which takes the points that are still being simulated into account.
+        The evaluations run in processes if the evaluation method is
+        evaluate.process_pool and in threads otherwise.
+
+        :param resume: If True, the optimization continues from the
+            checkpoint set with set_checkpoint. Evaluations that were running
+            when the checkpoint was written are not restored.
+        :type resume: Bool
+        :return: Nothing
+        :rtype: None
+
+        """
+
+        self.initial_sampling(resume)
+
+        num_workers = self.num_workers or os.cpu_count() or 1
+
+        self.fit_surrogate()
+        self.start_state()
+        value = None
+
+        with evaluate.make_executor(
+            self.evaluationMethod, num_workers
+        ) as executor:
+            running = {}
+            cached = set()
+
+            def submit_points(q):
+                nonlocal value
+                pending = np.array(list(running.values()))
+                points = optimize.kriging_believer(
+                    self.instrumentation.wrap(self.sm),
+                    self.smMethod,
+                    self.x,
+                    self.y,
+                    self.limits,
+                    q,
+                    pending=pending,
+                    search=self.search_infill,
+                )
+                value = self.acquisition_promise(points)
+                for point in points:
+                    yi = None
+                    if self.cache is not None:
+                        yi = self.cache.lookup(
+                            self.problem,
+                            self.optimization_function_args,
+                            point,
+                        )
+                    if yi is None:
+                        future = evaluate.submit(
+                            executor,
+                            self.problem,
+                            point,
+                            self.optimization_function_args,
+                        )
+                    else:
+                        future = futures.Future()
+                        future.set_result((yi, 0.0))
+                        cached.add(future)
+                    running[future] = point
+
+            num_new = min(num_workers, self.termination.budget(self.state))
+            if self.termination_reason is None and num_new > 0:
+                submit_points(int(num_new))
+
+            while running:
+                with self.instrumentation.phase("simulation"):
+                    done, _ = futures.wait(
+                        running, return_when=futures.FIRST_COMPLETED
+                    )
+
+                for future in done:
+                    self.nX = running.pop(future)
+                    yi, wall_time = future.result()
+                    if self.cache is not None and future not in cached:
+                        with self.instrumentation.phase("io"):
+                            self.cache.store(
+                                self.problem,
+                                self.optimization_function_args,
+                                self.nX,
+                                yi,
+                            )
+
+                    self.append_x_data(self.nX)
+                    self.append_y_data(yi)
+                    self.eval_times = np.append(self.eval_times, wall_time)
+                    self.ite += 1
+                    self.save_checkpoint()
+
+                # Appends the new Data to the files.
+                self.log_new_points(len(done))
+
+                self.fit_surrogate()
+
+                stop = self.update_state(value)
+                num_new = min(
+                    len(done),
+                    self.termination.budget(self.state) - len(running),
+                )
+                if not stop and num_new > 0:
+                    submit_points(int(num_new))
+                logger.info(
+                    "%d evaluations, %d running, best value %g",
+                    len(self.x),
+                    len(running),
+                    np.min(self.y),
+                )
+                self.emit_event(
+                    "iteration",
+                    acquisition_value=value,
+                    running=len(running),
+                    termination=self.termination_reason,
+                )
+
+        self.find_minimum()
+        self.emit_event(
+            "end",
+            termination=self.termination_reason,
+            total=self.instrumentation.summary(),
+        )
+        logger.info("Optimization finished: %s", self.termination_reason)
+
         if self.vis_keyword is not None:
             vis = visualize.Visualize(self)
             vis.plot()
@@ -224,7 +224,7 @@ if __name__ == "__main__":
         x_0 = doe(doe_num)
         y_0 = fun(*tuple([x_0[:, i] for i in range(bounds.shape[0])]))
 
-        sm = smt.RBF(d0=5)
+        sm = smt.RBF(d0=5, print_global=False)
         sm.set_training_values(x_0, y_0)
         sm.train()
 